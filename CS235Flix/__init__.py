@@ -5,7 +5,17 @@ import os
 from flask import Flask
 
 import CS235Flix.adapters.repository as repo
-from CS235Flix.adapters.memory_repository import MemoryRepository, populate
+from CS235Flix.adapters.snapshot import load_repository
+from CS235Flix.adapters.database_repository import DatabaseRepository, make_engine
+from CS235Flix.adapters.database_loader import load_database
+import CS235Flix.adapters.columnar_repository as columnar_repository
+from CS235Flix.adapters.columnar_repository import ColumnarMemoryRepository
+import CS235Flix.adapters.cover_art as cover_art
+from CS235Flix.adapters.cover_art import CoverCache, CoverService, IMDbCoverResolver
+import CS235Flix.utilities.navigation as navigation
+from CS235Flix.utilities.navigation import GenreNavigation
+import CS235Flix.utilities.sidebar as sidebar
+from CS235Flix.utilities.sidebar import SidebarSampler
 
 
 def create_app(test_config=None):
@@ -23,9 +33,33 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
         data_path = app.config['TEST_DATA_PATH']
 
-    # Create the MemoryRepository implementation for a memory-based repository.
-    repo.repo_instance = MemoryRepository()
-    populate(data_path, repo.repo_instance)
+    if app.config.get('REPOSITORY') == 'database':
+        # Create the DatabaseRepository implementation for a database-backed repository, and fill the database from
+        # the data files the first time.
+        engine = make_engine(app.config['SQLALCHEMY_DATABASE_URI'], pool_size=app.config.get('SQLALCHEMY_POOL_SIZE', 5),
+                             echo=app.config.get('SQLALCHEMY_ECHO', False))
+        repo.repo_instance = DatabaseRepository(engine)
+        if repo.repo_instance.get_total_number_of_movies_in_repo() == 0:
+            app.logger.info("Loaded the database:\n%s", load_database(data_path, engine))
+    elif app.config.get('REPOSITORY') == 'columnar':
+        # Create the ColumnarMemoryRepository implementation, which holds the movies in NumPy arrays rather than as
+        # objects, for catalogues too large for MemoryRepository.
+        repo.repo_instance = ColumnarMemoryRepository()
+        app.logger.info("Loaded the repository:\n%s", columnar_repository.populate(data_path, repo.repo_instance))
+    else:
+        # Create the MemoryRepository implementation for a memory-based repository. Outside of testing, the populated
+        # repository is also written to a snapshot, which later starts load instead of parsing the data files again.
+        snapshot_path = app.config.get('REPOSITORY_SNAPSHOT_PATH')
+        if snapshot_path is None and not app.testing:
+            snapshot_path = os.path.join(app.instance_path, 'repository.pickle')
+        repo.repo_instance = load_repository(data_path, snapshot_path)
+
+    # Create the cover art service. Covers are resolved in the background and cached on disk, so pages never wait
+    # for the external resolver (IMDb by default). Start resolving the covers shown on the home page straight away.
+    cover_cache_path = app.config.get('COVER_CACHE_PATH') or os.path.join(app.instance_path, 'covers.json')
+    cover_resolver = app.config.get('COVER_RESOLVER') or IMDbCoverResolver()
+    cover_art.cover_service = CoverService(CoverCache(cover_cache_path), cover_resolver)
+    cover_art.cover_service.prefetch(repo.repo_instance.get_top_6_highest_revenue_movies())
 
     # Build the application and register blueprints
     with app.app_context():
@@ -42,4 +76,15 @@ def create_app(test_config=None):
         from .utilities import utilities
         app.register_blueprint(utilities.utilities_blueprint)
 
+        # Create the sampler of the random movies shown alongside most pages. It picks a new rotation of movies at
+        # most every SIDEBAR_REFRESH_SECONDS, rather than for every page.
+        sidebar.sidebar_sampler = SidebarSampler(utilities.movie_url,
+                                                 refresh_seconds=app.config.get('SIDEBAR_REFRESH_SECONDS', 60))
+
+        # Create the cache of the links to the genres shown alongside every page
+        navigation.genre_navigation = GenreNavigation(utilities.genre_url)
+
+        from .actors import actors
+        app.register_blueprint(actors.actors_blueprint)
+
     return app
@@ -0,0 +1,80 @@
+# CS235Flix/actors/actors.py
+
+from flask import Blueprint
+from flask import request, render_template, url_for
+
+import CS235Flix.adapters.repository as repo
+import CS235Flix.utilities.utilities as utilities
+import CS235Flix.actors.services as services
+
+from CS235Flix.movies.movies import SearchForm, SearchByTitleForm
+
+
+# Configure Blueprint
+actors_blueprint = Blueprint(
+    'actors_bp', __name__
+)
+
+
+@actors_blueprint.route('/actor_network', methods=['GET'])
+def actor_network():
+    most_connected_per_page = 10
+
+    # Read query parameters
+    actor_fullname = request.args.get('actor')
+    target_fullname = request.args.get('target')
+    hops = request.args.get('hops')
+
+    if actor_fullname is None:
+        actor_fullname = ""
+    if target_fullname is None:
+        target_fullname = ""
+
+    try:
+        # Convert hops from string to int, keeping it between 1 and 3
+        hops = min(max(int(hops), 1), 3)
+    except (TypeError, ValueError):
+        # No hops query parameter, or not a number, so show the direct colleagues of the actor
+        hops = 1
+
+    connection = None
+    neighbourhood = None
+    message = None
+
+    if len(actor_fullname) != 0 and len(target_fullname) != 0:
+        try:
+            connection = services.get_connection_between_actors(actor_fullname, target_fullname, repo.repo_instance)
+        except services.NonExistentActorException:
+            message = "No actor named " + actor_fullname + " or " + target_fullname + " was found"
+        except services.NoConnectionException:
+            message = actor_fullname + " and " + target_fullname + " are not connected"
+    elif len(actor_fullname) != 0:
+        try:
+            neighbourhood = services.get_actor_neighbourhood(actor_fullname, hops, repo.repo_instance)
+        except services.NonExistentActorException:
+            message = "No actor named " + actor_fullname + " was found"
+
+    most_connected = services.get_most_connected_actors(most_connected_per_page, repo.repo_instance)
+
+    # Construct urls for exploring each actor's network and listing their movies
+    for actor in (connection or list()) + (neighbourhood or list()) + most_connected:
+        actor['network_url'] = url_for('actors_bp.actor_network', actor=actor['actor_fullname'])
+        actor['movies_url'] = url_for('movies_bp.search_movies_by_actor_and_or_director',
+                                      actor=actor['actor_fullname'])
+
+    return render_template(
+        'actors/actor_network.html',
+        title='Actor Network',
+        actor_fullname=actor_fullname,
+        target_fullname=target_fullname,
+        hops=hops,
+        connection=connection,
+        neighbourhood=neighbourhood,
+        most_connected=most_connected,
+        message=message,
+        form=SearchForm(),
+        handler_url=url_for('movies_bp.search'),
+        handler_url_network=url_for('actors_bp.actor_network'),
+        title_form=SearchByTitleForm(),
+        handler_url_title=url_for('movies_bp.search_by_title'),
+    )
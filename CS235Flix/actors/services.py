@@ -0,0 +1,57 @@
+# CS235Flix/actors/services.py
+
+from CS235Flix.adapters.repository import AbstractRepository
+
+
+class NonExistentActorException(Exception):
+    pass
+
+
+class NoConnectionException(Exception):
+    pass
+
+
+def get_connection_between_actors(actor_fullname: str, target_fullname: str, repo: AbstractRepository):
+    graph = repo.get_actor_graph()
+    if not graph.has_actor(actor_fullname) or not graph.has_actor(target_fullname):
+        raise NonExistentActorException
+
+    # Find a shortest chain of collaborations between the two actors
+    path = graph.shortest_path(actor_fullname, target_fullname)
+    if path is None:
+        raise NoConnectionException
+
+    return [actor_name_to_dict(actor_fullname) for actor_fullname in path]
+
+
+def get_actor_neighbourhood(actor_fullname: str, hops: int, repo: AbstractRepository):
+    neighbourhood = repo.get_actor_graph().neighbourhood(actor_fullname, hops)
+    if neighbourhood is None:
+        raise NonExistentActorException
+
+    neighbours_as_dict = list()
+    for actor_fullname, degrees in neighbourhood:
+        actor_dict = actor_name_to_dict(actor_fullname)
+        actor_dict['degrees_of_separation'] = degrees
+        neighbours_as_dict.append(actor_dict)
+    return neighbours_as_dict
+
+
+def get_most_connected_actors(quantity: int, repo: AbstractRepository):
+    actors_as_dict = list()
+    for actor_fullname, number_of_colleagues in repo.get_actor_graph().most_connected(quantity):
+        actor_dict = actor_name_to_dict(actor_fullname)
+        actor_dict['number_of_colleagues'] = number_of_colleagues
+        actors_as_dict.append(actor_dict)
+    return actors_as_dict
+
+
+# ============================================
+# Functions to convert model entities to dicts
+# ============================================
+
+def actor_name_to_dict(actor_fullname: str):
+    actor_dict = {
+        'actor_fullname': actor_fullname
+    }
+    return actor_dict
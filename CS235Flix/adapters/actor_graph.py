@@ -0,0 +1,155 @@
+from array import array
+from typing import Iterable, List
+
+from CS235Flix.domainmodel.model import Actor
+
+
+class ActorGraph:
+    # The actor collaboration graph in compressed sparse row (CSR) form. Actors are numbered 0..n-1, and the
+    # colleagues of actor i are the actor numbers in neighbours[offsets[i]:offsets[i + 1]]. Queries work on these
+    # integer arrays only; names are looked up at the edges of each query.
+    def __init__(self, names: List[str], adjacency: List[List[int]]):
+        offsets = array('l', [0])
+        neighbours = array('l')
+        for colleague_ids in adjacency:
+            neighbours.extend(colleague_ids)
+            offsets.append(len(neighbours))
+        self._index(names, offsets, neighbours)
+
+    @classmethod
+    def from_csr(cls, names: List[str], offsets: Iterable[int], neighbours: Iterable[int]):
+        """ Returns the graph in which the colleagues of actor i are neighbours[offsets[i]:offsets[i + 1]] """
+        graph = cls.__new__(cls)
+        graph._index(names, array('l', offsets), array('l', neighbours))
+        return graph
+
+    def _index(self, names: List[str], offsets: array, neighbours: array):
+        self._names = list(names)
+        self._ids = dict()
+        for actor_id, name in enumerate(self._names):
+            self._ids.setdefault(name.casefold(), actor_id)
+
+        self._offsets = offsets
+        self._neighbours = neighbours
+
+        # Actor numbers ordered by number of colleagues (most first), then by name.
+        self._ranking = array('l', sorted(range(len(self._names)), key=lambda i: (-self.degree(i), self._names[i])))
+
+    @classmethod
+    def from_actors(cls, actors: Iterable[Actor]):
+        actors = [actor for actor in actors if actor.actor_full_name is not None]
+        ids = dict()
+        for actor in actors:
+            ids.setdefault(actor, len(ids))
+        actors = list(ids)
+
+        adjacency = [[ids[colleague] for colleague in actor.actor_colleague if colleague in ids] for actor in actors]
+        return cls([actor.actor_full_name for actor in actors], adjacency)
+
+    @property
+    def number_of_actors(self) -> int:
+        return len(self._names)
+
+    @property
+    def number_of_collaborations(self) -> int:
+        # Each collaboration is stored once for each of the two actors.
+        return len(self._neighbours) // 2
+
+    def has_actor(self, actor_full_name: str) -> bool:
+        return actor_full_name.strip().casefold() in self._ids
+
+    def actor_name(self, actor_id: int) -> str:
+        return self._names[actor_id]
+
+    def degree(self, actor_id: int) -> int:
+        return self._offsets[actor_id + 1] - self._offsets[actor_id]
+
+    def colleagues(self, actor_id: int):
+        return self._neighbours[self._offsets[actor_id]:self._offsets[actor_id + 1]]
+
+    def shortest_path(self, actor_full_name: str, target_full_name: str):
+        """ Returns the names of the actors on a shortest chain of collaborations from one actor to the other, both
+            included. Returns None if either actor is unknown or the two actors are not connected.
+        """
+        source = self._ids.get(actor_full_name.strip().casefold())
+        target = self._ids.get(target_full_name.strip().casefold())
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [self._names[source]]
+
+        # Bidirectional breadth first search: grow the smaller of the two search frontiers one level at a time until
+        # they meet. Each parents map records how an actor was reached from its side of the search.
+        parents_from_source = {source: None}
+        parents_from_target = {target: None}
+        frontier_from_source = [source]
+        frontier_from_target = [target]
+
+        while len(frontier_from_source) > 0 and len(frontier_from_target) > 0:
+            if len(frontier_from_source) <= len(frontier_from_target):
+                frontier_from_source, meeting = self._expand(frontier_from_source, parents_from_source,
+                                                             parents_from_target)
+            else:
+                frontier_from_target, meeting = self._expand(frontier_from_target, parents_from_target,
+                                                             parents_from_source)
+            if meeting is not None:
+                return self._join_paths(meeting, parents_from_source, parents_from_target)
+        return None
+
+    def degrees_of_separation(self, actor_full_name: str, target_full_name: str):
+        path = self.shortest_path(actor_full_name, target_full_name)
+        if path is None:
+            return None
+        return len(path) - 1
+
+    def neighbourhood(self, actor_full_name: str, hops: int = 1):
+        """ Returns (actor name, distance) pairs for every actor within hops collaborations of the given actor,
+            excluding the actor, ordered by distance then name. Returns None if the actor is unknown.
+        """
+        source = self._ids.get(actor_full_name.strip().casefold())
+        if source is None:
+            return None
+
+        distances = {source: 0}
+        frontier = [source]
+        for distance in range(1, hops + 1):
+            next_frontier = list()
+            for actor_id in frontier:
+                for colleague_id in self.colleagues(actor_id):
+                    if colleague_id not in distances:
+                        distances[colleague_id] = distance
+                        next_frontier.append(colleague_id)
+            frontier = next_frontier
+
+        del distances[source]
+        return sorted(((self._names[actor_id], distance) for actor_id, distance in distances.items()),
+                      key=lambda pair: (pair[1], pair[0]))
+
+    def most_connected(self, quantity: int):
+        """ Returns (actor name, number of colleagues) pairs for the quantity actors with the most colleagues """
+        return [(self._names[actor_id], self.degree(actor_id)) for actor_id in self._ranking[:quantity]]
+
+    def _expand(self, frontier, parents, other_parents):
+        next_frontier = list()
+        for actor_id in frontier:
+            for colleague_id in self.colleagues(actor_id):
+                if colleague_id not in parents:
+                    parents[colleague_id] = actor_id
+                    if colleague_id in other_parents:
+                        return next_frontier, colleague_id
+                    next_frontier.append(colleague_id)
+        return next_frontier, None
+
+    def _join_paths(self, meeting, parents_from_source, parents_from_target):
+        path = list()
+        actor_id = meeting
+        while actor_id is not None:
+            path.append(self._names[actor_id])
+            actor_id = parents_from_source[actor_id]
+        path.reverse()
+
+        actor_id = parents_from_target[meeting]
+        while actor_id is not None:
+            path.append(self._names[actor_id])
+            actor_id = parents_from_target[actor_id]
+        return path
@@ -0,0 +1,971 @@
+import math
+import os
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List
+
+import numpy as np
+from werkzeug.security import generate_password_hash
+
+from CS235Flix.adapters.actor_graph import ActorGraph
+from CS235Flix.adapters.facets import FacetIndex
+from CS235Flix.adapters.load_statistics import LoadStatistics, peak_rss
+from CS235Flix.adapters.memory_repository import MovieColumns, movie_columns, review_values, load_users
+from CS235Flix.adapters.parallel_csv import parse_in_parallel
+from CS235Flix.adapters.recommender import ItemItemRecommender
+from CS235Flix.adapters.repository import AbstractRepository, RepositoryException, GENRE_ORDERS
+from CS235Flix.adapters.similar_movies import SimilarMoviesIndex
+from CS235Flix.adapters.title_search import TitleSearchIndex
+from CS235Flix.adapters.top_movies import TopMoviesIndex
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList
+
+# Stored in an integer column (a release year, a director code or the votes) for a missing value
+MISSING = -1
+
+
+class _Column:
+    # A NumPy array that doubles its capacity when it is full, so appending to it takes constant amortized time.
+    # values is a view of the filled part, which is only valid until the column next grows.
+    def __init__(self, dtype):
+        self._data = np.empty(16, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    def append(self, value):
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        self._reserve(self._size + len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def _reserve(self, size: int):
+        if size > len(self._data):
+            data = np.empty(max(size, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+
+class _Dictionary:
+    # Dictionary encoding of a column of names: each distinct name is stored once, and the column holds its code
+    # (its position in names). The case folded index maps a name to the code of the first name that folds to it.
+    def __init__(self):
+        self.names = list()
+        self._codes = dict()
+        self._casefold_codes = dict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name: str, create: bool = False):
+        code = self._codes.get(name)
+        if code is None and create:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+            self._casefold_codes.setdefault(name.casefold(), code)
+        return code
+
+    def casefold_code(self, name: str):
+        return self._casefold_codes.get(name.strip().casefold())
+
+
+class _Postings:
+    # The rows linked to each code of a dictionary, in compressed sparse row form: the rows of code c are
+    # rows[offsets[c]:offsets[c + 1]], in ascending order.
+    def __init__(self, row_codes: np.ndarray, codes: np.ndarray, number_of_codes: int):
+        order = np.lexsort((row_codes, codes))
+        self.rows = row_codes[order]
+        self.offsets = np.zeros(number_of_codes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=number_of_codes), out=self.offsets[1:])
+
+    def __getitem__(self, code: int) -> np.ndarray:
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    def count(self, code: int) -> int:
+        return int(self.offsets[code + 1] - self.offsets[code])
+
+
+class _ColumnarGenre(Genre):
+    # A Genre of a ColumnarMemoryRepository, shared by the movies it loads. Rather than holding its movies, it reads
+    # them from the repository's columns when they are asked for.
+    __slots__ = ('_repository', '_code')
+
+    def __init__(self, genre_name: str, repository, code: int):
+        super().__init__(genre_name)
+        self._repository = repository
+        self._code = code
+
+    @property
+    def classified_movies(self):
+        rows = self._repository._get_genre_postings()[self._code]
+        return iter(self._repository._load_movies(rows, with_reviews=False).values())
+
+    @property
+    def number_of_classified_movies(self):
+        return self._repository._get_genre_postings().count(self._code)
+
+    def is_applied_to(self, movie):
+        row = self._repository._movie_row(movie)
+        return row is not None and row in self._repository._get_genre_postings()[self._code]
+
+
+class ColumnarMemoryRepository(AbstractRepository):
+    # A memory repository that holds the movies in columns instead of as Movie objects. Each movie is a row: its id,
+    # release year, runtime, revenue, rating, votes and metascore are elements of NumPy arrays, its title and
+    # description are list items, and its director is a code into a dictionary of names. The actor and genre codes of
+    # all the movies are concatenated into one array each, with an array of offsets marking where each movie's
+    # codes start, so a catalogue of millions of movies takes a few arrays rather than millions of objects.
+    #
+    # Like DatabaseRepository, every query builds new domain objects, and only for the movies it returns (see
+    # _load_movies). Sorting, filtering and counting work on whole columns with NumPy. The sort orders, the inverted
+    # indexes from actors and genres to movies, the actor graph, the facet indexes, the similar movies and the
+    # recommender are built on first use and discarded (or, for the recommender, updated) when the data they depend
+    # on changes.
+    def __init__(self):
+        self._ids = _Column(np.int64)
+        self._release_years = _Column(np.int64)
+        self._runtimes = _Column(np.int64)
+        self._revenues = _Column(np.float64)
+        self._ratings = _Column(np.float64)
+        self._votes = _Column(np.int64)
+        self._metascores = _Column(np.float64)
+        self._director_codes = _Column(np.int64)
+        self._titles = list()
+        self._descriptions = list()
+
+        self._actor_names = _Dictionary()
+        self._director_names = _Dictionary()
+        self._genre_names = _Dictionary()
+        self._actor_offsets = _Column(np.int64)
+        self._actor_offsets.append(0)
+        self._actor_codes = _Column(np.int64)
+        self._genre_offsets = _Column(np.int64)
+        self._genre_offsets.append(0)
+        self._genre_codes = _Column(np.int64)
+        # Actors and genres linked to movies after the movies were added (by add_actor and add_genre), by row
+        self._added_actor_codes = dict()
+        self._added_genre_codes = dict()
+
+        self._row_by_id = dict()
+        self._row_by_key = dict()   # (title, release year) -> row
+
+        # Passwords by username, and plain text passwords that are hashed when their user is first retrieved, as in
+        # MemoryRepository
+        self._passwords = dict()
+        self._unhashed_passwords = dict()
+
+        # The reviews in columns, and the numbers of the reviews of each movie row and of each user
+        self._review_usernames = list()
+        self._review_rows = _Column(np.int64)
+        self._review_texts = list()
+        self._review_ratings = list()
+        self._review_timestamps = list()
+        self._reviews_by_row = dict()
+        self._reviews_by_username = dict()
+
+        self._watchlists = list()   # a list of (movie row, scheduled date) for each watchlist
+
+        self._title_index = None
+        self._release_year_list = None
+        self._year_ranks = None
+        self._revenue_order = None
+        self._revenue_ranks = None
+        self._actor_postings = None
+        self._genre_postings = None
+        self._director_postings = None
+        # The movie ids of each genre in each of GENRE_ORDERS, by (genre code, order)
+        self._genre_orders = dict()
+        self._genres = None
+        self._actor_graph = None
+        self._facet_index = None
+        self._similar_movies_index = None
+        self._top_movies_index = None
+        self._recommender = None
+
+    def add_user(self, user: User):
+        if isinstance(user, User) and user.username is not None:
+            self._passwords.setdefault(user.username, user.password)
+
+    def get_user(self, username) -> User:
+        username = username.lower()
+        if username not in self._passwords:
+            return None
+        if username in self._unhashed_passwords:
+            self._passwords[username] = generate_password_hash(self._unhashed_passwords.pop(username))
+
+        # Load the movies the user reviewed, which attaches the user's reviews to the user.
+        user = User(username, self._passwords[username])
+        self._load_movies(self._reviewed_rows(username), users={username: user})
+        return user
+
+    def add_user_with_unhashed_password(self, user: User, password: str):
+        """ Adds a user whose password is hashed when the user is first retrieved """
+        if isinstance(user, User) and user.username is not None and user.username not in self._passwords:
+            self.add_user(user)
+            self._unhashed_passwords[user.username] = password
+
+    def get_user_watched_movies(self, user: User) -> List[Movie]:
+        # Watched movies aren't stored, so they are only known to the given User object.
+        if self.check_user_existence_in_repo(user):
+            return user.watched_movies
+        return None
+
+    def get_user_reviews(self, user: User) -> List[Review]:
+        if self.check_user_existence_in_repo(user):
+            return self.get_user(user.username).reviews
+        return None
+
+    def get_user_time_spent_watching_movies_minutes(self, user: User):
+        if self.check_user_existence_in_repo(user):
+            return user.time_spent_watching_movies_minutes
+        return None
+
+    def check_user_existence_in_repo(self, user: User) -> bool:
+        return isinstance(user, User) and user.username in self._passwords
+
+    def add_actor(self, actor: Actor):
+        if isinstance(actor, Actor) and actor.actor_full_name is not None:
+            code = self._actor_names.code(actor.actor_full_name, create=True)
+            self._link(self._actor_offsets, self._actor_codes, self._added_actor_codes, actor.played_movies, code)
+            self._actor_postings = None
+            self._actor_graph = None
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_actor(self, actor_full_name) -> Actor:
+        code = self._actor_names.code(actor_full_name)
+        if code is None:
+            return None
+
+        # The movies the actor played in are loaded with this Actor, so their casts make up its colleagues.
+        actor = Actor(actor_full_name)
+        for movie in self._load_movies(self._get_actor_postings()[code], actors={code: actor}).values():
+            actor.add_played_movies(movie)
+            for colleague in movie.actors:
+                if colleague is not actor:
+                    actor.add_actor_colleague(colleague)
+        return actor
+
+    def check_actor_existence_in_repo(self, actor: Actor) -> bool:
+        return isinstance(actor, Actor) and actor.actor_full_name is not None and \
+            self._actor_names.code(actor.actor_full_name) is not None
+
+    def get_actor_colleague(self, actor: Actor) -> List[Actor]:
+        if self.check_actor_existence_in_repo(actor):
+            return list(self.get_actor(actor.actor_full_name).actor_colleague)
+        return None
+
+    def get_total_number_of_actors(self) -> int:
+        return len(self._actor_names)
+
+    def get_actor_graph(self) -> ActorGraph:
+        if self._actor_graph is None:
+            # Actors who played in the same movie, in the order of their movies and casts. Every actor of a movie is
+            # paired with every other actor of the movie, and only the first pair of any two actors is kept.
+            rows, codes = self._movie_entries(self._actor_offsets, self._actor_codes, self._added_actor_codes)
+            starts = np.searchsorted(rows, rows, side='left')
+            lengths = np.searchsorted(rows, rows, side='right') - starts
+            entries = np.repeat(np.arange(len(rows)), lengths)
+            colleague_entries = np.repeat(starts, lengths) + np.arange(lengths.sum()) - \
+                np.repeat(np.cumsum(lengths) - lengths, lengths)
+            actors, colleagues = codes[entries], codes[colleague_entries]
+            pairs = np.flatnonzero(actors != colleagues)
+
+            # Entries are in the order of the movies and casts, so ordering each actor's pairs by the colleague's
+            # entry puts the first pair of any two actors first
+            pairs = pairs[np.lexsort((colleague_entries[pairs], actors[pairs]))]
+            number_of_actors = len(self._actor_names)
+            _, firsts = np.unique(actors[pairs] * number_of_actors + colleagues[pairs], return_index=True)
+            pairs = pairs[np.sort(firsts)]
+
+            offsets = np.zeros(number_of_actors + 1, dtype=np.int64)
+            np.cumsum(np.bincount(actors[pairs], minlength=number_of_actors), out=offsets[1:])
+            self._actor_graph = ActorGraph.from_csr(list(self._actor_names.names), offsets.tolist(),
+                                                    colleagues[pairs].tolist())
+        return self._actor_graph
+
+    def add_director(self, director: Director):
+        if isinstance(director, Director) and director.director_full_name is not None:
+            code = self._director_names.code(director.director_full_name, create=True)
+            director_codes = self._director_codes.values
+            for row in self._stored_rows(director.directed_movies):
+                director_codes[row] = code
+            self._director_postings = None
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_director(self, director_full_name) -> Director:
+        code = self._director_names.code(director_full_name)
+        if code is None:
+            return None
+
+        director = Director(director_full_name)
+        for movie in self._load_movies(self._get_director_postings()[code], directors={code: director}).values():
+            director.add_directed_movies(movie)
+        return director
+
+    def check_director_existence_in_repo(self, director: Director):
+        return isinstance(director, Director) and director.director_full_name is not None and \
+            self._director_names.code(director.director_full_name) is not None
+
+    def get_total_number_of_directors(self) -> int:
+        return len(self._director_names)
+
+    def add_genre(self, genre: Genre):
+        if isinstance(genre, Genre) and genre.genre_name is not None:
+            code = self._genre_names.code(genre.genre_name, create=True)
+            self._link(self._genre_offsets, self._genre_codes, self._added_genre_codes, genre.classified_movies, code)
+            self._genre_postings = None
+            self._genre_orders = dict()
+            self._genres = None
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_genres(self) -> List[Genre]:
+        return list(self._get_genres())
+
+    def get_total_number_of_genres_in_repo(self):
+        return len(self._genre_names)
+
+    def check_genre_existence(self, genre: Genre) -> bool:
+        return isinstance(genre, Genre) and genre.genre_name is not None and \
+            self._genre_names.code(genre.genre_name) is not None
+
+    def add_movie(self, movie: Movie):
+        """ Adds a movie, along with its director, actors and genres """
+        if isinstance(movie, Movie) and (movie.title, movie.release_year) not in self._row_by_key:
+            director = movie.director
+            director_code = MISSING
+            if director is not None and director.director_full_name is not None:
+                director_code = self._director_names.code(director.director_full_name, create=True)
+            actor_codes = dict.fromkeys(self._actor_names.code(actor.actor_full_name, create=True)
+                                        for actor in movie.actors if actor.actor_full_name is not None)
+            genre_codes = dict.fromkeys(self._genre_names.code(genre.genre_name, create=True)
+                                        for genre in movie.genres if genre.genre_name is not None)
+            if len(genre_codes) > 0:
+                self._genres = None
+
+            row = len(self._titles)
+            self._row_by_key[(movie.title, movie.release_year)] = row
+            if movie.id is not None:
+                self._row_by_id.setdefault(movie.id, row)
+            self._ids.append(MISSING if movie.id is None else movie.id)
+            self._release_years.append(MISSING if movie.release_year is None else movie.release_year)
+            self._runtimes.append(movie.runtime_minutes)
+            self._revenues.append(movie.revenue)
+            self._ratings.append(math.nan if movie.rating is None else movie.rating)
+            self._votes.append(MISSING if movie.votes is None else movie.votes)
+            self._metascores.append(math.nan if movie.metascore is None else movie.metascore)
+            self._director_codes.append(director_code)
+            self._titles.append(movie.title)
+            self._descriptions.append(movie.description)
+            self._actor_codes.extend(list(actor_codes))
+            self._actor_offsets.append(len(self._actor_codes))
+            self._genre_codes.extend(list(genre_codes))
+            self._genre_offsets.append(len(self._genre_codes))
+            self._movies_changed()
+
+    def add_movie_columns(self, columns: MovieColumns):
+        """ Adds the movies of a chunk of movies.csv at once, along with their directors, actors and genres """
+        rows = range(len(self._titles), len(self._titles) + len(columns))
+        keys = list(zip(columns.titles, columns.release_years))
+        if len(set(keys)) < len(keys) or any(key in self._row_by_key for key in keys):
+            # Duplicate movies are skipped, like add_movie does, by adding them one at a time
+            for movie in _movies(columns):
+                self.add_movie(movie)
+            return
+
+        self._row_by_key.update(zip(keys, rows))
+        for movie_id, row in zip(columns.ids, rows):
+            self._row_by_id.setdefault(movie_id, row)
+        self._ids.extend(columns.ids)
+        self._release_years.extend(columns.release_years)
+        self._runtimes.extend(columns.runtimes)
+        self._revenues.extend(columns.revenues)
+        self._ratings.extend(columns.ratings)
+        self._votes.extend(columns.votes)
+        self._metascores.extend(columns.metascores)
+        self._director_codes.extend([MISSING if name == "" else self._director_names.code(name, create=True)
+                                     for name in columns.directors])
+        self._titles.extend(columns.titles)
+        self._descriptions.extend(columns.descriptions)
+        self._extend_codes(self._actor_offsets, self._actor_codes, self._actor_names, columns.actors)
+        self._extend_codes(self._genre_offsets, self._genre_codes, self._genre_names, columns.genres)
+        self._genres = None
+        self._movies_changed()
+
+    def get_movie(self, title: str, release_year: int):
+        return self._get_stored_movie(Movie(title, release_year))
+
+    def check_movie_existence_in_repo(self, movie: Movie) -> bool:
+        return self._movie_row(movie) is not None
+
+    def get_movies_by_release_year(self, target_year: int) -> List[Movie]:
+        return self._movies_in_order(np.flatnonzero(self._release_years.values == target_year))
+
+    def get_release_years(self) -> List[int]:
+        return list(self._get_release_years())
+
+    def get_movies_played_by_an_actor(self, actor_fullname: str) -> List[Movie]:
+        code = self._actor_names.casefold_code(actor_fullname)
+        if code is None:
+            return list()
+        return self._movies_at(self._get_actor_postings()[code])
+
+    def get_movies_directed_by_a_director(self, director_fullname: str) -> List[Movie]:
+        code = self._director_names.casefold_code(director_fullname)
+        if code is None:
+            return list()
+        return self._movies_at(self._get_director_postings()[code])
+
+    def get_top_movies_index(self) -> TopMoviesIndex:
+        if self._top_movies_index is None:
+            # The columns already hold the values; only missing years and votes become NaN.
+            release_years = self._release_years.values.astype(np.float64)
+            release_years[release_years == MISSING] = math.nan
+            votes = self._votes.values.astype(np.float64)
+            votes[votes == MISSING] = math.nan
+            self._top_movies_index = TopMoviesIndex(self._ids.values, release_years, self._ratings.values, votes,
+                                                    self._metascores.values)
+        return self._top_movies_index
+
+    def get_top_movies(self, criterion: str, quantity: int, genre_name: str = None,
+                       release_year: int = None) -> List[Movie]:
+        movie_ids = None if genre_name is None else self.get_movie_indexes_for_genre(genre_name)
+        return self.get_movies_by_index(
+            self.get_top_movies_index().top_movie_ids(criterion, quantity, movie_ids, release_year))
+
+    def search_movies_by_actor_and_director(self, actor_fullname: str, director_fullname: str):
+        actor_code = self._actor_names.casefold_code(actor_fullname)
+        director_code = self._director_names.casefold_code(director_fullname)
+        if actor_code is None or director_code is None:
+            return list()
+        rows = self._get_actor_postings()[actor_code]
+        return self._movies_at(rows[self._director_codes.values[rows] == director_code])
+
+    def search_movie_by_title(self, title: str, ranked: bool = False) -> List[Movie]:
+        query = title.lower()
+        title_index, title_rows = self._get_title_index()
+        documents = np.fromiter(title_index.documents(query), dtype=np.int64)
+        rows = title_rows[documents]
+        if ranked:
+            relevance = np.fromiter((title_index.relevance(query, document) for document in documents),
+                                    dtype=np.int64, count=len(documents))
+            return self._movies_at(rows[np.lexsort((self._get_year_ranks()[rows], relevance))])
+        return self._movies_in_order(rows)
+
+    def get_total_number_of_movies_in_repo(self):
+        return len(self._titles)
+
+    def get_latest_movie(self):
+        return self._movie_of_year(np.max)
+
+    def get_oldest_movie(self):
+        return self._movie_of_year(np.min)
+
+    def get_release_year_of_previous_movie(self, movie: Movie):
+        return self._neighbouring_release_year(movie, -1)
+
+    def get_release_year_of_next_movie(self, movie: Movie):
+        return self._neighbouring_release_year(movie, 1)
+
+    def get_movie_ids(self) -> List[int]:
+        return sorted(self._row_by_id)
+
+    def get_movie_by_index(self, index: int):
+        row = self._row_by_id.get(index)
+        return None if row is None else self._load_movies([row])[row]
+
+    def get_movie_indexes_for_genre(self, genre_name: str, order: str = 'id'):
+        if order not in GENRE_ORDERS:
+            raise ValueError("Unknown order " + str(order))
+
+        code = self._genre_names.code(genre_name)
+        if code is None:
+            return array('l')
+        if (code, order) not in self._genre_orders:
+            rows = self._get_genre_postings()[code]
+            ids = self._ids.values
+            if order == 'id':
+                movie_ids = np.sort(ids[rows])
+            elif order == 'year':
+                movie_ids = ids[rows[np.argsort(self._get_year_ranks()[rows], kind='stable')]]
+            else:
+                movie_ids = ids[rows[np.argsort(self._get_revenue_ranks()[rows], kind='stable')]]
+            self._genre_orders[(code, order)] = array('l', movie_ids[movie_ids != MISSING].tolist())
+        # A read-only view, so that callers can't change the cached movie ids
+        return memoryview(self._genre_orders[(code, order)]).toreadonly()
+
+    def get_facet_index(self) -> FacetIndex:
+        if self._facet_index is None:
+            ids = self._ids.values
+            movies = zip(ids.tolist(), [None if release_year == MISSING else release_year
+                                        for release_year in self._release_years.values.tolist()],
+                         self._runtimes.values.tolist(), self._revenues.values.tolist())
+            self._facet_index = FacetIndex.from_values(
+                movies, self._ids_by_name(self._genre_names, self._get_genre_postings()),
+                self._ids_by_name(self._actor_names, self._get_actor_postings()),
+                self._ids_by_name(self._director_names, self._get_director_postings()))
+        return self._facet_index
+
+    def get_movie_actors(self, movie: Movie) -> List[Actor]:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.actors
+
+    def get_movie_release_year(self, movie: Movie) -> int:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.release_year
+
+    def get_movie_description(self, movie: Movie) -> str:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.description
+
+    def get_movie_director(self, movie: Movie) -> Director:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.director
+
+    def get_movie_reviews(self, movie: Movie):
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.reviews
+
+    def get_movie_genres(self, movie: Movie) -> List[Genre]:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.genres
+
+    def get_movie_runtime_minutes(self, movie: Movie) -> int:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.runtime_minutes
+
+    def get_movies_by_index(self, ids_list):
+        return self._movies_at([self._row_by_id[movie_id] for movie_id in ids_list if movie_id in self._row_by_id])
+
+    def add_review(self, review: Review):
+        if isinstance(review, Review):
+            super().add_review(review)
+            username = review.review_author.username
+            if username not in self._passwords:
+                raise RepositoryException("Review author not in the repository")
+            row = self._movie_row(review.movie)
+            if row is None:
+                raise RepositoryException("Reviewed movie not in the repository")
+            self._add_review_values(username, row, review.review_text, review.rating, review.timestamp)
+
+    def add_review_values(self, username: str, movie_id: int, review_text: str, rating: int, timestamp):
+        """ Adds a review by the user named username of the movie with the given id, without building the User,
+            Movie and Review objects. Raises a RepositoryException if the user or the movie isn't in the repository.
+        """
+        if username not in self._passwords:
+            raise RepositoryException("Review author not in the repository")
+        row = self._row_by_id.get(movie_id)
+        if row is None:
+            raise RepositoryException("Reviewed movie not in the repository")
+        # As in Review, ratings outside 1 to 10 are not kept.
+        if type(rating) is not int or not 0 < rating <= 10:
+            rating = None
+        self._add_review_values(username, row, review_text, rating, timestamp)
+
+    def get_reviews(self) -> List[Review]:
+        reviews = dict()
+        self._load_movies(self._review_rows.values, reviews=reviews)
+        return [reviews[review_number] for review_number in sorted(reviews)]
+
+    def get_total_number_of_reviews(self) -> int:
+        return len(self._review_usernames)
+
+    def add_watchlist(self, watchlist: WatchList):
+        if isinstance(watchlist, WatchList):
+            schedule = watchlist.get_schedule()
+            self._watchlists.append([(self._movie_row(movie), schedule.get(movie)) for movie in watchlist
+                                     if self._movie_row(movie) is not None])
+
+    def get_watchlist(self) -> List[WatchList]:
+        movies = self._load_movies(row for entries in self._watchlists for row, _ in entries)
+        watchlists = list()
+        for entries in self._watchlists:
+            watchlist = WatchList()
+            for row, scheduled_date in entries:
+                watchlist.add_movie(movies[row], scheduled_date)
+            watchlists.append(watchlist)
+        return watchlists
+
+    def get_top_6_highest_revenue_movies(self) -> List[Movie]:
+        return self._movies_at(self._get_revenue_order()[:6])
+
+    def get_user_reviewed_movie(self, username: str) -> List[Movie]:
+        return self._movies_at(self._review_rows.values[self._reviews_by_username.get(username.lower(), [])])
+
+    def get_user_interested_genre_from_reviewed_movies(self, reviewed_movies: List[Movie]) -> List[Genre]:
+        genres = dict()
+        for movie in reviewed_movies:
+            for genre in movie.genres:
+                genres.setdefault(genre)
+        return list(genres)
+
+    def get_top_movie_by_genre(self, genre: Genre) -> Movie:
+        movie_ids = self.get_movie_indexes_for_genre(genre.genre_name, order='revenue')
+        if len(movie_ids) == 0:
+            return None
+        return self.get_movie_by_index(movie_ids[0])
+
+    def get_similar_movies_index(self) -> SimilarMoviesIndex:
+        if self._similar_movies_index is None:
+            movies = self._load_movies(range(len(self._titles)), with_reviews=False)
+            self._similar_movies_index = SimilarMoviesIndex.from_movies(movies.values())
+        return self._similar_movies_index
+
+    def get_similar_movies(self, movie: Movie, quantity: int) -> List[Movie]:
+        row = self._movie_row(movie)
+        if row is None:
+            return list()
+        similar_movies = self.get_similar_movies_index().similar_movies(int(self._ids.values[row]), quantity)
+        return self.get_movies_by_index(similar_movie_id for _, similar_movie_id in similar_movies)
+
+    def get_recommender(self) -> ItemItemRecommender:
+        if self._recommender is None:
+            ids = self._ids.values[self._review_rows.values].tolist()
+            self._recommender = ItemItemRecommender.from_ratings(
+                (username, movie_id, rating)
+                for username, movie_id, rating in zip(self._review_usernames, ids, self._review_ratings)
+                if rating is not None)
+        return self._recommender
+
+    def get_recommended_movies_for_user(self, username: str, quantity: int) -> List[Movie]:
+        movie_ids = self.get_recommender().recommend(username.lower(), quantity)
+        return self.get_movies_by_index(movie_ids)
+
+    def get_suggestion_for_user(self, username: str) -> List[Movie]:
+        reviewed_rows = self._reviewed_rows(username.lower())
+
+        # Count the reviewed movies of each genre, keeping the genres in the order they were first reviewed.
+        genre_affinities = dict()
+        for row in reviewed_rows:
+            for code in self._movie_codes(self._genre_offsets, self._genre_codes, self._added_genre_codes, row):
+                genre_affinities[code] = genre_affinities.get(code, 0) + 1
+
+        # As in MemoryRepository, each genre suggests its highest revenue movie that the user hasn't reviewed and
+        # that hasn't been suggested already.
+        postings = self._get_genre_postings()
+        revenue_ranks = self._get_revenue_ranks()
+        excluded = set(reviewed_rows)
+        suggestion = list()
+        for code in sorted(genre_affinities, key=lambda code: -genre_affinities[code]):
+            rows = postings[code]
+            for row in rows[np.argsort(revenue_ranks[rows], kind='stable')].tolist():
+                if row not in excluded:
+                    suggestion.append(row)
+                    excluded.add(row)
+                    break
+        return self._movies_at(suggestion)
+
+    def _load_movies(self, rows: Iterable[int], users: Dict[str, User] = None, actors: Dict[int, Actor] = None,
+                     directors: Dict[int, Director] = None, reviews: Dict[int, Review] = None,
+                     with_reviews: bool = True) -> Dict[int, Movie]:
+        # Returns new Movies for the given rows by row, complete with their director, actors, genres and reviews. As
+        # in DatabaseRepository, the users, actors and directors given (by username or by code) are used instead of
+        # new objects, the loaded reviews are attached to their users, and loaded reviews are also added to reviews
+        # by review number when given.
+        users = dict() if users is None else users
+        actors = dict() if actors is None else actors
+        directors = dict() if directors is None else directors
+        genres = self._get_genres()
+        ids, release_years = self._ids.values, self._release_years.values
+        runtimes, revenues, director_codes = self._runtimes.values, self._revenues.values, self._director_codes.values
+        ratings, votes, metascores = self._ratings.values, self._votes.values, self._metascores.values
+
+        movies = dict()
+        for row in dict.fromkeys(int(row) for row in rows):
+            release_year = int(release_years[row])
+            movie_id = int(ids[row])
+            movie = Movie(self._titles[row], None if release_year == MISSING else release_year,
+                          None if movie_id == MISSING else movie_id)
+            movie.set_description(self._descriptions[row] or "")
+            if runtimes[row] > 0:
+                movie.set_runtime_minutes(int(runtimes[row]))
+            movie.set_revenue(float(revenues[row]))
+            movie.set_rating(float(ratings[row]))
+            movie.set_votes(int(votes[row]))
+            movie.set_metascore(float(metascores[row]))
+
+            code = int(director_codes[row])
+            if code != MISSING:
+                if code not in directors:
+                    directors[code] = Director(self._director_names.names[code])
+                movie.set_director(directors[code])
+            for code in self._movie_codes(self._actor_offsets, self._actor_codes, self._added_actor_codes, row):
+                if code not in actors:
+                    actors[code] = Actor(self._actor_names.names[code])
+                movie.add_actor(actors[code])
+            for code in self._movie_codes(self._genre_offsets, self._genre_codes, self._added_genre_codes, row):
+                movie.add_genre(genres[code])
+
+            if with_reviews:
+                for review_number in self._reviews_by_row.get(row, ()):
+                    username = self._review_usernames[review_number]
+                    user = users.get(username)
+                    if user is None:
+                        user = users[username] = User(username, self._passwords[username])
+                    review = Review(user, movie, self._review_texts[review_number],
+                                    self._review_ratings[review_number], self._review_timestamps[review_number])
+                    user.add_review(review)
+                    movie.add_review(review)
+                    if reviews is not None:
+                        reviews[review_number] = review
+            movies[row] = movie
+        return movies
+
+    def _movies_at(self, rows) -> List[Movie]:
+        # The movies of the given rows, in the order of the rows
+        rows = [int(row) for row in rows]
+        movies = self._load_movies(rows)
+        return [movies[row] for row in rows]
+
+    def _movies_in_order(self, rows) -> List[Movie]:
+        # The movies of the given rows, ordered by release year then title
+        rows = np.asarray(rows, dtype=np.int64)
+        return self._movies_at(rows[np.argsort(self._get_year_ranks()[rows], kind='stable')])
+
+    def _movie_of_year(self, aggregate):
+        release_years = self._release_years.values
+        rows = np.flatnonzero(release_years != MISSING)
+        if len(rows) == 0:
+            return None
+        rows = rows[release_years[rows] == aggregate(release_years[rows])]
+        return self._movies_in_order(rows)[0]
+
+    def _neighbouring_release_year(self, movie: Movie, step: int):
+        release_years = self._get_release_years()
+        if movie.release_year not in release_years:
+            return None
+        index = bisect_left(release_years, movie.release_year) + step
+        return release_years[index] if 0 <= index < len(release_years) else None
+
+    def _get_genres(self) -> List[Genre]:
+        # The genres by code. Loaded movies share these Genres, which read their movies from the columns.
+        if self._genres is None:
+            self._genres = [_ColumnarGenre(name, self, code) for code, name in enumerate(self._genre_names.names)]
+        return self._genres
+
+    def _get_stored_movie(self, movie: Movie):
+        row = self._movie_row(movie)
+        return None if row is None else self._load_movies([row])[row]
+
+    def _movie_row(self, movie: Movie):
+        if not isinstance(movie, Movie):
+            return None
+        return self._row_by_key.get((movie.title, movie.release_year))
+
+    def _stored_rows(self, movies: Iterable[Movie]) -> List[int]:
+        rows = (self._movie_row(movie) for movie in movies)
+        return [row for row in rows if row is not None]
+
+    def _reviewed_rows(self, username: str) -> List[int]:
+        # The rows of the movies the user reviewed, in the order of their first reviews
+        review_rows = self._review_rows.values
+        return list(dict.fromkeys(int(review_rows[review_number])
+                                  for review_number in self._reviews_by_username.get(username, ())))
+
+    def _add_review_values(self, username: str, row: int, review_text: str, rating: int, timestamp):
+        review_number = len(self._review_usernames)
+        self._review_usernames.append(username)
+        self._review_rows.append(row)
+        self._review_texts.append(review_text)
+        self._review_ratings.append(rating)
+        self._review_timestamps.append(timestamp)
+        self._reviews_by_row.setdefault(row, list()).append(review_number)
+        self._reviews_by_username.setdefault(username, list()).append(review_number)
+
+        if self._recommender is not None and rating is not None:
+            self._recommender.add_rating(username, int(self._ids.values[row]), rating)
+
+    def _link(self, offsets: _Column, codes: _Column, added_codes: dict, movies: Iterable[Movie], code: int):
+        # Links an actor or genre to the stored movies among movies, after each movie's other actors or genres
+        for row in self._stored_rows(movies):
+            if code not in self._movie_codes(offsets, codes, added_codes, row):
+                added_codes.setdefault(row, list()).append(code)
+
+    @staticmethod
+    def _movie_codes(offsets: _Column, codes: _Column, added_codes: dict, row: int) -> List[int]:
+        offset_values = offsets.values
+        movie_codes = codes.values[offset_values[row]:offset_values[row + 1]].tolist()
+        return movie_codes + added_codes[row] if row in added_codes else movie_codes
+
+    @staticmethod
+    def _extend_codes(offsets: _Column, codes: _Column, dictionary: _Dictionary, names_of_movies: List[tuple]):
+        lengths = np.fromiter((len(names) for names in names_of_movies), dtype=np.int64, count=len(names_of_movies))
+        offsets.extend(offsets.values[-1] + np.cumsum(lengths))
+        codes.extend([dictionary.code(name, create=True) for names in names_of_movies for name in names])
+
+    def _movies_changed(self):
+        self._title_index = None
+        self._release_year_list = None
+        self._year_ranks = None
+        self._revenue_order = None
+        self._revenue_ranks = None
+        self._actor_postings = None
+        self._genre_postings = None
+        self._director_postings = None
+        self._genre_orders = dict()
+        self._actor_graph = None
+        self._facet_index = None
+        self._similar_movies_index = None
+        self._top_movies_index = None
+
+    def _get_title_index(self):
+        # Titles indexed by their n-grams, for case insensitive title searches, and the row of each indexed title (by
+        # document id)
+        if self._title_index is None:
+            title_index = TitleSearchIndex()
+            rows = [row for row, title in enumerate(self._titles) if title is not None]
+            for row in rows:
+                title_index.add_title(self._titles[row])
+            self._title_index = (title_index, np.array(rows, dtype=np.int64))
+        return self._title_index
+
+    def _get_release_years(self) -> List[int]:
+        # The distinct release years, from the earliest
+        if self._release_year_list is None:
+            release_years = self._release_years.values
+            self._release_year_list = np.unique(release_years[release_years != MISSING]).tolist()
+        return self._release_year_list
+
+    def _get_year_ranks(self) -> np.ndarray:
+        # The position of each row when the movies are ordered by release year then title
+        if self._year_ranks is None:
+            title_ranks = self._title_ranks()
+            self._year_ranks = _ranks(np.lexsort((title_ranks, self._release_years.values)))
+        return self._year_ranks
+
+    def _get_revenue_order(self) -> np.ndarray:
+        # The rows ordered by revenue (highest first), then by release year and title
+        if self._revenue_order is None:
+            self._revenue_order = np.lexsort((self._get_year_ranks(), -self._revenues.values))
+        return self._revenue_order
+
+    def _get_revenue_ranks(self) -> np.ndarray:
+        if self._revenue_ranks is None:
+            self._revenue_ranks = _ranks(self._get_revenue_order())
+        return self._revenue_ranks
+
+    def _title_ranks(self) -> np.ndarray:
+        titles = ["" if title is None else title for title in self._titles]
+        return _ranks(np.array(sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int64))
+
+    def _get_actor_postings(self) -> _Postings:
+        if self._actor_postings is None:
+            self._actor_postings = self._postings(self._actor_offsets, self._actor_codes, self._added_actor_codes,
+                                                  len(self._actor_names))
+        return self._actor_postings
+
+    def _get_genre_postings(self) -> _Postings:
+        if self._genre_postings is None:
+            self._genre_postings = self._postings(self._genre_offsets, self._genre_codes, self._added_genre_codes,
+                                                   len(self._genre_names))
+        return self._genre_postings
+
+    def _get_director_postings(self) -> _Postings:
+        if self._director_postings is None:
+            director_codes = self._director_codes.values
+            rows = np.flatnonzero(director_codes != MISSING)
+            self._director_postings = _Postings(rows, director_codes[rows], len(self._director_names))
+        return self._director_postings
+
+    @staticmethod
+    def _movie_entries(offsets: _Column, codes: _Column, added_codes: dict):
+        # The row and code of each actor or genre of each movie, ordered by row, and in the order of the movie's codes
+        # within a row
+        lengths = np.diff(offsets.values)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        positions = np.arange(len(rows)) - np.repeat(offsets.values[:-1], lengths)
+        added_rows = [row for row, row_codes in added_codes.items() for _ in row_codes]
+        added_positions = [lengths[row] + position for row, row_codes in added_codes.items()
+                           for position in range(len(row_codes))]
+        added = [code for row_codes in added_codes.values() for code in row_codes]
+
+        rows = np.concatenate((rows, np.array(added_rows, dtype=np.int64)))
+        positions = np.concatenate((positions, np.array(added_positions, dtype=np.int64)))
+        order = np.lexsort((positions, rows))
+        return rows[order], np.concatenate((codes.values, np.array(added, dtype=np.int64)))[order]
+
+    @staticmethod
+    def _postings(offsets: _Column, codes: _Column, added_codes: dict, number_of_codes: int) -> _Postings:
+        rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets.values))
+        added_rows = [row for row, row_codes in added_codes.items() for _ in row_codes]
+        added = [code for row_codes in added_codes.values() for code in row_codes]
+        return _Postings(np.concatenate((rows, np.array(added_rows, dtype=np.int64))),
+                         np.concatenate((codes.values, np.array(added, dtype=np.int64))), number_of_codes)
+
+    def _ids_by_name(self, dictionary: _Dictionary, postings: _Postings) -> Dict[str, List[int]]:
+        ids = self._ids.values
+        return {name: ids[postings[code]].tolist() for code, name in enumerate(dictionary.names)}
+
+
+def _ranks(order: np.ndarray) -> np.ndarray:
+    # The inverse of a permutation: the position of each element in order
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+
+def _movies(columns: MovieColumns):
+    # The movies of a chunk of movies.csv as Movie objects, linked to their director, actors and genres
+    for row in range(len(columns)):
+        movie = Movie(columns.titles[row], columns.release_years[row], columns.ids[row])
+        movie.set_description(columns.descriptions[row])
+        if columns.runtimes[row] > 0:
+            movie.set_runtime_minutes(columns.runtimes[row])
+        movie.set_revenue(columns.revenues[row])
+        movie.set_rating(columns.ratings[row])
+        movie.set_votes(columns.votes[row])
+        movie.set_metascore(columns.metascores[row])
+        if columns.directors[row] != "":
+            movie.set_director(Director(columns.directors[row]))
+        for actor_full_name in columns.actors[row]:
+            movie.add_actor(Actor(actor_full_name))
+        for genre_name in columns.genres[row]:
+            movie.add_genre(Genre(genre_name))
+        yield movie
+
+
+def populate(data_path: str, repo: ColumnarMemoryRepository, workers: int = None) -> LoadStatistics:
+    """ Loads the data files in data_path into repo, and returns the number of rows loaded from each file, the time
+        taken and the peak RSS. Large movie and review files are parsed by up to workers processes (by default, one
+        per CPU), and each chunk of movies is added to the columns at once.
+    """
+    statistics = LoadStatistics()
+
+    start = time.perf_counter()
+    number_of_movies = 0
+    for columns in parse_in_parallel(os.path.join(data_path, 'movies.csv'), movie_columns, workers):
+        repo.add_movie_columns(columns)
+        number_of_movies += len(columns)
+    statistics.add('movies.csv', number_of_movies, 0, time.perf_counter() - start, peak_rss())
+
+    start = time.perf_counter()
+    users = load_users(data_path, repo)
+    statistics.add('users.csv', len(users), 0, time.perf_counter() - start, peak_rss())
+
+    start = time.perf_counter()
+    number_of_reviews = 0
+    for reviews in parse_in_parallel(os.path.join(data_path, 'reviews.csv'), review_values, workers):
+        for user_id, movie_id, review_text, rating, timestamp in reviews:
+            repo.add_review_values(users[user_id].username, movie_id, review_text, rating, timestamp)
+        number_of_reviews += len(reviews)
+    statistics.add('reviews.csv', number_of_reviews, 0, time.perf_counter() - start, peak_rss())
+
+    # Build the derived indexes now that everything is loaded, as MemoryRepository's populate does
+    repo.get_actor_graph()
+    repo.get_facet_index()
+    repo.get_similar_movies_index()
+    repo.get_top_movies_index()
+    repo.get_recommender()
+    return statistics
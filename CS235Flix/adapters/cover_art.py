@@ -0,0 +1,201 @@
+import abc
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Iterable
+
+from CS235Flix.domainmodel.model import Movie
+
+cover_service = None
+
+logger = logging.getLogger(__name__)
+
+
+class CoverResolver(abc.ABC):
+
+    @abc.abstractmethod
+    def resolve(self, title: str, release_year: int):
+        """ Returns the URL of the cover image of the movie with the given title and release year.
+            Returns None if the movie has no known cover.
+        """
+        raise NotImplementedError
+
+
+class IMDbCoverResolver(CoverResolver):
+    # Looks covers up through the IMDbPY API. This makes network requests, so it is only ever called from the
+    # CoverService worker thread.
+    def __init__(self):
+        self._access = None
+
+    def resolve(self, title: str, release_year: int):
+        if self._access is None:
+            import imdb
+            self._access = imdb.IMDb()
+
+        possible_movies = self._access.search_movie(title)
+        for possible_movie in possible_movies:
+            if possible_movie.get('year') == release_year and possible_movie.get('cover url') is not None:
+                return possible_movie['cover url']
+        if len(possible_movies) > 0:
+            return possible_movies[0].get('cover url')
+        return None
+
+
+class CoverCache:
+    # Cover URLs keyed by movie id. When a path is given, the cache is read from that JSON file on creation, and save
+    # writes it back, so resolved covers survive restarts. Movies without a known cover are not cached (see
+    # CoverService); older cache files recorded them as null, and these are dropped when the file is read.
+    def __init__(self, path: str = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._covers = dict()
+        self._unsaved = False
+
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as infile:
+                    self._covers = {int(movie_id): url for movie_id, url in json.load(infile).items()
+                                    if url is not None}
+            except (OSError, ValueError):
+                # An unreadable cache is simply rebuilt.
+                self._covers = dict()
+
+    def __contains__(self, movie_id: int):
+        return movie_id in self._covers
+
+    def __len__(self):
+        return len(self._covers)
+
+    def get(self, movie_id: int):
+        return self._covers.get(movie_id)
+
+    def set(self, movie_id: int, cover_url):
+        with self._lock:
+            self._covers[movie_id] = cover_url
+            self._unsaved = True
+
+    def save(self):
+        """ Writes the covers set since the last save to the cache file, if there is one """
+        with self._lock:
+            if self._path is None or not self._unsaved:
+                return
+            covers = dict(self._covers)
+            self._unsaved = False
+
+        try:
+            self._save(covers)
+        except OSError:
+            # The covers are still cached in memory; try again with the next save.
+            logger.exception("Could not write the cover cache to %s", self._path)
+            with self._lock:
+                self._unsaved = True
+
+    def _save(self, covers: dict):
+        directory = os.path.dirname(self._path)
+        if directory != '':
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so that a crash never leaves a truncated cache behind. Each writer has its
+        # own temporary file, as several processes may share the cache file.
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory or None, prefix=os.path.basename(self._path),
+                                                      suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as outfile:
+                json.dump(covers, outfile)
+            os.replace(temporary_path, self._path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+
+class CoverService:
+    # Serves cover URLs from a CoverCache without ever blocking on the resolver. Movies whose covers are not cached
+    # yet are queued for a background worker thread, which resolves them and stores the results in the cache. The
+    # cache is saved when the queue is drained, and at most every save_seconds while it is being worked through.
+    #
+    # A movie whose cover could not be resolved (say, while IMDb is down) isn't queued again for retry_seconds, and a
+    # movie the resolver found no cover for isn't queued again for missing_seconds, as a cover may be added later.
+    def __init__(self, cache: CoverCache, resolver: CoverResolver, save_seconds: float = 5, retry_seconds: float = 300,
+                 missing_seconds: float = 24 * 60 * 60, clock=time.monotonic):
+        self._cache = cache
+        self._resolver = resolver
+        self._save_seconds = save_seconds
+        self._retry_seconds = retry_seconds
+        self._missing_seconds = missing_seconds
+        self._clock = clock
+        self._queue = queue.Queue()
+        self._pending = set()
+        # When each movie that could not be resolved, or has no cover, may be queued again, by movie id
+        self._retry_at = dict()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    @property
+    def cache(self) -> CoverCache:
+        return self._cache
+
+    def get_cover_url(self, movie_id: int, title: str, release_year: int):
+        """ Returns the cached cover URL of the movie, or None if it is not known (yet).
+            A movie that has not been resolved is queued for the background worker.
+        """
+        if movie_id in self._cache:
+            return self._cache.get(movie_id)
+        self._enqueue([(movie_id, title, release_year)])
+        return None
+
+    def prefetch(self, movies: Iterable[Movie]):
+        self._enqueue((movie.id, movie.title, movie.release_year) for movie in movies)
+
+    def _enqueue(self, movies):
+        with self._lock:
+            now = self._clock()
+            for movie_id, title, release_year in movies:
+                if movie_id in self._cache or movie_id in self._pending:
+                    continue
+                if now < self._retry_at.get(movie_id, now):
+                    continue
+                self._pending.add(movie_id)
+                self._queue.put((movie_id, title, release_year))
+
+            if self._worker is None and len(self._pending) > 0:
+                self._worker = threading.Thread(target=self._resolve_pending_covers, daemon=True)
+                self._worker.start()
+
+    def wait_for_prefetch(self):
+        self._queue.join()
+
+    def _resolve_pending_covers(self):
+        saved_at = self._clock()
+        while True:
+            with self._lock:
+                if self._queue.empty():
+                    # Let the next call to prefetch start a new worker.
+                    self._worker = None
+                    return
+                movie_id, title, release_year = self._queue.get()
+
+            try:
+                cover_url = self._resolver.resolve(title, release_year)
+                if cover_url is not None:
+                    self._cache.set(movie_id, cover_url)
+                else:
+                    with self._lock:
+                        self._retry_at[movie_id] = self._clock() + self._missing_seconds
+            except Exception:
+                # The resolver is unavailable; leave the movie uncached so that a later request retries it.
+                logger.warning("Could not resolve the cover of %s (%s)", title, release_year, exc_info=True)
+                with self._lock:
+                    self._retry_at[movie_id] = self._clock() + self._retry_seconds
+            finally:
+                # Save before the movie is done, so that the cache file is up to date once the queue is drained
+                if self._queue.empty() or self._clock() - saved_at >= self._save_seconds:
+                    self._cache.save()
+                    saved_at = self._clock()
+                with self._lock:
+                    self._pending.discard(movie_id)
+                self._queue.task_done()
@@ -0,0 +1,199 @@
+""" Loads the data files into an empty database in bulk.
+
+    Usage: python -m CS235Flix.adapters.database_loader path/to/datafiles database_uri [batch_size]
+"""
+
+import os
+import sys
+from datetime import datetime
+
+from CS235Flix.adapters.database_repository import metadata, make_engine, users_table, directors_table, \
+    actors_table, genres_table, movies_table, movie_actors_table, movie_genres_table, reviews_table
+from CS235Flix.adapters.load_statistics import LoadStatistics, timed
+from CS235Flix.adapters.memory_repository import read_csv_file, is_password_hash
+from CS235Flix.adapters.repository import RepositoryException
+
+BATCH_SIZE = 10000
+
+
+def load_database(data_path: str, engine, batch_size: int = BATCH_SIZE) -> LoadStatistics:
+    """ Loads movies.csv, users.csv and reviews.csv from data_path into the (empty) database of engine, and returns
+        the number of rows loaded from each file, the time taken and the peak RSS.
+
+        The files are read one row at a time and written batch_size rows at a time, in a single transaction, so a
+        load that fails leaves the database empty. Rows that can't be loaded, such as duplicate movies or reviews of
+        unknown movies, are skipped and counted.
+    """
+    metadata.create_all(engine)
+    statistics = LoadStatistics()
+    with engine.begin() as connection:
+        if connection.execute(movies_table.select().limit(1)).first() is not None:
+            raise RepositoryException("The database already holds movies")
+
+        movie_ids = timed(statistics, 'movies.csv', _load_movies, connection, data_path, batch_size)
+        user_ids = timed(statistics, 'users.csv', _load_users, connection, data_path, batch_size)
+        timed(statistics, 'reviews.csv', _load_reviews, connection, data_path, batch_size, movie_ids, user_ids)
+    return statistics
+
+
+class _BatchWriter:
+    # Buffers rows for several tables and inserts each table's rows with one executemany per batch. Tables are
+    # written in the order they were registered, so that rows are always inserted after the rows they refer to.
+    def __init__(self, connection, tables, batch_size: int):
+        self._connection = connection
+        self._batch_size = batch_size
+        self._rows = {table: list() for table in tables}
+
+    def add(self, table, row: dict):
+        self._rows[table].append(row)
+
+    def flush_if_full(self, table):
+        if len(self._rows[table]) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        for table, rows in self._rows.items():
+            if len(rows) > 0:
+                self._connection.execute(table.insert(), rows)
+                rows.clear()
+
+
+def _load_movies(connection, data_path: str, batch_size: int):
+    # Actors, directors and genres are numbered as they are first seen, so their rows can be written with the movies
+    # that refer to them without looking anything up in the database.
+    actor_ids = dict()
+    director_ids = dict()
+    genre_ids = dict()
+    movie_keys = set()
+    movie_ids = set()
+
+    writer = _BatchWriter(connection, [directors_table, actors_table, genres_table, movies_table,
+                                       movie_actors_table, movie_genres_table], batch_size)
+    number_of_rows = number_skipped = 0
+    for data_row in read_csv_file(os.path.join(data_path, 'movies.csv')):
+        movie_id = int(data_row[0])
+        title = data_row[1]
+        release_year = int(data_row[6])
+        if movie_id in movie_ids or (title, release_year) in movie_keys:
+            number_skipped += 1
+            continue
+        movie_ids.add(movie_id)
+        movie_keys.add((title, release_year))
+
+        director_id = None
+        if data_row[4] != "":
+            director_id = _entity_id(writer, directors_table, director_ids, data_row[4])
+
+        writer.add(movies_table, {
+            'id': movie_id, 'title': title, 'title_key': title.lower(), 'release_year': release_year,
+            'description': data_row[3], 'director_id': director_id, 'runtime_minutes': _to_number(int, data_row[7]),
+            'revenue': _to_number(float, data_row[10], default=0), 'rating': _to_number(float, data_row[8]),
+            'votes': _to_number(int, data_row[9]), 'metascore': _to_number(float, data_row[11])
+        })
+
+        linked_ids = set()
+        for actor_full_name in data_row[5].split(","):
+            actor_full_name = actor_full_name.strip()
+            if actor_full_name != "":
+                actor_id = _entity_id(writer, actors_table, actor_ids, actor_full_name)
+                if actor_id not in linked_ids:
+                    writer.add(movie_actors_table, {'movie_id': movie_id, 'actor_id': actor_id,
+                                                    'position': len(linked_ids)})
+                    linked_ids.add(actor_id)
+
+        linked_ids = set()
+        for genre_name in data_row[2].split(","):
+            genre_name = genre_name.strip()
+            if genre_name != "":
+                genre_id = genre_ids.get(genre_name)
+                if genre_id is None:
+                    genre_id = genre_ids[genre_name] = len(genre_ids) + 1
+                    writer.add(genres_table, {'id': genre_id, 'name': genre_name})
+                if genre_id not in linked_ids:
+                    writer.add(movie_genres_table, {'movie_id': movie_id, 'genre_id': genre_id,
+                                                    'position': len(linked_ids)})
+                    linked_ids.add(genre_id)
+
+        number_of_rows += 1
+        writer.flush_if_full(movies_table)
+    writer.flush()
+    return movie_ids, number_of_rows, number_skipped
+
+
+def _load_users(connection, data_path: str, batch_size: int):
+    # Maps the ids in users.csv to the ids of the stored users; a repeated username maps to the first user.
+    user_ids = dict()
+    stored_ids = dict()
+
+    writer = _BatchWriter(connection, [users_table], batch_size)
+    number_of_rows = number_skipped = 0
+    for data_row in read_csv_file(os.path.join(data_path, 'users.csv')):
+        user_name = data_row[1].lower()
+        if user_name in stored_ids:
+            user_ids[int(data_row[0])] = stored_ids[user_name]
+            number_skipped += 1
+            continue
+
+        password = unhashed_password = data_row[2]
+        if is_password_hash(password):
+            unhashed_password = None
+        else:
+            # A development data set with plain text passwords, which are hashed when each user is first retrieved;
+            # see migrate_users for hashing them in advance.
+            password = None
+        user_ids[int(data_row[0])] = stored_ids[user_name] = len(stored_ids) + 1
+        writer.add(users_table, {'id': stored_ids[user_name], 'user_name': user_name, 'password': password,
+                                 'unhashed_password': unhashed_password})
+
+        number_of_rows += 1
+        writer.flush_if_full(users_table)
+    writer.flush()
+    return user_ids, number_of_rows, number_skipped
+
+
+def _load_reviews(connection, data_path: str, batch_size: int, movie_ids, user_ids):
+    writer = _BatchWriter(connection, [reviews_table], batch_size)
+    number_of_rows = number_skipped = 0
+    for data_row in read_csv_file(os.path.join(data_path, 'reviews.csv')):
+        user_id = user_ids.get(int(data_row[1]))
+        movie_id = int(data_row[2])
+        if user_id is None or movie_id not in movie_ids:
+            number_skipped += 1
+            continue
+
+        # As in Review, ratings outside 1 to 10 are not kept.
+        rating = _to_number(int, data_row[4])
+        if rating is not None and not 0 < rating <= 10:
+            rating = None
+        writer.add(reviews_table, {'user_id': user_id, 'movie_id': movie_id, 'review_text': data_row[3],
+                                   'rating': rating, 'timestamp': datetime.fromisoformat(data_row[5])})
+
+        number_of_rows += 1
+        writer.flush_if_full(reviews_table)
+    writer.flush()
+    return None, number_of_rows, number_skipped
+
+
+def _entity_id(writer: _BatchWriter, table, entity_ids: dict, full_name: str) -> int:
+    # Returns the id of the actor or director, numbering (and writing) them when they are first seen
+    entity_id = entity_ids.get(full_name)
+    if entity_id is None:
+        entity_id = entity_ids[full_name] = len(entity_ids) + 1
+        writer.add(table, {'id': entity_id, 'full_name': full_name, 'name_key': full_name.casefold()})
+    return entity_id
+
+
+def _to_number(number_type, value: str, default=None):
+    try:
+        return number_type(value)
+    except ValueError:
+        return default
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        print(__doc__)
+        sys.exit(1)
+
+    engine = make_engine(sys.argv[2])
+    print(load_database(sys.argv[1], engine, *(int(argument) for argument in sys.argv[3:])))
@@ -0,0 +1,942 @@
+import math
+import time
+from array import array
+from typing import Dict, Iterable, List
+
+from sqlalchemy import MetaData, Table, Column, Integer, String, Text, Float, Date, DateTime, ForeignKey, \
+    UniqueConstraint, create_engine, inspect, select, func, and_
+from sqlalchemy.pool import QueuePool, StaticPool
+from werkzeug.security import generate_password_hash
+
+from CS235Flix.adapters.actor_graph import ActorGraph
+from CS235Flix.adapters.facets import FacetIndex
+from CS235Flix.adapters.recommender import ItemItemRecommender
+from CS235Flix.adapters.repository import AbstractRepository, RepositoryException, GENRE_ORDERS
+from CS235Flix.adapters.similar_movies import SimilarMoviesIndex
+from CS235Flix.adapters.title_search import title_relevance
+from CS235Flix.adapters.top_movies import TopMoviesIndex
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList
+
+# Largest number of ids bound in one IN clause; SQLite allows at most 999 parameters per statement by default.
+_CHUNK_SIZE = 500
+
+metadata = MetaData()
+
+users_table = Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('user_name', String(255), unique=True, nullable=False),
+    Column('password', String(255)),
+    # The plain text password of a user loaded from a development data set, until it is hashed into password when the
+    # user is first retrieved
+    Column('unhashed_password', String(255))
+)
+
+directors_table = Table(
+    'directors', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('full_name', String(255), unique=True, nullable=False),
+    # Case folded full name, for case insensitive searches
+    Column('name_key', String(255), nullable=False, index=True)
+)
+
+actors_table = Table(
+    'actors', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('full_name', String(255), unique=True, nullable=False),
+    Column('name_key', String(255), nullable=False, index=True)
+)
+
+genres_table = Table(
+    'genres', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('name', String(64), unique=True, nullable=False)
+)
+
+movies_table = Table(
+    'movies', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(255)),
+    # Lower case title, for case insensitive title searches
+    Column('title_key', String(255)),
+    Column('release_year', Integer, index=True),
+    Column('description', Text),
+    Column('director_id', ForeignKey('directors.id'), index=True),
+    Column('runtime_minutes', Integer),
+    Column('revenue', Float, index=True),
+    Column('rating', Float),
+    Column('votes', Integer),
+    Column('metascore', Float),
+    UniqueConstraint('title', 'release_year')
+)
+
+# The position columns keep the actors and genres of each movie in the order they were added to it.
+movie_actors_table = Table(
+    'movie_actors', metadata,
+    Column('movie_id', ForeignKey('movies.id'), primary_key=True),
+    Column('actor_id', ForeignKey('actors.id'), primary_key=True, index=True),
+    Column('position', Integer, nullable=False)
+)
+
+movie_genres_table = Table(
+    'movie_genres', metadata,
+    Column('movie_id', ForeignKey('movies.id'), primary_key=True),
+    Column('genre_id', ForeignKey('genres.id'), primary_key=True, index=True),
+    Column('position', Integer, nullable=False)
+)
+
+reviews_table = Table(
+    'reviews', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('user_id', ForeignKey('users.id'), nullable=False, index=True),
+    Column('movie_id', ForeignKey('movies.id'), nullable=False, index=True),
+    Column('review_text', Text),
+    Column('rating', Integer),
+    Column('timestamp', DateTime)
+)
+
+watchlists_table = Table(
+    'watchlists', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True)
+)
+
+watchlist_movies_table = Table(
+    'watchlist_movies', metadata,
+    Column('watchlist_id', ForeignKey('watchlists.id'), primary_key=True),
+    Column('movie_id', ForeignKey('movies.id'), primary_key=True),
+    Column('position', Integer, nullable=False),
+    Column('scheduled_date', Date)
+)
+
+
+def _data_version(connection) -> tuple:
+    # The number of rows in each table the derived data depends on, which only ever grow, and the sum of the movies'
+    # director ids, which changes when add_director directs stored movies. Any write the derived data depends on
+    # changes the version.
+    tables = (movies_table, actors_table, directors_table, genres_table, movie_actors_table, movie_genres_table,
+              reviews_table)
+    columns = [select([func.count()]).select_from(table).as_scalar() for table in tables]
+    columns.append(select([func.coalesce(func.sum(movies_table.c.director_id), 0)]).as_scalar())
+    return tuple(connection.execute(select(columns)).first())
+
+
+def make_engine(database_uri: str, pool_size: int = 5, pool_recycle: int = 3600, echo: bool = False):
+    """ Returns an engine for database_uri that keeps a pool of up to pool_size open connections (plus as many again
+        under load). Connections are checked before they are handed out and replaced after pool_recycle seconds, so
+        connections dropped by the database server are never used.
+    """
+    if database_uri in ('sqlite://', 'sqlite:///:memory:'):
+        # An in-memory database only lives as long as its connection, so every thread shares the one connection.
+        return create_engine(database_uri, echo=echo, poolclass=StaticPool,
+                             connect_args={'check_same_thread': False})
+    if database_uri.startswith('sqlite'):
+        return create_engine(database_uri, echo=echo, poolclass=QueuePool, pool_size=pool_size,
+                             max_overflow=pool_size, connect_args={'check_same_thread': False})
+    return create_engine(database_uri, echo=echo, pool_size=pool_size, max_overflow=pool_size,
+                         pool_recycle=pool_recycle, pool_pre_ping=True)
+
+
+def add_missing_columns(engine):
+    """ Adds the columns of the tables that a database made by an older version lacks. The new columns are empty. """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            existing_columns = set(column['name'] for column in inspector.get_columns(table.name))
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    connection.execute('ALTER TABLE {} ADD COLUMN {} {}'.format(
+                        table.name, column.name, column.type.compile(engine.dialect)))
+
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), _CHUNK_SIZE):
+        yield ids[start:start + _CHUNK_SIZE]
+
+
+class _DatabaseGenre(Genre):
+    # A Genre of a DatabaseRepository, shared by the movies it loads. It only holds the number of movies it classifies;
+    # the movies themselves are queried when they are asked for.
+    __slots__ = ('_repository', '_number_of_movies')
+
+    def __init__(self, genre_name: str, repository, number_of_movies: int):
+        super().__init__(genre_name)
+        self._repository = repository
+        self._number_of_movies = number_of_movies
+
+    @property
+    def classified_movies(self):
+        with self._repository._engine.connect() as connection:
+            movie_ids = self._repository._genre_movie_ids(connection, self.genre_name, 'id')
+            movies = self._repository._load_movies(connection, movie_ids, with_reviews=False)
+        return iter(movies[movie_id] for movie_id in movie_ids)
+
+    @property
+    def number_of_classified_movies(self):
+        return self._number_of_movies
+
+    def is_applied_to(self, movie):
+        return movie in list(self.classified_movies)
+
+
+class DatabaseRepository(AbstractRepository):
+    # A repository stored in a relational database through SQLAlchemy Core. Every query builds new domain objects
+    # from the rows it reads. Movies are always loaded in batches (see _load_movies), with one query each for the
+    # movies, their actors, their genres and their reviews however many movies are loaded, so converting a page of
+    # movies to dicts never issues a query per movie.
+    #
+    # The genres, the actor graph, the facet indexes, the similar movies, the top movies and the recommender are
+    # derived from the whole catalogue. Like in MemoryRepository, they are built on first use and discarded (or, for the
+    # recommender, updated) when this repository adds to the data they depend on.
+    #
+    # Other processes sharing the database, such as the other workers of a web server, write to it too. So before
+    # serving derived data, at most every check_seconds, the repository reads the version of the data (see
+    # _data_version) and discards everything derived if another process has changed it since.
+    def __init__(self, engine, check_seconds: float = 5):
+        self._engine = engine
+        metadata.create_all(engine)
+        add_missing_columns(engine)
+
+        self._check_seconds = check_seconds
+        self._checked_at = None
+        self._version = None
+        self._discard_derived_data()
+
+    def _discard_derived_data(self):
+        self._genres = None
+        self._number_of_genres = None
+        self._actor_graph = None
+        self._facet_index = None
+        self._similar_movies_index = None
+        self._top_movies_index = None
+        self._recommender = None
+
+    def _check_for_changes(self, connection=None):
+        # Discards the derived data if another process changed the database since it was derived
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self._check_seconds:
+            return
+        self._checked_at = now
+
+        if connection is None:
+            with self._engine.connect() as connection:
+                version = _data_version(connection)
+        else:
+            version = _data_version(connection)
+        if version != self._version:
+            self._discard_derived_data()
+            self._version = version
+
+    def _written(self, connection):
+        # Called after each write of this repository, which discards or updates the derived data itself, so that the
+        # write isn't taken for one by another process
+        if self._version is not None:
+            self._version = _data_version(connection)
+
+    def add_user(self, user: User):
+        if isinstance(user, User) and user.username is not None:
+            with self._engine.begin() as connection:
+                if self._user_id(connection, user.username) is None:
+                    connection.execute(users_table.insert().values(user_name=user.username, password=user.password))
+
+    def get_user(self, username) -> User:
+        # Only the username and password are loaded, which is all logging in and reviewing need. The user's reviews
+        # are loaded by get_user_reviews.
+        with self._engine.begin() as connection:
+            user = self._get_user(connection, username)
+            if user is not None and user.password is None:
+                unhashed_password = connection.execute(
+                    select([users_table.c.unhashed_password])
+                    .where(users_table.c.user_name == user.username)).scalar()
+                if unhashed_password is not None:
+                    user.set_password(generate_password_hash(unhashed_password))
+                    connection.execute(users_table.update().where(users_table.c.user_name == user.username)
+                                       .values(password=user.password, unhashed_password=None))
+            return user
+
+    def add_user_with_unhashed_password(self, user: User, password: str):
+        """ Adds a user whose password is hashed when the user is first retrieved """
+        # As in MemoryRepository, so that loading a development data set doesn't hash every password up front
+        if isinstance(user, User) and user.username is not None:
+            with self._engine.begin() as connection:
+                if self._user_id(connection, user.username) is None:
+                    connection.execute(users_table.insert().values(user_name=user.username, password=None,
+                                                                   unhashed_password=password))
+
+    def get_user_watched_movies(self, user: User) -> List[Movie]:
+        # Watched movies aren't stored, so they are only known to the given User object.
+        if self.check_user_existence_in_repo(user):
+            return user.watched_movies
+        return None
+
+    def get_user_reviews(self, user: User) -> List[Review]:
+        if isinstance(user, User) and user.username is not None:
+            with self._engine.connect() as connection:
+                stored_user = self._get_user(connection, user.username)
+                if stored_user is not None:
+                    # Load the movies the user reviewed, which attaches the user's reviews to the user.
+                    self._load_movies(connection, self._reviewed_movie_ids(connection, stored_user.username),
+                                      users={stored_user.username: stored_user})
+                    return stored_user.reviews
+        return None
+
+    def get_user_time_spent_watching_movies_minutes(self, user: User):
+        if self.check_user_existence_in_repo(user):
+            return user.time_spent_watching_movies_minutes
+        return None
+
+    def check_user_existence_in_repo(self, user: User) -> bool:
+        if isinstance(user, User) and user.username is not None:
+            with self._engine.connect() as connection:
+                return self._user_id(connection, user.username) is not None
+        return False
+
+    def add_actor(self, actor: Actor):
+        if isinstance(actor, Actor) and actor.actor_full_name is not None:
+            with self._engine.begin() as connection:
+                actor_id = self._person_id(connection, actors_table, actor.actor_full_name, create=True)
+                for movie_id in self._stored_movie_ids(connection, actor.played_movies):
+                    self._link(connection, movie_actors_table, movie_actors_table.c.actor_id, movie_id, actor_id)
+                self._written(connection)
+            self._actor_graph = None
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_actor(self, actor_full_name) -> Actor:
+        with self._engine.connect() as connection:
+            actor_id = self._person_id(connection, actors_table, actor_full_name)
+            if actor_id is None:
+                return None
+
+            # The movies the actor played in are loaded with this Actor, so their casts make up its colleagues.
+            actor = Actor(actor_full_name)
+            movie_ids = [movie_id for movie_id, in connection.execute(
+                select([movie_actors_table.c.movie_id]).where(movie_actors_table.c.actor_id == actor_id)
+                .order_by(movie_actors_table.c.movie_id))]
+            movies = self._load_movies(connection, movie_ids, actors={actor_id: actor})
+            for movie_id in movie_ids:
+                actor.add_played_movies(movies[movie_id])
+                for colleague in movies[movie_id].actors:
+                    if colleague is not actor:
+                        actor.add_actor_colleague(colleague)
+            return actor
+
+    def check_actor_existence_in_repo(self, actor: Actor) -> bool:
+        if isinstance(actor, Actor) and actor.actor_full_name is not None:
+            with self._engine.connect() as connection:
+                return self._person_id(connection, actors_table, actor.actor_full_name) is not None
+        return False
+
+    def get_actor_colleague(self, actor: Actor) -> List[Actor]:
+        if self.check_actor_existence_in_repo(actor):
+            return list(self.get_actor(actor.actor_full_name).actor_colleague)
+        return None
+
+    def get_total_number_of_actors(self) -> int:
+        return self._count(actors_table)
+
+    def get_actor_graph(self) -> ActorGraph:
+        self._check_for_changes()
+        if self._actor_graph is None:
+            with self._engine.connect() as connection:
+                actor_numbers = dict()
+                names = list()
+                for actor_id, full_name in connection.execute(
+                        select([actors_table.c.id, actors_table.c.full_name]).order_by(actors_table.c.id)):
+                    actor_numbers[actor_id] = len(names)
+                    names.append(full_name)
+
+                # Pairs of actors who played in the same movie, in the order of their movies and casts
+                actor, colleague = movie_actors_table.alias(), movie_actors_table.alias()
+                adjacency = [dict() for _ in names]
+                for actor_id, colleague_id in connection.execute(
+                        select([actor.c.actor_id, colleague.c.actor_id])
+                        .where(and_(actor.c.movie_id == colleague.c.movie_id,
+                                    actor.c.actor_id != colleague.c.actor_id))
+                        .order_by(actor.c.actor_id, colleague.c.movie_id, colleague.c.position)):
+                    adjacency[actor_numbers[actor_id]].setdefault(actor_numbers[colleague_id])
+            self._actor_graph = ActorGraph(names, [list(colleagues) for colleagues in adjacency])
+        return self._actor_graph
+
+    def add_director(self, director: Director):
+        if isinstance(director, Director) and director.director_full_name is not None:
+            with self._engine.begin() as connection:
+                director_id = self._person_id(connection, directors_table, director.director_full_name, create=True)
+                movie_ids = self._stored_movie_ids(connection, director.directed_movies)
+                for chunk in _chunks(movie_ids):
+                    connection.execute(movies_table.update().where(movies_table.c.id.in_(chunk))
+                                       .values(director_id=director_id))
+                self._written(connection)
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_director(self, director_full_name) -> Director:
+        with self._engine.connect() as connection:
+            director_id = self._person_id(connection, directors_table, director_full_name)
+            if director_id is None:
+                return None
+
+            director = Director(director_full_name)
+            movie_ids = [movie_id for movie_id, in connection.execute(
+                select([movies_table.c.id]).where(movies_table.c.director_id == director_id)
+                .order_by(movies_table.c.id))]
+            movies = self._load_movies(connection, movie_ids, directors={director_id: director})
+            for movie_id in movie_ids:
+                director.add_directed_movies(movies[movie_id])
+            return director
+
+    def check_director_existence_in_repo(self, director: Director):
+        if isinstance(director, Director) and director.director_full_name is not None:
+            with self._engine.connect() as connection:
+                return self._person_id(connection, directors_table, director.director_full_name) is not None
+        return False
+
+    def get_total_number_of_directors(self) -> int:
+        return self._count(directors_table)
+
+    def add_genre(self, genre: Genre):
+        if isinstance(genre, Genre) and genre.genre_name is not None:
+            with self._engine.begin() as connection:
+                genre_id = self._genre_id(connection, genre.genre_name, create=True)
+                for movie_id in self._stored_movie_ids(connection, genre.classified_movies):
+                    self._link(connection, movie_genres_table, movie_genres_table.c.genre_id, movie_id, genre_id)
+                self._written(connection)
+            self._genres = None
+            self._number_of_genres = None
+            self._facet_index = None
+            self._similar_movies_index = None
+
+    def get_genres(self) -> List[Genre]:
+        with self._engine.connect() as connection:
+            return list(self._get_genres(connection).values())
+
+    def get_total_number_of_genres_in_repo(self):
+        self._check_for_changes()
+        if self._number_of_genres is None:
+            self._number_of_genres = self._count(genres_table)
+        return self._number_of_genres
+
+    def check_genre_existence(self, genre: Genre) -> bool:
+        if isinstance(genre, Genre) and genre.genre_name is not None:
+            with self._engine.connect() as connection:
+                return self._genre_id(connection, genre.genre_name) is not None
+        return False
+
+    def add_movie(self, movie: Movie):
+        """ Adds a movie, along with its director, actors and genres """
+        if isinstance(movie, Movie):
+            with self._engine.begin() as connection:
+                if self._movie_id(connection, movie) is not None:
+                    return
+
+                director_id = None
+                if movie.director is not None and movie.director.director_full_name is not None:
+                    director_id = self._person_id(connection, directors_table, movie.director.director_full_name,
+                                                  create=True)
+                result = connection.execute(movies_table.insert().values(
+                    id=movie.id, title=movie.title, title_key=None if movie.title is None else movie.title.lower(),
+                    release_year=movie.release_year, description=movie.description, director_id=director_id,
+                    runtime_minutes=movie.runtime_minutes, revenue=movie.revenue, rating=movie.rating,
+                    votes=movie.votes, metascore=movie.metascore))
+                movie_id = result.inserted_primary_key[0]
+
+                for actor in movie.actors:
+                    if actor.actor_full_name is not None:
+                        actor_id = self._person_id(connection, actors_table, actor.actor_full_name, create=True)
+                        self._link(connection, movie_actors_table, movie_actors_table.c.actor_id, movie_id, actor_id)
+                for genre in movie.genres:
+                    if genre.genre_name is not None:
+                        genre_id = self._genre_id(connection, genre.genre_name, create=True)
+                        self._link(connection, movie_genres_table, movie_genres_table.c.genre_id, movie_id, genre_id)
+                self._written(connection)
+
+            self._genres = None
+            self._number_of_genres = None
+            self._actor_graph = None
+            self._facet_index = None
+            self._similar_movies_index = None
+            self._top_movies_index = None
+
+    def get_movie(self, title: str, release_year: int):
+        return self._get_stored_movie(Movie(title, release_year))
+
+    def check_movie_existence_in_repo(self, movie: Movie) -> bool:
+        if isinstance(movie, Movie):
+            with self._engine.connect() as connection:
+                return self._movie_id(connection, movie) is not None
+        return False
+
+    def get_movies_by_release_year(self, target_year: int) -> List[Movie]:
+        return self._query_movies(select([movies_table.c.id]).where(movies_table.c.release_year == target_year)
+                                  .order_by(movies_table.c.title))
+
+    def get_release_years(self) -> List[int]:
+        with self._engine.connect() as connection:
+            return [release_year for release_year, in connection.execute(
+                select([movies_table.c.release_year]).where(movies_table.c.release_year.isnot(None))
+                .distinct().order_by(movies_table.c.release_year))]
+
+    def get_movies_played_by_an_actor(self, actor_fullname: str) -> List[Movie]:
+        return self._query_movies(
+            select([movie_actors_table.c.movie_id])
+            .select_from(movie_actors_table.join(actors_table))
+            .where(actors_table.c.name_key == actor_fullname.strip().casefold())
+            .order_by(movie_actors_table.c.movie_id))
+
+    def get_movies_directed_by_a_director(self, director_fullname: str) -> List[Movie]:
+        return self._query_movies(
+            select([movies_table.c.id])
+            .select_from(movies_table.join(directors_table))
+            .where(directors_table.c.name_key == director_fullname.strip().casefold())
+            .order_by(movies_table.c.id))
+
+    def get_top_movies_index(self) -> TopMoviesIndex:
+        self._check_for_changes()
+        if self._top_movies_index is None:
+            with self._engine.connect() as connection:
+                rows = connection.execute(select([movies_table.c.id, movies_table.c.release_year,
+                                                  movies_table.c.rating, movies_table.c.votes,
+                                                  movies_table.c.metascore])).fetchall()
+            columns = [[math.nan if value is None else value for value in column] for column in zip(*rows)]
+            self._top_movies_index = TopMoviesIndex(*columns) if len(rows) > 0 else TopMoviesIndex([], [], [], [], [])
+        return self._top_movies_index
+
+    def get_top_movies(self, criterion: str, quantity: int, genre_name: str = None,
+                       release_year: int = None) -> List[Movie]:
+        movie_ids = None
+        if genre_name is not None:
+            with self._engine.connect() as connection:
+                movie_ids = self._genre_movie_ids(connection, genre_name, 'id')
+        return self.get_movies_by_index(
+            self.get_top_movies_index().top_movie_ids(criterion, quantity, movie_ids, release_year))
+
+    def search_movies_by_actor_and_director(self, actor_fullname: str, director_fullname: str):
+        return self._query_movies(
+            select([movies_table.c.id])
+            .select_from(movies_table.join(directors_table).join(movie_actors_table).join(actors_table))
+            .where(and_(actors_table.c.name_key == actor_fullname.strip().casefold(),
+                        directors_table.c.name_key == director_fullname.strip().casefold()))
+            .order_by(movies_table.c.id))
+
+    def search_movie_by_title(self, title: str, ranked: bool = False) -> List[Movie]:
+        query = title.lower()
+        with self._engine.connect() as connection:
+            title_keys = dict(connection.execute(
+                select([movies_table.c.id, movies_table.c.title_key])
+                .where(movies_table.c.title_key.contains(query, autoescape=True))).fetchall())
+            movies = self._load_movies(connection, list(title_keys))
+
+        if ranked:
+            return [movie for _, movie in sorted(
+                (title_relevance(query, title_keys[movie_id]), movie) for movie_id, movie in movies.items())]
+        return sorted(movies.values())
+
+    def get_total_number_of_movies_in_repo(self):
+        return self._count(movies_table)
+
+    def get_latest_movie(self):
+        movies = self._query_movies(select([movies_table.c.id])
+                                    .order_by(movies_table.c.release_year.desc(), movies_table.c.title).limit(1))
+        return movies[0] if len(movies) > 0 else None
+
+    def get_oldest_movie(self):
+        movies = self._query_movies(select([movies_table.c.id])
+                                    .order_by(movies_table.c.release_year, movies_table.c.title).limit(1))
+        return movies[0] if len(movies) > 0 else None
+
+    def get_release_year_of_previous_movie(self, movie: Movie):
+        return self._neighbouring_release_year(movie, func.max(movies_table.c.release_year),
+                                               movies_table.c.release_year < movie.release_year)
+
+    def get_release_year_of_next_movie(self, movie: Movie):
+        return self._neighbouring_release_year(movie, func.min(movies_table.c.release_year),
+                                               movies_table.c.release_year > movie.release_year)
+
+    def get_movie_ids(self) -> List[int]:
+        with self._engine.connect() as connection:
+            return [row[0] for row in connection.execute(select([movies_table.c.id]).order_by(movies_table.c.id))]
+
+    def get_movie_by_index(self, index: int):
+        with self._engine.connect() as connection:
+            return self._load_movies(connection, [index]).get(index)
+
+    def get_movie_indexes_for_genre(self, genre_name: str, order: str = 'id'):
+        with self._engine.connect() as connection:
+            return self._genre_movie_ids(connection, genre_name, order)
+
+    def get_facet_index(self) -> FacetIndex:
+        self._check_for_changes()
+        if self._facet_index is None:
+            with self._engine.connect() as connection:
+                movies = connection.execute(select([movies_table.c.id, movies_table.c.release_year,
+                                                    movies_table.c.runtime_minutes, movies_table.c.revenue]))
+                genres = self._movie_ids_by_name(connection, select(
+                    [genres_table.c.name, movie_genres_table.c.movie_id]
+                ).select_from(genres_table.join(movie_genres_table)))
+                actors = self._movie_ids_by_name(connection, select(
+                    [actors_table.c.full_name, movie_actors_table.c.movie_id]
+                ).select_from(actors_table.join(movie_actors_table)))
+                directors = self._movie_ids_by_name(connection, select(
+                    [directors_table.c.full_name, movies_table.c.id]
+                ).select_from(directors_table.join(movies_table)))
+                self._facet_index = FacetIndex.from_values(movies.fetchall(), genres, actors, directors)
+        return self._facet_index
+
+    def get_movie_actors(self, movie: Movie) -> List[Actor]:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.actors
+
+    def get_movie_release_year(self, movie: Movie) -> int:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.release_year
+
+    def get_movie_description(self, movie: Movie) -> str:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.description
+
+    def get_movie_director(self, movie: Movie) -> Director:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.director
+
+    def get_movie_reviews(self, movie: Movie):
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.reviews
+
+    def get_movie_genres(self, movie: Movie) -> List[Genre]:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.genres
+
+    def get_movie_runtime_minutes(self, movie: Movie) -> int:
+        stored_movie = self._get_stored_movie(movie)
+        return None if stored_movie is None else stored_movie.runtime_minutes
+
+    def get_movies_by_index(self, ids_list):
+        ids_list = list(ids_list)
+        with self._engine.connect() as connection:
+            movies = self._load_movies(connection, ids_list)
+        return [movies[movie_id] for movie_id in ids_list if movie_id in movies]
+
+    def add_review(self, review: Review):
+        if isinstance(review, Review):
+            super().add_review(review)
+            with self._engine.begin() as connection:
+                user_id = self._user_id(connection, review.review_author.username)
+                if user_id is None:
+                    raise RepositoryException("Review author not in the repository")
+                movie_id = self._movie_id(connection, review.movie)
+                if movie_id is None:
+                    raise RepositoryException("Reviewed movie not in the repository")
+                connection.execute(reviews_table.insert().values(
+                    user_id=user_id, movie_id=movie_id, review_text=review.review_text, rating=review.rating,
+                    timestamp=review.timestamp))
+                self._written(connection)
+
+            if self._recommender is not None and review.rating is not None:
+                self._recommender.add_rating(review.review_author.username, movie_id, review.rating)
+
+    def get_reviews(self) -> List[Review]:
+        with self._engine.connect() as connection:
+            movie_ids = [movie_id for movie_id, in connection.execute(
+                select([reviews_table.c.movie_id]).distinct())]
+            reviews = dict()
+            self._load_movies(connection, movie_ids, reviews=reviews)
+        return [reviews[review_id] for review_id in sorted(reviews)]
+
+    def get_total_number_of_reviews(self) -> int:
+        return self._count(reviews_table)
+
+    def add_watchlist(self, watchlist: WatchList):
+        if isinstance(watchlist, WatchList):
+            with self._engine.begin() as connection:
+                watchlist_id = connection.execute(watchlists_table.insert()).inserted_primary_key[0]
+                schedule = watchlist.get_schedule()
+                for position, movie in enumerate(watchlist):
+                    movie_id = self._movie_id(connection, movie)
+                    if movie_id is not None:
+                        connection.execute(watchlist_movies_table.insert().values(
+                            watchlist_id=watchlist_id, movie_id=movie_id, position=position,
+                            scheduled_date=schedule.get(movie)))
+
+    def get_watchlist(self) -> List[WatchList]:
+        with self._engine.connect() as connection:
+            watchlists = {watchlist_id: WatchList() for watchlist_id, in connection.execute(
+                select([watchlists_table.c.id]).order_by(watchlists_table.c.id))}
+            rows = connection.execute(
+                select([watchlist_movies_table.c.watchlist_id, watchlist_movies_table.c.movie_id,
+                        watchlist_movies_table.c.scheduled_date])
+                .order_by(watchlist_movies_table.c.watchlist_id, watchlist_movies_table.c.position)).fetchall()
+            movies = self._load_movies(connection, [row.movie_id for row in rows])
+        for row in rows:
+            watchlists[row.watchlist_id].add_movie(movies[row.movie_id], row.scheduled_date)
+        return list(watchlists.values())
+
+    def get_top_6_highest_revenue_movies(self) -> List[Movie]:
+        return self._query_movies(select([movies_table.c.id]).order_by(
+            movies_table.c.revenue.desc(), movies_table.c.release_year, movies_table.c.title).limit(6))
+
+    def get_user_reviewed_movie(self, username: str) -> List[Movie]:
+        with self._engine.connect() as connection:
+            movie_ids = [movie_id for movie_id, in connection.execute(
+                select([reviews_table.c.movie_id]).select_from(reviews_table.join(users_table))
+                .where(users_table.c.user_name == username.lower()).order_by(reviews_table.c.id))]
+            movies = self._load_movies(connection, movie_ids)
+        return [movies[movie_id] for movie_id in movie_ids]
+
+    def get_user_interested_genre_from_reviewed_movies(self, reviewed_movies: List[Movie]) -> List[Genre]:
+        genres = dict()
+        for movie in reviewed_movies:
+            for genre in movie.genres:
+                genres.setdefault(genre)
+        return list(genres)
+
+    def get_top_movie_by_genre(self, genre: Genre) -> Movie:
+        with self._engine.connect() as connection:
+            movie_ids = self._genre_movie_ids(connection, genre.genre_name, 'revenue', limit=1)
+            if len(movie_ids) == 0:
+                return None
+            return self._load_movies(connection, movie_ids)[movie_ids[0]]
+
+    def get_similar_movies_index(self) -> SimilarMoviesIndex:
+        self._check_for_changes()
+        if self._similar_movies_index is None:
+            with self._engine.connect() as connection:
+                movie_ids = [movie_id for movie_id, in connection.execute(select([movies_table.c.id]))]
+                movies = self._load_movies(connection, movie_ids, with_reviews=False)
+            self._similar_movies_index = SimilarMoviesIndex.from_movies(movies.values())
+        return self._similar_movies_index
+
+    def get_similar_movies(self, movie: Movie, quantity: int) -> List[Movie]:
+        with self._engine.connect() as connection:
+            movie_id = self._movie_id(connection, movie) if isinstance(movie, Movie) else None
+        if movie_id is None:
+            return list()
+        similar_movies = self.get_similar_movies_index().similar_movies(movie_id, quantity)
+        return self.get_movies_by_index(similar_movie_id for _, similar_movie_id in similar_movies)
+
+    def get_recommender(self) -> ItemItemRecommender:
+        self._check_for_changes()
+        if self._recommender is None:
+            with self._engine.connect() as connection:
+                ratings = connection.execute(
+                    select([users_table.c.user_name, reviews_table.c.movie_id, reviews_table.c.rating])
+                    .select_from(reviews_table.join(users_table))
+                    .where(reviews_table.c.rating.isnot(None)).order_by(reviews_table.c.id)).fetchall()
+            self._recommender = ItemItemRecommender.from_ratings(ratings)
+        return self._recommender
+
+    def get_recommended_movies_for_user(self, username: str, quantity: int) -> List[Movie]:
+        movie_ids = self.get_recommender().recommend(username.lower(), quantity)
+        return self.get_movies_by_index(movie_ids)
+
+    def get_suggestion_for_user(self, username: str) -> List[Movie]:
+        with self._engine.connect() as connection:
+            reviewed_movie_ids = self._reviewed_movie_ids(connection, username.lower())
+
+            # Count the reviewed movies of each genre, keeping the genres in the order they were first reviewed.
+            movie_genres = dict()
+            for movie_id, genre_name in connection.execute(
+                    select([movie_genres_table.c.movie_id, genres_table.c.name])
+                    .select_from(movie_genres_table.join(genres_table))
+                    .where(movie_genres_table.c.movie_id.in_(reviewed_movie_ids))
+                    .order_by(movie_genres_table.c.movie_id, movie_genres_table.c.position)):
+                movie_genres.setdefault(movie_id, list()).append(genre_name)
+            genre_affinities = dict()
+            for movie_id in reviewed_movie_ids:
+                for genre_name in movie_genres.get(movie_id, ()):
+                    genre_affinities[genre_name] = genre_affinities.get(genre_name, 0) + 1
+
+            # As in MemoryRepository, each genre suggests its highest revenue movie that the user hasn't reviewed and
+            # that hasn't been suggested already. Only that many of the genre's top movies can be excluded, so only
+            # that many (plus one) are fetched.
+            excluded = set(reviewed_movie_ids)
+            suggestion = list()
+            for genre_name in sorted(genre_affinities, key=lambda genre_name: -genre_affinities[genre_name]):
+                for movie_id in self._genre_movie_ids(connection, genre_name, 'revenue', limit=len(excluded) + 1):
+                    if movie_id not in excluded:
+                        suggestion.append(movie_id)
+                        excluded.add(movie_id)
+                        break
+
+            movies = self._load_movies(connection, suggestion)
+        return [movies[movie_id] for movie_id in suggestion]
+
+    def _load_movies(self, connection, movie_ids: Iterable[int], users: Dict[str, User] = None,
+                     actors: Dict[int, Actor] = None, directors: Dict[int, Director] = None,
+                     reviews: Dict[int, Review] = None, with_reviews: bool = True) -> Dict[int, Movie]:
+        # Returns the stored movies among movie_ids by id, complete with their director, actors, genres and reviews.
+        # The users, actors and directors given by id (or by username) are used instead of new objects, and the
+        # loaded reviews are attached to their users; loaded reviews are also added to reviews by id when given.
+        movie_ids = list(dict.fromkeys(movie_ids))
+        users = dict() if users is None else users
+        actors = dict() if actors is None else actors
+        directors = dict() if directors is None else directors
+        genres = self._get_genres(connection)
+
+        movies = dict()
+        director_ids = dict()
+        for chunk in _chunks(movie_ids):
+            for row in connection.execute(select([movies_table]).where(movies_table.c.id.in_(chunk))):
+                movie = Movie(row.title, row.release_year, row.id)
+                movie.set_description(row.description or "")
+                if row.runtime_minutes is not None and row.runtime_minutes > 0:
+                    movie.set_runtime_minutes(row.runtime_minutes)
+                if row.revenue is not None:
+                    movie.set_revenue(row.revenue)
+                movie.set_rating(row.rating)
+                movie.set_votes(row.votes)
+                movie.set_metascore(row.metascore)
+                movies[row.id] = movie
+                if row.director_id is not None:
+                    director_ids[row.id] = row.director_id
+        movie_ids = list(movies)
+
+        missing_ids = list(set(director_ids.values()).difference(directors))
+        for chunk in _chunks(missing_ids):
+            for director_id, full_name in connection.execute(
+                    select([directors_table.c.id, directors_table.c.full_name])
+                    .where(directors_table.c.id.in_(chunk))):
+                directors[director_id] = Director(full_name)
+        for movie_id, director_id in director_ids.items():
+            movies[movie_id].set_director(directors[director_id])
+
+        for chunk in _chunks(movie_ids):
+            for movie_id, actor_id, full_name in connection.execute(
+                    select([movie_actors_table.c.movie_id, actors_table.c.id, actors_table.c.full_name])
+                    .select_from(movie_actors_table.join(actors_table))
+                    .where(movie_actors_table.c.movie_id.in_(chunk))
+                    .order_by(movie_actors_table.c.movie_id, movie_actors_table.c.position)):
+                if actor_id not in actors:
+                    actors[actor_id] = Actor(full_name)
+                movies[movie_id].add_actor(actors[actor_id])
+
+            for movie_id, genre_id in connection.execute(
+                    select([movie_genres_table.c.movie_id, movie_genres_table.c.genre_id])
+                    .where(movie_genres_table.c.movie_id.in_(chunk))
+                    .order_by(movie_genres_table.c.movie_id, movie_genres_table.c.position)):
+                movies[movie_id].add_genre(genres[genre_id])
+
+            if with_reviews:
+                for row in connection.execute(
+                        select([reviews_table, users_table.c.user_name, users_table.c.password])
+                        .select_from(reviews_table.join(users_table))
+                        .where(reviews_table.c.movie_id.in_(chunk)).order_by(reviews_table.c.id)):
+                    user = users.get(row.user_name)
+                    if user is None:
+                        user = users[row.user_name] = User(row.user_name, row.password)
+                    review = Review(user, movies[row.movie_id], row.review_text, row.rating, row.timestamp)
+                    user.add_review(review)
+                    movies[row.movie_id].add_review(review)
+                    if reviews is not None:
+                        reviews[row.id] = review
+        return movies
+
+    def _get_genres(self, connection) -> Dict[int, Genre]:
+        # The genres by id, each with the number of movies it classifies. Loaded movies share these Genres.
+        self._check_for_changes(connection)
+        if self._genres is None:
+            counts = {genre_id: count for genre_id, count in connection.execute(
+                select([movie_genres_table.c.genre_id, func.count()]).group_by(movie_genres_table.c.genre_id))}
+            self._genres = {genre_id: _DatabaseGenre(name, self, counts.get(genre_id, 0))
+                            for genre_id, name in connection.execute(
+                                select([genres_table.c.id, genres_table.c.name]).order_by(genres_table.c.id))}
+        return self._genres
+
+    def _get_stored_movie(self, movie: Movie):
+        if not isinstance(movie, Movie):
+            return None
+        with self._engine.connect() as connection:
+            movie_id = self._movie_id(connection, movie)
+            if movie_id is None:
+                return None
+            return self._load_movies(connection, [movie_id])[movie_id]
+
+    def _query_movies(self, query) -> List[Movie]:
+        # Runs a query selecting movie ids, and returns the movies in the order of the query
+        with self._engine.connect() as connection:
+            movie_ids = [movie_id for movie_id, in connection.execute(query)]
+            movies = self._load_movies(connection, movie_ids)
+        return [movies[movie_id] for movie_id in movie_ids]
+
+    def _genre_movie_ids(self, connection, genre_name: str, order: str, limit: int = None):
+        if order not in GENRE_ORDERS:
+            raise ValueError("Unknown order " + str(order))
+
+        order_by = {
+            'id': [movies_table.c.id],
+            'year': [movies_table.c.release_year, movies_table.c.title],
+            'revenue': [movies_table.c.revenue.desc(), movies_table.c.release_year, movies_table.c.title]
+        }[order]
+        query = select([movies_table.c.id]) \
+            .select_from(movies_table.join(movie_genres_table).join(genres_table)) \
+            .where(genres_table.c.name == genre_name).order_by(*order_by).limit(limit)
+        return array('l', (movie_id for movie_id, in connection.execute(query)))
+
+    def _neighbouring_release_year(self, movie: Movie, aggregate, condition):
+        with self._engine.connect() as connection:
+            year_exists = connection.execute(select([movies_table.c.id]).where(
+                movies_table.c.release_year == movie.release_year).limit(1)).first()
+            if movie.release_year is None or year_exists is None:
+                return None
+            return connection.execute(select([aggregate]).where(condition)).scalar()
+
+    def _reviewed_movie_ids(self, connection, username: str) -> List[int]:
+        # The ids of the movies the user reviewed, in the order of their first reviews
+        return list(dict.fromkeys(movie_id for movie_id, in connection.execute(
+            select([reviews_table.c.movie_id]).select_from(reviews_table.join(users_table))
+            .where(users_table.c.user_name == username).order_by(reviews_table.c.id))))
+
+    @staticmethod
+    def _movie_ids_by_name(connection, query) -> Dict[str, List[int]]:
+        movie_ids = dict()
+        for name, movie_id in connection.execute(query):
+            movie_ids.setdefault(name, list()).append(movie_id)
+        return movie_ids
+
+    def _count(self, table) -> int:
+        with self._engine.connect() as connection:
+            return connection.execute(select([func.count()]).select_from(table)).scalar()
+
+    @staticmethod
+    def _get_user(connection, username: str):
+        row = connection.execute(select([users_table.c.user_name, users_table.c.password])
+                                 .where(users_table.c.user_name == username.lower())).first()
+        return None if row is None else User(row.user_name, row.password)
+
+    @staticmethod
+    def _user_id(connection, username: str):
+        return connection.execute(select([users_table.c.id]).where(users_table.c.user_name == username)).scalar()
+
+    @staticmethod
+    def _movie_id(connection, movie: Movie):
+        return connection.execute(select([movies_table.c.id]).where(and_(
+            movies_table.c.title == movie.title, movies_table.c.release_year == movie.release_year))).scalar()
+
+    def _stored_movie_ids(self, connection, movies: Iterable[Movie]) -> List[int]:
+        movie_ids = (self._movie_id(connection, movie) for movie in movies)
+        return [movie_id for movie_id in movie_ids if movie_id is not None]
+
+    @staticmethod
+    def _person_id(connection, table, full_name: str, create: bool = False):
+        person_id = connection.execute(select([table.c.id]).where(table.c.full_name == full_name)).scalar()
+        if person_id is None and create:
+            person_id = connection.execute(table.insert().values(
+                full_name=full_name, name_key=full_name.casefold())).inserted_primary_key[0]
+        return person_id
+
+    @staticmethod
+    def _genre_id(connection, genre_name: str, create: bool = False):
+        genre_id = connection.execute(select([genres_table.c.id]).where(genres_table.c.name == genre_name)).scalar()
+        if genre_id is None and create:
+            genre_id = connection.execute(genres_table.insert().values(name=genre_name)).inserted_primary_key[0]
+        return genre_id
+
+    @staticmethod
+    def _link(connection, table, column, movie_id: int, entity_id: int):
+        # Links an actor or genre to a movie, after the movie's other actors or genres
+        exists = connection.execute(select([table.c.movie_id]).where(
+            and_(table.c.movie_id == movie_id, column == entity_id))).first()
+        if exists is None:
+            position = connection.execute(
+                select([func.count()]).select_from(table).where(table.c.movie_id == movie_id)).scalar()
+            connection.execute(table.insert().values({table.c.movie_id: movie_id, column: entity_id,
+                                                      table.c.position: position}))
+
@@ -1,4 +1,3 @@
-
 import csv
 
 from CS235Flix.domainmodel.model import Movie, Actor, Genre, Director
@@ -8,12 +7,20 @@ class MovieFileCSVReader:
 
     def __init__(self, file_name: str):
         self.__file_name = file_name
+        # The distinct movies, actors, directors and genres in the order they first appear. Each list has a set
+        # alongside it, so that checking for a duplicate doesn't search the list.
         self.__dataset_of_movies = list()
         self.__dataset_of_actors = list()
         self.__dataset_of_directors = list()
         self.__dataset_of_genres = list()
+        self.__movies = set()
+        self.__actors = set()
+        self.__directors = set()
+        self.__genres = set()
 
         #--- Further Extension ---#
+        # One value for each row of the file, so the i-th value of every column belongs to the same row. A value
+        # that is missing or can't be read is None.
         self.__dataset_of_runtime = list()
         self.__dataset_of_description = list()
         self.__dataset_of_ratings = list()
@@ -23,86 +30,29 @@ class MovieFileCSVReader:
 
 
     def read_csv_file(self):
-        duplicated_genre = []
-        duplicated_actors = []
         with open(self.__file_name, mode='r', encoding='utf-8-sig') as csvfile:
             movie_file_reader = csv.DictReader(csvfile)
             for row in movie_file_reader:
                 # Append to the movie data set
                 title = row['Title']
                 year = int(row['Year'])
-                movie = Movie(title, year, 4)
-                if (movie not in self.__dataset_of_movies):
-                    self.__dataset_of_movies.append(movie)
-                # Store potential duplicated actors
-                duplicated_actors.append(row['Actors'].split(','))  # This is a list of list
-
-                # Store unique directors
-                director = Director(row['Director'])
-                if director not in self.__dataset_of_directors:
-                    self.__dataset_of_directors.append(director)
-
-                # Store potential duplicated genres
-                duplicated_genre.append(row['Genre'].split(','))
-
-                #Store description
-                description = row['Description']
-                self.__dataset_of_description.append(description)
-
-
-                # Store runtime
-                runtime = row['Runtime (Minutes)']
-                try:
-                    runtime = int(runtime)
-                    self.__dataset_of_runtime.append(runtime)
-                except ValueError:
-                    continue
-
-                # Store ratings
-                rating = row['Rating']
-                try:
-                    rating = float(rating)
-                    self.__dataset_of_ratings.append(rating)
-                except ValueError:
-                    continue
-
-                # Store votes
-                vote = row['Votes']
-                try:
-                    vote = int(vote)
-                    self.__dataset_of_votes.append(vote)
-                except ValueError:
-                    continue
-
-                # Store revenue
-                revenue = row["Revenue (Millions)"]
-                try:
-                    revenue = float(revenue)
-                    self.__dataset_of_revenue.append(revenue)
-                except ValueError:
-                    continue
-
-                # Store Metascore
-                meta_score = row["Metascore"]
-                try:
-                    meta_score = float(meta_score)
-                    self.__dataset_of_metadata.append(meta_score)
-                except ValueError:
-                    continue
-
-
-
-        for actor_list in duplicated_actors:
-            for current_actor in actor_list:
-                current_actor = Actor(current_actor)
-                if current_actor not in self.__dataset_of_actors:
-                    self.__dataset_of_actors.append(current_actor)
-
-        for genre_list in duplicated_genre:
-            for current_genre in genre_list:
-                current_genre = Genre(current_genre)
-                if current_genre not in self.__dataset_of_genres:
-                    self.__dataset_of_genres.append(current_genre)
+                movie = Movie(title, year, _to_number(int, row.get('id')))
+                _add_unique(self.__dataset_of_movies, self.__movies, movie)
+
+                # Store unique actors, directors and genres
+                for actor_full_name in row['Actors'].split(','):
+                    _add_unique(self.__dataset_of_actors, self.__actors, Actor(actor_full_name))
+                _add_unique(self.__dataset_of_directors, self.__directors, Director(row['Director']))
+                for genre_name in row['Genre'].split(','):
+                    _add_unique(self.__dataset_of_genres, self.__genres, Genre(genre_name))
+
+                # Store the remaining columns, keeping missing values so the columns stay aligned
+                self.__dataset_of_description.append(row['Description'])
+                self.__dataset_of_runtime.append(_to_number(int, row['Runtime (Minutes)']))
+                self.__dataset_of_ratings.append(_to_number(float, row['Rating']))
+                self.__dataset_of_votes.append(_to_number(int, row['Votes']))
+                self.__dataset_of_revenue.append(_to_number(float, row['Revenue (Millions)']))
+                self.__dataset_of_metadata.append(_to_number(float, row['Metascore']))
 
     @property
     def dataset_of_movies(self):
@@ -141,4 +91,18 @@ class MovieFileCSVReader:
 
     @property
     def dataset_of_metadata(self):
-        return self.__dataset_of_metadata
\ No newline at end of file
+        return self.__dataset_of_metadata
+
+
+def _add_unique(dataset: list, seen: set, entity):
+    # Actors, directors and genres without a name aren't equal to anything, not even themselves; they are left out
+    if entity == entity and entity not in seen:
+        seen.add(entity)
+        dataset.append(entity)
+
+
+def _to_number(number_type, value: str):
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
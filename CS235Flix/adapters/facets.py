@@ -0,0 +1,192 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+from CS235Flix.domainmodel.model import Movie, Genre, Actor, Director
+
+_NON_ZERO_BYTE = re.compile(b'[^\\x00]')
+
+
+def count_bits(bits: int) -> int:
+    # int.bit_count is only available from Python 3.10
+    if hasattr(bits, 'bit_count'):
+        return bits.bit_count()
+    return bin(bits).count('1')
+
+
+def iterate_bits(bits: int):
+    """ Yields the positions of the set bits of bits, lowest first """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    # The regular expression engine skips the runs of empty bytes in C.
+    for match in _NON_ZERO_BYTE.finditer(data):
+        byte = data[match.start()]
+        position = match.start() * 8
+        for offset in range(8):
+            if byte & (1 << offset):
+                yield position + offset
+
+
+def bits_from_ids(ids: List[int]) -> int:
+    """ Returns the bitset with the bits at the given positions set """
+    if len(ids) == 0:
+        return 0
+    # Setting the bits one by one in a bytearray avoids creating a new (large) integer for every position.
+    data = bytearray(max(ids) // 8 + 1)
+    for position in ids:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, 'little')
+
+
+class RangeFacet:
+    # Movies grouped into buckets of a numeric value (bucket = value // width). Each bucket holds a bitset of its
+    # movies, and its values in ascending order alongside the matching movie ids. A range takes the bitsets of the
+    # buckets it covers entirely, and bisects the values of the (at most two) buckets it only partly covers.
+    def __init__(self, width=1):
+        self._width = width
+        self._entries = dict()   # bucket -> list of (value, movie id) pairs
+        self._keys = list()      # sorted buckets
+        self._bits = dict()      # bucket -> bitset
+        self._values = dict()    # bucket -> sorted values
+        self._ids = dict()       # bucket -> movie ids in the order of the values
+        self._built = True
+
+    def add(self, movie_id: int, value):
+        if value is None:
+            return
+        self._entries.setdefault(value // self._width, list()).append((value, movie_id))
+        self._built = False
+
+    def select(self, low=None, high=None) -> int:
+        """ Returns the bitset of the movies whose value lies between low and high, both included.
+            A bound that is None is left open.
+        """
+        self._build()
+        start = 0 if low is None else bisect_left(self._keys, low // self._width)
+        end = len(self._keys) if high is None else bisect_right(self._keys, high // self._width)
+
+        bits = 0
+        partial_ids = list()
+        for bucket in self._keys[start:end]:
+            values = self._values[bucket]
+            if (low is None or low <= values[0]) and (high is None or values[-1] <= high):
+                bits |= self._bits[bucket]
+            else:
+                first = 0 if low is None else bisect_left(values, low)
+                last = len(values) if high is None else bisect_right(values, high)
+                partial_ids.extend(self._ids[bucket][first:last])
+        return bits | bits_from_ids(partial_ids)
+
+    def count_by_bucket(self, bits: int) -> Dict[int, int]:
+        self._build()
+        counts = dict()
+        for bucket in self._keys:
+            count = count_bits(self._bits[bucket] & bits)
+            if count > 0:
+                counts[bucket * self._width] = count
+        return counts
+
+    def _build(self):
+        if self._built:
+            return
+        for bucket, entries in self._entries.items():
+            entries.sort()
+            self._values[bucket] = [value for value, _ in entries]
+            self._ids[bucket] = [movie_id for _, movie_id in entries]
+            self._bits[bucket] = bits_from_ids(self._ids[bucket])
+        self._keys = sorted(self._entries)
+        self._built = True
+
+
+class FacetIndex:
+    # Bitmap indexes over the movies, with one bit per movie id: bit i of a bitset (a Python int) is set when the movie
+    # with id i has the facet value. Combining criteria is then a bitwise AND of a few integers.
+    def __init__(self):
+        self._all = 0
+        self._genres = dict()
+        self._actors = dict()
+        self._directors = dict()
+        self._years = RangeFacet()
+        self._runtimes = RangeFacet()
+        # Revenue is in millions of dollars
+        self._revenues = RangeFacet(width=10)
+
+    @classmethod
+    def from_entities(cls, movies: Iterable[Movie], genres: Iterable[Genre], actors: Iterable[Actor],
+                      directors: Iterable[Director]):
+        movies = [(movie.id, movie.release_year, movie.runtime_minutes, movie.revenue) for movie in movies
+                  if movie.id is not None]
+        return cls.from_values(
+            movies,
+            {genre.genre_name: cls._movie_ids(genre.classified_movies) for genre in genres},
+            {actor.actor_full_name: cls._movie_ids(actor.played_movies) for actor in actors
+             if actor.actor_full_name is not None},
+            {director.director_full_name: cls._movie_ids(director.directed_movies) for director in directors
+             if director.director_full_name is not None})
+
+    @classmethod
+    def from_values(cls, movies: Iterable[Tuple[int, int, int, float]], genres: Dict[str, List[int]],
+                    actors: Dict[str, List[int]], directors: Dict[str, List[int]]):
+        """ Builds the indexes from (movie id, release year, runtime minutes, revenue) tuples, and from the ids of
+            the movies of each genre name, actor name and director name
+        """
+        index = cls()
+        movies = list(movies)
+        index._all = bits_from_ids([movie_id for movie_id, _, _, _ in movies])
+        for movie_id, release_year, runtime_minutes, revenue in movies:
+            index._years.add(movie_id, release_year)
+            index._runtimes.add(movie_id, runtime_minutes)
+            index._revenues.add(movie_id, revenue)
+
+        for genre_name, movie_ids in genres.items():
+            index._genres[genre_name] = bits_from_ids(movie_ids)
+        for actor_full_name, movie_ids in actors.items():
+            index._actors[actor_full_name.casefold()] = bits_from_ids(movie_ids)
+        for director_full_name, movie_ids in directors.items():
+            index._directors[director_full_name.casefold()] = bits_from_ids(movie_ids)
+        return index
+
+    def select(self, genres: Iterable[str] = (), release_years=(None, None), runtimes=(None, None),
+               revenues=(None, None), actor: str = None, director: str = None) -> int:
+        """ Returns the bitset of the movies that are classified by all of the genres, played by the actor, directed
+            by the director, and whose release year, runtime and revenue lie in the given (low, high) ranges.
+            Criteria that are None or empty are ignored.
+        """
+        bits = self._all
+        for genre_name in genres:
+            bits &= self._genres.get(genre_name, 0)
+        if actor:
+            bits &= self._actors.get(actor.strip().casefold(), 0)
+        if director:
+            bits &= self._directors.get(director.strip().casefold(), 0)
+        if release_years != (None, None):
+            bits &= self._years.select(*release_years)
+        if runtimes != (None, None):
+            bits &= self._runtimes.select(*runtimes)
+        if revenues != (None, None):
+            bits &= self._revenues.select(*revenues)
+        return bits
+
+    def count(self, bits: int) -> int:
+        return count_bits(bits)
+
+    def count_by_genre(self, bits: int) -> Dict[str, int]:
+        return {genre_name: count_bits(genre_bits & bits) for genre_name, genre_bits in self._genres.items()}
+
+    def count_by_release_year(self, bits: int) -> Dict[int, int]:
+        return self._years.count_by_bucket(bits)
+
+    def movie_ids(self, bits: int, cursor: int = 0, quantity: int = None) -> List[int]:
+        """ Returns the ids of the movies in bits in ascending order, skipping the first cursor of them and returning
+            at most quantity ids
+        """
+        ids = list()
+        for position, movie_id in enumerate(iterate_bits(bits)):
+            if quantity is not None and len(ids) == quantity:
+                break
+            if position >= cursor:
+                ids.append(movie_id)
+        return ids
+
+    @staticmethod
+    def _movie_ids(movies: Iterable[Movie]) -> List[int]:
+        return [movie.id for movie in movies if movie.id is not None]
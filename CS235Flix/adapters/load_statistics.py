@@ -0,0 +1,70 @@
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # The resource module is only available on Unix.
+    resource = None
+
+
+def peak_rss() -> int:
+    """ Returns the peak resident set size of this process so far in bytes, or None where it can't be measured """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class LoadStatistics:
+    # The number of rows loaded and skipped from each file, the time taken and the peak resident set size of the
+    # process once the file was loaded
+    def __init__(self):
+        self._files = list()   # (file name, rows loaded, rows skipped, seconds, peak RSS)
+
+    def add(self, file_name: str, number_of_rows: int, number_skipped: int, seconds: float, peak_rss: int = None):
+        self._files.append((file_name, number_of_rows, number_skipped, seconds, peak_rss))
+
+    @property
+    def number_of_rows(self) -> int:
+        return sum(entry[1] for entry in self._files)
+
+    @property
+    def seconds(self) -> float:
+        return sum(entry[3] for entry in self._files)
+
+    @property
+    def peak_rss(self) -> int:
+        """ Returns the peak resident set size in bytes once all of the files were loaded, or None if unknown """
+        peaks = [entry[4] for entry in self._files if entry[4] is not None]
+        return max(peaks) if len(peaks) > 0 else None
+
+    def rows_per_second(self, file_name: str = None) -> float:
+        """ Returns the rows loaded per second from the given file, or from all of the files """
+        files = [entry for entry in self._files if file_name is None or entry[0] == file_name]
+        seconds = sum(entry[3] for entry in files)
+        number_of_rows = sum(entry[1] for entry in files)
+        return number_of_rows / seconds if seconds > 0 else float(number_of_rows)
+
+    def __str__(self):
+        lines = ["{}: {} rows ({} skipped) in {:.2f}s, {:.0f} rows/s{}".format(
+            file_name, number_of_rows, number_skipped, seconds, self.rows_per_second(file_name), _format_rss(peak))
+            for file_name, number_of_rows, number_skipped, seconds, peak in self._files]
+        lines.append("Total: {} rows in {:.2f}s, {:.0f} rows/s{}".format(
+            self.number_of_rows, self.seconds, self.rows_per_second(), _format_rss(self.peak_rss)))
+        return "\n".join(lines)
+
+
+def timed(statistics: LoadStatistics, file_name: str, load, *args):
+    """ Calls load(*args), which returns (result, rows loaded, rows skipped), records its statistics under file_name
+        and returns the result
+    """
+    start = time.perf_counter()
+    result, number_of_rows, number_skipped = load(*args)
+    statistics.add(file_name, number_of_rows, number_skipped, time.perf_counter() - start, peak_rss())
+    return result
+
+
+def _format_rss(peak):
+    return "" if peak is None else ", peak RSS {:.1f} MiB".format(peak / (1024 * 1024))
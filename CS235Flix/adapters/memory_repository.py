@@ -1,15 +1,32 @@
 import csv
+import hashlib
+import math
 import os
+import sys
+import time
+from array import array
 from datetime import datetime
-from typing import List
+from typing import Iterable, List
 
 from werkzeug.security import generate_password_hash
-from bisect import bisect_left, insort_left
-from CS235Flix.adapters.repository import AbstractRepository
+from bisect import bisect_left, bisect_right, insort_left
+from CS235Flix.adapters.actor_graph import ActorGraph
+from CS235Flix.adapters.facets import FacetIndex
+from CS235Flix.adapters.load_statistics import LoadStatistics, peak_rss
+from CS235Flix.adapters.parallel_csv import parse_in_parallel
+from CS235Flix.adapters.recommender import ItemItemRecommender
+from CS235Flix.adapters.similar_movies import SimilarMoviesIndex
+from CS235Flix.adapters.repository import AbstractRepository, GENRE_ORDERS
+from CS235Flix.adapters.title_search import TitleSearchIndex
+from CS235Flix.adapters.top_movies import TopMoviesIndex
 from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList, add_movie_attributes, \
     make_review
 
 
+# The number of rows of movies.csv that are parsed before they are loaded
+CHUNK_SIZE = 10000
+
+
 class MemoryRepository(AbstractRepository):
     # Movies are ordered by title then by release year
     def __init__(self):
@@ -22,60 +39,144 @@ class MemoryRepository(AbstractRepository):
         self._watchlists = list()
         self._movie_index = dict()
 
+        # Dictionary indexes over the entity lists above. Each entity type has an exact-match index and, where
+        # searches are case insensitive, a case-folded index. Both are kept up to date by the add_* methods.
+        self._user_index = dict()
+        self._actor_index = dict()
+        self._actor_index_casefold = dict()
+        self._director_index = dict()
+        self._director_index_casefold = dict()
+        self._genre_index = dict()
+        self._movie_title_index = dict()
+
+        # Movies ordered by revenue (highest first) alongside their sort keys. This is maintained by add_movie so
+        # that ranking queries never re-sort self._movies.
+        self._movies_by_revenue = list()
+        self._revenue_keys = list()
+
+        # Release year index: the distinct release years in ascending order, and the movies of each year ordered
+        # by title.
+        self._release_years = list()
+        self._movies_by_release_year = dict()
+
+        # Inverted n-gram index over movie titles, used by search_movie_by_title.
+        self._title_search_index = TitleSearchIndex()
+
+        # Collaboration graph of the actors, built on first use and discarded when an actor is added.
+        self._actor_graph = None
+
+        # Per-genre posting lists: for each genre name, the number of movies the lists were built from and an array
+        # of movie ids in each of GENRE_ORDERS. They are rebuilt when the genre's number of movies changes.
+        self._genre_postings = dict()
+
+        # Bitmap indexes for faceted browsing, built on first use and discarded when a movie, actor, director or genre
+        # is added.
+        self._facet_index = None
+
+        # Suggestion state for each username: the movies the user reviewed, the number of reviewed movies in each
+        # genre (in the order the genres were first reviewed), and the last suggestions along with the number of
+        # movies in the repository when they were made. All of it is updated by add_review.
+        self._reviewed_movies = dict()
+        self._genre_affinities = dict()
+        self._suggestions = dict()
+
+        # Collaborative filtering over the review ratings, built on first use and then updated by add_review.
+        self._recommender = None
+
+        # Plain text passwords of loaded users, by username. Hashing passwords is deliberately slow, so each one is
+        # only hashed when its user is first retrieved (normally to log in).
+        self._unhashed_passwords = dict()
+
+        # Content based similarity between movies, built on first use and discarded when a movie is added.
+        self._similar_movies_index = None
+
+        # Rankings by rating, votes, metascore and weighted rating, built on first use and discarded when a movie is
+        # added.
+        self._top_movies_index = None
+
     def add_user(self, user: User):
         if isinstance(user, User):
             self._users.append(user)
+            self._user_index.setdefault(user.username, user)
 
     def get_user(self, username) -> User:
-        return next((user for user in self._users if user.username == username.lower()), None)
+        user = self._user_index.get(username.lower())
+        if user is not None and user.username in self._unhashed_passwords:
+            user.set_password(generate_password_hash(self._unhashed_passwords.pop(user.username)))
+        return user
+
+    def add_user_with_unhashed_password(self, user: User, password: str):
+        """ Adds a user whose password is hashed when the user is first retrieved """
+        if isinstance(user, User):
+            self.add_user(user)
+            self._unhashed_passwords[user.username] = password
 
     def get_user_watched_movies(self, user: User) -> List[Movie]:
-        if user in self._users:
+        if self.check_user_existence_in_repo(user):
             return user.watched_movies
         return None
 
     def get_user_reviews(self, user: User) -> List[Review]:
-        if user in self._users:
+        if self.check_user_existence_in_repo(user):
             return user.reviews
         return None
 
     def get_user_time_spent_watching_movies_minutes(self, user: User):
-        if user in self._users:
+        if self.check_user_existence_in_repo(user):
             return user.time_spent_watching_movies_minutes
         return None
 
+    def check_user_existence_in_repo(self, user: User) -> bool:
+        if isinstance(user, User):
+            if user.username in self._user_index:
+                return True
+        return False
+
     def add_actor(self, actor: Actor):
         if isinstance(actor, Actor):
             self._actors.append(actor)
+            self._actor_index.setdefault(actor.actor_full_name, actor)
+            if actor.actor_full_name is not None:
+                self._actor_index_casefold.setdefault(actor.actor_full_name.casefold(), actor)
+            self._actor_graph = None
+            self._facet_index = None
 
     def get_actor(self, actor_full_name) -> Actor:
-        return next((actor for actor in self._actors if actor.actor_full_name == actor_full_name), None)
+        return self._actor_index.get(actor_full_name)
 
     def check_actor_existence_in_repo(self, actor: Actor) -> bool:
         if isinstance(actor, Actor):
-            if actor in self._actors:
+            if actor.actor_full_name in self._actor_index:
                 return True
         return False
 
     def get_actor_colleague(self, actor: Actor) -> List[Actor]:
-        if actor in self._actors:
+        if self.check_actor_existence_in_repo(actor):
             return actor.actor_colleague
         return None
 
     def get_total_number_of_actors(self) -> int:
         return len(self._actors)
 
+    def get_actor_graph(self) -> ActorGraph:
+        if self._actor_graph is None:
+            self._actor_graph = ActorGraph.from_actors(self._actors)
+        return self._actor_graph
+
     def add_director(self, director: Director):
         if isinstance(director, Director):
             self._directors.append(director)
+            self._director_index.setdefault(director.director_full_name, director)
+            if director.director_full_name is not None:
+                self._director_index_casefold.setdefault(director.director_full_name.casefold(), director)
+            self._facet_index = None
 
     def get_director(self, director_full_name) -> Director:
-        return next((director for director in self._directors if director.director_full_name == director_full_name),
-                    None)
+        return self._director_index.get(director_full_name)
 
     def check_director_existence_in_repo(self, director: Director):
         if isinstance(director, Director):
-            if director in self._directors:
+            if director.director_full_name in self._director_index:
                 return True
         return False
 
@@ -85,6 +186,8 @@ class MemoryRepository(AbstractRepository):
     def add_genre(self, genre: Genre):
         if isinstance(genre, Genre):
             self._genres.append(genre)
+            self._genre_index.setdefault(genre.genre_name, genre)
+            self._facet_index = None
 
     def get_genres(self) -> List[Genre]:
         return self._genres
@@ -94,7 +197,7 @@ class MemoryRepository(AbstractRepository):
 
     def check_genre_existence(self, genre: Genre) -> bool:
         if isinstance(genre, Genre):
-            if genre in self._genres:
+            if genre.genre_name in self._genre_index:
                 return True
         return False
 
@@ -103,21 +206,75 @@ class MemoryRepository(AbstractRepository):
             # self._movies.append(movie)
             insort_left(self._movies, movie)
             self._movie_index[movie.id] = movie
+            self._movie_title_index.setdefault((movie.title, movie.release_year), movie)
+
+            # Keep the revenue ranking sorted; ties are broken by release year then title.
+            revenue_key = (-movie.revenue, movie.release_year, movie.title)
+            position = bisect_right(self._revenue_keys, revenue_key)
+            self._revenue_keys.insert(position, revenue_key)
+            self._movies_by_revenue.insert(position, movie)
+
+            # Add the movie to the bucket of its release year, registering the year if it is new.
+            if movie.release_year not in self._movies_by_release_year:
+                insort_left(self._release_years, movie.release_year)
+                self._movies_by_release_year[movie.release_year] = list()
+            insort_left(self._movies_by_release_year[movie.release_year], movie)
+
+            self._title_search_index.add_movie(movie)
+            self._facet_index = None
+            self._similar_movies_index = None
+            self._top_movies_index = None
+
+    def add_movies(self, movies: Iterable[Movie]):
+        """ Adds many Movies at once, as when the repository is populated. Rather than inserting each movie in order
+            as add_movie does, which takes quadratic time over a bulk load, the movies are appended and each ordering
+            is sorted once at the end.
+        """
+        years = set()
+        for movie in movies:
+            if isinstance(movie, Movie):
+                self._movies.append(movie)
+                self._movie_index[movie.id] = movie
+                self._movie_title_index.setdefault((movie.title, movie.release_year), movie)
+                self._revenue_keys.append((-movie.revenue, movie.release_year, movie.title))
+                self._movies_by_revenue.append(movie)
+                if movie.release_year not in self._movies_by_release_year:
+                    self._release_years.append(movie.release_year)
+                    self._movies_by_release_year[movie.release_year] = list()
+                self._movies_by_release_year[movie.release_year].append(movie)
+                years.add(movie.release_year)
+                self._title_search_index.add_movie(movie)
+
+        # The sorts are stable, so movies with equal sort keys stay in the order they were added.
+        self._movies.sort()
+        order = sorted(range(len(self._revenue_keys)), key=self._revenue_keys.__getitem__)
+        self._revenue_keys = [self._revenue_keys[position] for position in order]
+        self._movies_by_revenue = [self._movies_by_revenue[position] for position in order]
+        self._release_years.sort()
+        for year in years:
+            self._movies_by_release_year[year].sort()
+
+        self._facet_index = None
+        self._similar_movies_index = None
+        self._top_movies_index = None
 
     def get_movie(self, title: str, release_year: int):
-        return next((movie for movie in self._movies if (movie.title == title and movie.release_year == release_year)),
-                    None)
+        return self._movie_title_index.get((title, release_year))
+
+    def check_movie_existence_in_repo(self, movie: Movie) -> bool:
+        if isinstance(movie, Movie):
+            if (movie.title, movie.release_year) in self._movie_title_index:
+                return True
+        return False
 
     def get_movies_by_release_year(self, target_year:int):
-        matching_movies = list()
-        for movie in self._movies:
-            if movie.release_year == target_year:
-                matching_movies.append(movie)
-        return matching_movies
+        return list(self._movies_by_release_year.get(target_year, list()))
+
+    def get_release_years(self) -> List[int]:
+        return list(self._release_years)
 
     def get_movies_played_by_an_actor(self, actor_fullname:str):
-        actor_fullname = actor_fullname.strip()
-        actor = next((actor for actor in self._actors if actor.actor_full_name.lower() == actor_fullname.lower()), None)
+        actor = self._actor_index_casefold.get(actor_fullname.strip().casefold())
         if actor is not None:
             played_movies = [movie for movie in actor.played_movies]
         else:
@@ -125,14 +282,24 @@ class MemoryRepository(AbstractRepository):
         return played_movies
 
     def get_movies_directed_by_a_director(self, director_fullname:str):
-        director_fullname = director_fullname.strip()
-        director = next((director for director in self._directors if director.director_full_name.lower() == director_fullname.lower()), None)
+        director = self._director_index_casefold.get(director_fullname.strip().casefold())
         if director is not None:
             directed_movies = [movie for movie in director.directed_movies]
         else:
             directed_movies = list()
         return directed_movies
 
+    def get_top_movies_index(self) -> TopMoviesIndex:
+        if self._top_movies_index is None:
+            self._top_movies_index = TopMoviesIndex.from_movies(self._movies)
+        return self._top_movies_index
+
+    def get_top_movies(self, criterion: str, quantity: int, genre_name: str = None,
+                       release_year: int = None) -> List[Movie]:
+        movie_ids = None if genre_name is None else self.get_movie_indexes_for_genre(genre_name)
+        return self.get_movies_by_index(
+            self.get_top_movies_index().top_movie_ids(criterion, quantity, movie_ids, release_year))
+
     def search_movies_by_actor_and_director(self, actor_fullname: str, director_fullname: str):
         actor_fullname = actor_fullname.strip()
         director_fullname = director_fullname.strip()
@@ -142,60 +309,47 @@ class MemoryRepository(AbstractRepository):
             output = [movie for movie in movies_played_by_actor if movie.director.director_full_name.lower() == director_fullname.lower()]
         return output
 
-    def search_movie_by_title(self, title: str) -> List[Movie]:
-        output = list()
-        for current_movie in self._movies:
-            if title.lower() in current_movie.title.lower():
-                output.append(current_movie)
-        return output
+    def search_movie_by_title(self, title: str, ranked: bool = False) -> List[Movie]:
+        return self._title_search_index.search(title, ranked=ranked)
 
     def get_total_number_of_movies_in_repo(self):
         return len(self._movies)
 
     def get_latest_movie(self):
         movie = None
-
-        if len(self._movies) > 0:
-            self._movies.sort(key=lambda x: x.release_year, reverse=True)
-            movie = self._movies[0]
+        if len(self._release_years) > 0:
+            movie = self._movies_by_release_year[self._release_years[-1]][0]
         return movie
 
     def get_oldest_movie(self):
         movie = None
-        if len(self._movies) > 0:
-            self._movies.sort(key=lambda x: x.release_year, reverse=False)
-            movie = self._movies[0]
+        if len(self._release_years) > 0:
+            movie = self._movies_by_release_year[self._release_years[0]][0]
         return movie
 
     def get_release_year_of_previous_movie(self, movie:Movie):
         previous_year = None
 
-        try:
-            index = self.movie_index(movie)
-            for stored_movie in reversed(self._movies[0:index]):
-                if stored_movie.release_year < movie.release_year:
-                    previous_year = stored_movie.release_year
-                    break
-        except ValueError:
-            pass
+        if movie.release_year in self._movies_by_release_year:
+            index = bisect_left(self._release_years, movie.release_year)
+            if index > 0:
+                previous_year = self._release_years[index - 1]
 
         return previous_year
 
-
     def get_release_year_of_next_movie(self, movie: Movie):
         next_year = None
 
-        try:
-            index = self.movie_index(movie)
-            for stored_movie in self._movies[index + 1:len(self._movies)]:
-                if stored_movie.release_year > movie.release_year:
-                    next_year = stored_movie.release_year
-                    break
-        except ValueError:
-            pass
+        if movie.release_year in self._movies_by_release_year:
+            index = bisect_left(self._release_years, movie.release_year)
+            if index + 1 < len(self._release_years):
+                next_year = self._release_years[index + 1]
 
         return next_year
 
+    def get_movie_ids(self) -> List[int]:
+        return sorted(movie_id for movie_id in self._movie_index if movie_id is not None)
+
     def get_movie_by_index(self, index: int):
         movie = None
 
@@ -205,53 +359,70 @@ class MemoryRepository(AbstractRepository):
             pass
         return movie
 
-    def get_movie_indexes_for_genre(self, genre_name: str):
-        genre = next((genre for genre in self._genres if genre.genre_name == genre_name), None)
-        if genre is not None:
-            movie_indexes = [movie.id for movie in genre.classified_movies]
-        else:
-            movie_indexes = list()
-        return movie_indexes
+    def get_movie_indexes_for_genre(self, genre_name: str, order: str = 'id'):
+        if order not in GENRE_ORDERS:
+            raise ValueError("Unknown order " + str(order))
+
+        genre = self._genre_index.get(genre_name)
+        if genre is None:
+            return array('l')
+
+        number_of_movies, postings = self._genre_postings.get(genre_name, (None, None))
+        if number_of_movies != genre.number_of_classified_movies:
+            movies = [movie for movie in genre.classified_movies if movie.id is not None]
+            postings = {
+                'id': array('l', sorted(movie.id for movie in movies)),
+                'year': array('l', (movie.id for movie in sorted(movies))),
+                'revenue': array('l', (movie.id for movie in sorted(
+                    movies, key=lambda movie: (-movie.revenue, movie.release_year, movie.title))))
+            }
+            self._genre_postings[genre_name] = (genre.number_of_classified_movies, postings)
+        # A read-only view, so that callers can't change the cached posting list
+        return memoryview(postings[order]).toreadonly()
+
+    def get_facet_index(self) -> FacetIndex:
+        if self._facet_index is None:
+            self._facet_index = FacetIndex.from_entities(self._movies, self._genres, self._actors, self._directors)
+        return self._facet_index
 
     def get_movie_actors(self, movie: Movie) -> List[Actor]:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.actors
         return None
 
     def get_movie_release_year(self, movie: Movie) -> int:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.release_year
         return None
 
     def get_movie_description(self, movie: Movie) -> str:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.description
         return None
 
     def get_movie_director(self, movie: Movie) -> Director:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.director
         return None
 
     def get_movie_reviews(self, movie: Movie):
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.reviews
         return None
 
     def get_movie_genres(self, movie: Movie) -> List[Genre]:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.genres
         return None
 
     def get_movie_runtime_minutes(self, movie: Movie) -> int:
-        if movie in self._movies:
+        if self.check_movie_existence_in_repo(movie):
             return movie.runtime_minutes
         return None
 
     def get_movies_by_index(self, index_list):
-        # strip out any ids in the index_list that don't represent the Movie indexes in the repository
-        existing_indexes = [index for index in index_list if index in self._movie_index]
-        movies = [self._movie_index[index] for index in existing_indexes]
+        # Look up each id, skipping any that don't represent the Movie indexes in the repository
+        movies = [self._movie_index[index] for index in index_list if index in self._movie_index]
         return movies
 
     def add_review(self, review: Review):
@@ -259,6 +430,19 @@ class MemoryRepository(AbstractRepository):
             super().add_review(review)
             self._reviews.append(review)
 
+            # Update the reviewer's genre affinities, counting each reviewed movie once.
+            username = review.review_author.username
+            reviewed_movies = self._reviewed_movies.setdefault(username, set())
+            if review.movie not in reviewed_movies:
+                reviewed_movies.add(review.movie)
+                genre_affinities = self._genre_affinities.setdefault(username, dict())
+                for genre in review.movie.genres:
+                    genre_affinities[genre] = genre_affinities.get(genre, 0) + 1
+                self._suggestions.pop(username, None)
+
+            if self._recommender is not None and review.rating is not None:
+                self._recommender.add_rating(username, review.movie.id, review.rating)
+
     def get_reviews(self) -> List[Review]:
         return self._reviews
 
@@ -272,20 +456,12 @@ class MemoryRepository(AbstractRepository):
     def get_watchlist(self) -> List[WatchList]:
         return self._watchlists
 
-    # Helper method to return movie index
-    def movie_index(self, movie: Movie):
-        index = bisect_left(self._movies, movie)
-        if index != len(self._movies) and self._movies[index].release_year == movie.release_year:
-            return index
-        raise ValueError
-
     def get_top_6_highest_revenue_movies(self):
-        # Sort the movies in the repository by revenue in descending order:
-        self._movies.sort(key=lambda x: x.revenue, reverse=True)
-        return self._movies[:6]  # Return the top 5
+        # The revenue ranking is maintained by add_movie, so the top movies are a prefix of it.
+        return self._movies_by_revenue[:6]
 
     def get_user_reviewed_movie(self, username:str):
-        user = self.get_user(username)
+        user = self._user_index.get(username.lower())
         movies = list()
         if user is not None:
             for current_review in user.reviews:
@@ -293,29 +469,61 @@ class MemoryRepository(AbstractRepository):
         return movies
 
     def get_user_interested_genre_from_reviewed_movies(self, reviewed_movies: List[Movie]) -> List[Genre]:
-        genre_list = list()
-        if len(reviewed_movies) > 0:
-            for movie in reviewed_movies:
-                for genre in movie.genres:
-                    if genre not in genre_list:
-                        genre_list.append(genre)
-        return genre_list
+        # A dict keeps the genres in the order they are first seen, without scanning the genres found so far.
+        genres = dict()
+        for movie in reviewed_movies:
+            for genre in movie.genres:
+                genres.setdefault(genre)
+        return list(genres)
 
     def get_top_movie_by_genre(self, genre: Genre) -> Movie:
-        movies_classified_by_genre = list(genre.classified_movies)
-        movies_classified_by_genre.sort(key=lambda x: x.revenue, reverse=True)
-        return movies_classified_by_genre[0]
+        movie_ids = self.get_movie_indexes_for_genre(genre.genre_name, order='revenue')
+        if len(movie_ids) == 0:
+            return None
+        return self._movie_index[movie_ids[0]]
+
+    def get_similar_movies_index(self) -> SimilarMoviesIndex:
+        if self._similar_movies_index is None:
+            self._similar_movies_index = SimilarMoviesIndex.from_movies(self._movies)
+        return self._similar_movies_index
+
+    def get_similar_movies(self, movie: Movie, quantity: int) -> List[Movie]:
+        if not self.check_movie_existence_in_repo(movie):
+            return list()
+        similar_movies = self.get_similar_movies_index().similar_movies(movie.id, quantity)
+        return self.get_movies_by_index(movie_id for _, movie_id in similar_movies)
+
+    def get_recommender(self) -> ItemItemRecommender:
+        if self._recommender is None:
+            self._recommender = ItemItemRecommender.from_reviews(self._reviews)
+        return self._recommender
+
+    def get_recommended_movies_for_user(self, username: str, quantity: int) -> List[Movie]:
+        movie_ids = self.get_recommender().recommend(username.lower(), quantity)
+        return self.get_movies_by_index(movie_ids)
 
     def get_suggestion_for_user(self, username: str) -> List[Movie]:
-        user_reviewed_movies = self.get_user_reviewed_movie(username)
-        user_interested_genres = self.get_user_interested_genre_from_reviewed_movies(user_reviewed_movies)
+        username = username.lower()
+        number_of_movies, suggestion = self._suggestions.get(username, (None, None))
+        if number_of_movies == len(self._movies):
+            return list(suggestion)
+
+        reviewed_movies = self._reviewed_movies.get(username, set())
+        genre_affinities = self._genre_affinities.get(username, dict())
+
+        # Visit the genres the user reviewed most first; the sort is stable, so ties stay in the order the genres
+        # were first reviewed. Each genre suggests its highest revenue movie that the user hasn't reviewed and that
+        # hasn't been suggested already.
         suggestion = list()
-        if len(user_interested_genres) > 0:
-            for genre in user_interested_genres:
-                suggested_movie = self.get_top_movie_by_genre(genre)
-                if suggested_movie not in suggestion:
-                    suggestion.append(suggested_movie)
-        return suggestion
+        for genre in sorted(genre_affinities, key=lambda genre: -genre_affinities[genre]):
+            for movie_id in self.get_movie_indexes_for_genre(genre.genre_name, order='revenue'):
+                movie = self._movie_index[movie_id]
+                if movie not in reviewed_movies and movie not in suggestion:
+                    suggestion.append(movie)
+                    break
+
+        self._suggestions[username] = (len(self._movies), suggestion)
+        return list(suggestion)
 
 
 def read_csv_file(filename: str):
@@ -332,116 +540,219 @@ def read_csv_file(filename: str):
             yield row
 
 
-def load_movies_actors_directors_genre_description(data_path: str, repo: MemoryRepository):
+class MovieColumns:
+    # A chunk of the rows of movies.csv, held in columns: the numbers in typed arrays, and the strings interned so
+    # that a name repeated across rows (a genre, actor or director) is stored once.
+    def __init__(self):
+        self.ids = array('l')
+        self.release_years = array('l')
+        self.runtimes = array('l')
+        self.revenues = array('d')
+        # A rating or metascore that is missing is NaN, and missing votes are -1
+        self.ratings = array('d')
+        self.votes = array('l')
+        self.metascores = array('d')
+        self.titles = list()
+        self.descriptions = list()
+        self.directors = list()
+        self.actors = list()   # a tuple of actor names for each movie
+        self.genres = list()   # a tuple of genre names for each movie
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, data_row: List[str]):
+        self.ids.append(int(data_row[0]))
+        self.titles.append(data_row[1].strip())
+        self.genres.append(_names(data_row[2]))
+        self.descriptions.append(data_row[3].strip())
+        self.directors.append(sys.intern(data_row[4].strip()))
+        self.actors.append(_names(data_row[5]))
+        self.release_years.append(int(data_row[6]))
+        self.runtimes.append(int(data_row[7]))
+        self.revenues.append(_to_number(float, data_row[10], 0))
+        self.ratings.append(_to_number(float, data_row[8], math.nan))
+        self.votes.append(_to_number(int, data_row[9], -1))
+        self.metascores.append(_to_number(float, data_row[11], math.nan))
+
+
+def _to_number(number_type, value: str, missing):
+    try:
+        return number_type(value)
+    except ValueError:
+        return missing
+
+
+def _names(value: str):
+    # The distinct, non-empty names of a comma separated list, in order
+    names = (sys.intern(name.strip()) for name in value.split(","))
+    return tuple(dict.fromkeys(name for name in names if name != ""))
+
+
+def read_movie_columns(filename: str, chunk_size: int = CHUNK_SIZE):
+    """ Yields the rows of a movies.csv file as MovieColumns of at most chunk_size rows """
+    with open(filename, encoding='utf-8-sig') as infile:
+        reader = csv.reader(infile)
+
+        # Skip the header line of the CSV file.
+        next(reader)
+
+        columns = MovieColumns()
+        for data_row in reader:
+            columns.append(data_row)
+            if len(columns) == chunk_size:
+                yield columns
+                columns = MovieColumns()
+        if len(columns) > 0:
+            yield columns
+
+
+def movie_columns(rows) -> MovieColumns:
+    """ Returns the given rows of movies.csv as MovieColumns """
+    columns = MovieColumns()
+    for data_row in rows:
+        columns.append(data_row)
+    return columns
+
+
+def load_movies_actors_directors_genre_description(data_path: str, repo: MemoryRepository,
+                                                   chunk_size: int = CHUNK_SIZE, workers: int = None) -> int:
+    # movies.csv is parsed a chunk at a time, and each movie is linked to its genres, actors and director as soon as
+    # it is created, so the memory used besides the loaded entities only depends on the size of the chunks. Genres,
+    # actors and directors are added to the repository when they are first seen.
+    #
+    # Unless workers is 1, the chunks are byte ranges of the file parsed by up to workers processes (see
+    # parallel_csv), and chunk_size is not used. They are linked in file order either way.
+    filename = os.path.join(data_path, "movies.csv")
+    if workers == 1:
+        chunks = read_movie_columns(filename, chunk_size)
+    else:
+        chunks = parse_in_parallel(filename, movie_columns, workers)
+
     genres = dict()
     actors = dict()
     directors = dict()
-    for data_row in read_csv_file(os.path.join(data_path, "movies.csv")):
-        movie_index = int(data_row[0])
-        title = data_row[1]
-        try:
-            movie_revenue = float(data_row[10])
-        except ValueError:
-            movie_revenue = 0
-        list_of_genre_names = data_row[2].split(",")
-        list_of_genres = [Genre(genre_name) for genre_name in list_of_genre_names]  # can have duplicate
-
-        movie_description = data_row[3]
-
-        director = Director(data_row[4])  # can have duplicate
-        list_of_actor_names = data_row[5].split(",")
-        list_of_actors = [Actor(actor_full_name) for actor_full_name in list_of_actor_names]  # can have duplicate
-
-        release_year = int(data_row[6])
-        runtime = int(data_row[7])
-
-        # Create Movie object
-        movie = Movie(
-            title=title,
-            release_year=release_year,
-            id=movie_index
-        )
-
-        movie.set_revenue(revenue=movie_revenue)
-
-        # Add movie to repo
-        repo.add_movie(movie)
-
-        # Add any new genres to repo
-        for genre in list_of_genres:
-            if genre not in genres.keys():
-                genres[genre] = list()
-            genres[genre].append(movie_index)
-
-        for actor in list_of_actors:
-            if actor not in actors.keys():
-                actors[actor] = list()
-            actors[actor].append(movie_index)
-
-        # Add any new directors to dict
-        if director not in directors:
-            directors[director] = list()
-        directors[director].append(movie_index)
-
-        # Connect the current movie with its attributes
-        add_movie_attributes(movie=movie,
-                             list_of_genres=list_of_genres,
-                             description=movie_description,
-                             list_of_actors=list_of_actors,
-                             director=director,
-                             runtime=runtime)
-
-    # Associate Genres with Movies and add them to the repository
-    for genre in genres.keys():
-        for current_movie_index in genres[genre]:
-            movie = repo.get_movie_by_index(current_movie_index)
-            movie.add_genre(genre)
-            genre.add_Movie(movie)
-        repo.add_genre(genre)
-
-    # Associate Actors with Movies and add them to the repository
-    for actor in actors.keys():
-        for current_movie_index in actors[actor]:
-            movie = repo.get_movie_by_index(current_movie_index)
-            movie.add_actor(actor)
-            actor.add_played_movies(movie)
-        repo.add_actor(actor)
-
-    # Associate Directors with Movies and add them to the repositor
-    for director in directors.keys():
-        for current_movie_index in directors[director]:
-            movie = repo.get_movie_by_index(current_movie_index)
-            movie.set_director(director)
-            director.add_directed_movies(movie)
-        repo.add_director(director)
+    # Added to the repository together once they are all linked (see MemoryRepository.add_movies)
+    movies = list()
+    for columns in chunks:
+        for row in range(len(columns)):
+            movie = Movie(title=columns.titles[row], release_year=columns.release_years[row], id=columns.ids[row])
+            movie.set_revenue(revenue=columns.revenues[row])
+            movie.set_rating(columns.ratings[row])
+            movie.set_votes(columns.votes[row])
+            movie.set_metascore(columns.metascores[row])
+            movies.append(movie)
+
+            for genre_name in columns.genres[row]:
+                genre = genres.get(genre_name)
+                if genre is None:
+                    genre = genres[genre_name] = Genre(genre_name)
+                    repo.add_genre(genre)
+                movie.add_genre(genre)
+                genre.add_Movie(movie)
+
+            list_of_actors = list()
+            for actor_full_name in columns.actors[row]:
+                actor = actors.get(actor_full_name)
+                if actor is None:
+                    actor = actors[actor_full_name] = Actor(actor_full_name)
+                    repo.add_actor(actor)
+                movie.add_actor(actor)
+                actor.add_played_movies(movie)
+                list_of_actors.append(actor)
+
+            director = None
+            director_full_name = columns.directors[row]
+            if director_full_name != "":
+                director = directors.get(director_full_name)
+                if director is None:
+                    director = directors[director_full_name] = Director(director_full_name)
+                    repo.add_director(director)
+                movie.set_director(director)
+                director.add_directed_movies(movie)
+
+            # Connect the current movie with its attributes
+            add_movie_attributes(movie=movie,
+                                 list_of_genres=list(movie.genres),
+                                 description=columns.descriptions[row],
+                                 list_of_actors=list_of_actors,
+                                 director=director,
+                                 runtime=columns.runtimes[row])
+    repo.add_movies(movies)
+    return len(movies)
+
+
+def is_password_hash(password: str) -> bool:
+    # Hashes made by werkzeug.security.generate_password_hash look like method$salt$hash, where the method is a
+    # hashlib algorithm optionally prefixed with pbkdf2: (and followed by an iteration count).
+    if password.count('$') != 2:
+        return False
+    method = password.split('$', 1)[0].split(':')
+    if method[0] == 'pbkdf2' and len(method) > 1:
+        return method[1] in hashlib.algorithms_available
+    return method[0] in hashlib.algorithms_available
 
 
 def load_users(datapath: str, repo: MemoryRepository):
     users = dict()
     for data_row in read_csv_file(os.path.join(datapath, 'users.csv')):
-        user = User(
-            user_name=data_row[1],
-            password=generate_password_hash(data_row[2])
-        )
-        repo.add_user(user)
+        password = data_row[2]
+        if is_password_hash(password):
+            user = User(user_name=data_row[1], password=password)
+            repo.add_user(user)
+        else:
+            # A development data set with plain text passwords; see migrate_users for hashing them in advance.
+            user = User(user_name=data_row[1], password=None)
+            repo.add_user_with_unhashed_password(user, password)
         users[int(data_row[0])] = user
     return users
 
 
-def load_reviews(data_path: str, repo: MemoryRepository, users):
-    for data_row in read_csv_file(os.path.join(data_path, 'reviews.csv')):
-        movie = repo.get_movie_by_index(int(data_row[2]))
-        user = users[int(data_row[1])]
-        review = make_review(review_text=data_row[3], user=user, movie=movie, rating=int(data_row[4]), timestamp=datetime.fromisoformat(data_row[5]))
-        repo.add_review(review)
+def review_values(rows) -> List[tuple]:
+    """ Returns (user id, movie id, review text, rating, timestamp) for the given rows of reviews.csv """
+    return [(int(data_row[1]), int(data_row[2]), data_row[3], int(data_row[4]), datetime.fromisoformat(data_row[5]))
+            for data_row in rows]
+
+
+def load_reviews(data_path: str, repo: MemoryRepository, users, workers: int = None) -> int:
+    number_of_reviews = 0
+    for reviews in parse_in_parallel(os.path.join(data_path, 'reviews.csv'), review_values, workers):
+        for user_id, movie_id, review_text, rating, timestamp in reviews:
+            movie = repo.get_movie_by_index(movie_id)
+            user = users[user_id]
+            review = make_review(review_text=review_text, user=user, movie=movie, rating=rating, timestamp=timestamp)
+            repo.add_review(review)
+        number_of_reviews += len(reviews)
+    return number_of_reviews
+
 
+def populate(data_path: str, repo: MemoryRepository, workers: int = None) -> LoadStatistics:
+    """ Loads the data files in data_path into repo, and returns the number of rows loaded from each file, the time
+        taken and the peak RSS. Large movie and review files are parsed by up to workers processes (by default, one
+        per CPU).
+    """
+    statistics = LoadStatistics()
 
-def populate(data_path: str, repo: MemoryRepository):
     # Load movies from movies.csv
-    load_movies_actors_directors_genre_description(data_path, repo)
+    start = time.perf_counter()
+    number_of_movies = load_movies_actors_directors_genre_description(data_path, repo, workers=workers)
+    statistics.add('movies.csv', number_of_movies, 0, time.perf_counter() - start, peak_rss())
 
     # Load users into the repository
+    start = time.perf_counter()
     users = load_users(data_path, repo)
+    statistics.add('users.csv', len(users), 0, time.perf_counter() - start, peak_rss())
 
     # Load reviews into the repository
-    load_reviews(data_path, repo, users)
+    start = time.perf_counter()
+    number_of_reviews = load_reviews(data_path, repo, users, workers)
+    statistics.add('reviews.csv', number_of_reviews, 0, time.perf_counter() - start, peak_rss())
+
+    # Build the actor collaboration graph, the facet indexes, the similar movies, the top movies and the recommender
+    # now that everything is loaded
+    repo.get_actor_graph()
+    repo.get_facet_index()
+    repo.get_similar_movies_index()
+    repo.get_top_movies_index()
+    repo.get_recommender()
+    return statistics
@@ -0,0 +1,48 @@
+""" Hashes the plain text passwords of a users.csv file, so that loading it doesn't have to.
+
+    Usage: python -m CS235Flix.adapters.migrate_users path/to/users.csv [path/to/output.csv]
+
+    The file is rewritten in place unless an output path is given. Passwords that are already hashed are kept.
+"""
+
+import csv
+import os
+import sys
+
+from werkzeug.security import generate_password_hash
+
+from CS235Flix.adapters.memory_repository import is_password_hash
+
+
+def migrate_users(source_path: str, target_path: str = None) -> int:
+    """ Writes the users of source_path to target_path (source_path by default) with every password hashed.
+        Returns the number of passwords that were hashed.
+    """
+    if target_path is None:
+        target_path = source_path
+
+    with open(source_path, encoding='utf-8-sig', newline='') as infile:
+        rows = [row for row in csv.reader(infile) if len(row) > 0]
+
+    number_hashed = 0
+    for row in rows[1:]:
+        password = row[2].strip()
+        if not is_password_hash(password):
+            row[2] = generate_password_hash(password)
+            number_hashed += 1
+
+    # Write to a temporary file first so that a crash never leaves a truncated users file behind.
+    temporary_path = target_path + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8', newline='') as outfile:
+        csv.writer(outfile, lineterminator='\n').writerows(rows)
+    os.replace(temporary_path, target_path)
+    return number_hashed
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print(__doc__)
+        sys.exit(1)
+
+    number_hashed = migrate_users(*sys.argv[1:])
+    print("Hashed {} password(s)".format(number_hashed))
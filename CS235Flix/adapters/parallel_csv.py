@@ -0,0 +1,93 @@
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+# The approximate number of bytes of a CSV file parsed by each task
+RANGE_SIZE = 4 * 1024 * 1024
+
+_BLOCK_SIZE = 1024 * 1024
+
+
+# Parses a large CSV file in several processes. The file is split into byte ranges that start and end on record
+# boundaries, each range is parsed by a worker process, and the results are returned in the order of the ranges, so
+# the outcome is the same as parsing the file in one go.
+#
+# A newline only ends a record when it isn't inside a quoted field, that is when the number of quotes before it is
+# even (an escaped quote is written as two quotes, which leaves the count's parity unchanged). Splitting counts the
+# quotes of the whole file, which only takes a pass over its bytes, and moves each split point to the end of the
+# first line that leaves the count even.
+
+
+def record_ranges(filename: str, range_size: int = RANGE_SIZE) -> List[Tuple[int, int]]:
+    """ Returns the (start, end) byte offsets of ranges of about range_size bytes that together cover the records of
+        the CSV file, after its header line
+    """
+    file_size = os.path.getsize(filename)
+    ranges = list()
+    with open(filename, 'rb') as infile:
+        quotes = _skip_record(infile, 0)
+        start = infile.tell()
+        while start < file_size:
+            target = start + range_size
+            while infile.tell() < min(target, file_size):
+                quotes += infile.read(min(_BLOCK_SIZE, target - infile.tell())).count(b'"')
+            # Finish the line the target falls in, and any further lines of a quoted field that spans lines
+            if target < file_size:
+                quotes = _skip_record(infile, quotes)
+            end = min(infile.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _skip_record(infile, quotes: int) -> int:
+    # Reads up to the end of the record the file position is in, and returns the updated count of quotes
+    while True:
+        line = infile.readline()
+        quotes += line.count(b'"')
+        if len(line) == 0 or quotes % 2 == 0:
+            return quotes
+
+
+def read_range(filename: str, start: int, end: int) -> Iterator[List[str]]:
+    """ Yields the rows of the CSV file between the byte offsets start and end, with white space stripped from
+        their fields
+    """
+    with open(filename, 'rb') as infile:
+        infile.seek(start)
+        text = infile.read(end - start).decode('utf-8')
+    for row in csv.reader(io.StringIO(text, newline='')):
+        yield [item.strip() for item in row]
+
+
+def parse_in_parallel(filename: str, parse: Callable[[Iterable[List[str]]], object], workers: int = None,
+                      range_size: int = None) -> Iterator[object]:
+    """ Yields parse(rows) for the rows of each range of the CSV file, in the order of the ranges.
+
+        The ranges are parsed by up to workers processes (by default, one per CPU), so parse must be a function
+        defined at the top level of a module. Ranges are about range_size bytes (by default, RANGE_SIZE), and at most
+        two ranges per worker are parsed ahead of the caller, which bounds the memory held by results not consumed
+        yet. A file that fits in one range is parsed in this process.
+    """
+    ranges = record_ranges(filename, range_size or RANGE_SIZE)
+    workers = workers or os.cpu_count() or 1
+    if len(ranges) == 1 or workers == 1:
+        for start, end in ranges:
+            yield parse(read_range(filename, start, end))
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(_parse_range, filename, start, end, parse))
+            if len(pending) == 2 * workers:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+def _parse_range(filename: str, start: int, end: int, parse):
+    return parse(read_range(filename, start, end))
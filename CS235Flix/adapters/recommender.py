@@ -0,0 +1,132 @@
+import math
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from CS235Flix.domainmodel.model import Review
+
+
+class ItemItemRecommender:
+    # Item-item collaborative filtering over review ratings. Two movies are similar when the same users rated them
+    # alike: their similarity is the cosine of their columns in the user x movie rating matrix. Each movie keeps its
+    # number_of_neighbours most similar movies, and a user is recommended the movies most similar to the movies they
+    # rated, weighted by their ratings.
+    #
+    # The neighbours are computed in one vectorised pass over a sparse matrix when the recommender is built. After
+    # that, each new rating only recomputes the similarities of the rated movie, from the ratings held in dicts.
+    def __init__(self, number_of_neighbours: int = 20, block_size: int = 1024):
+        self._number_of_neighbours = number_of_neighbours
+        self._block_size = block_size
+        self._user_ratings = dict()   # username -> {movie id: rating}
+        self._movie_ratings = dict()  # movie id -> {username: rating}
+        self._norms = dict()          # movie id -> length of the movie's column of ratings
+        self._neighbours = dict()     # movie id -> list of (similarity, movie id), most similar first
+
+    @classmethod
+    def from_reviews(cls, reviews: Iterable[Review], number_of_neighbours: int = 20, block_size: int = 1024):
+        ratings = ((review.review_author.username, review.movie.id, review.rating) for review in reviews
+                   if review.rating is not None and review.review_author is not None and review.movie is not None)
+        return cls.from_ratings(ratings, number_of_neighbours, block_size)
+
+    @classmethod
+    def from_ratings(cls, ratings: Iterable[Tuple[str, int, int]], number_of_neighbours: int = 20,
+                     block_size: int = 1024):
+        """ Builds a recommender from (username, movie id, rating) triples """
+        recommender = cls(number_of_neighbours, block_size)
+        for username, movie_id, rating in ratings:
+            # A later rating of the same movie replaces the user's earlier rating.
+            recommender._set_rating(username, movie_id, rating)
+        recommender._build_neighbours()
+        return recommender
+
+    @property
+    def number_of_ratings(self) -> int:
+        return sum(len(ratings) for ratings in self._user_ratings.values())
+
+    def neighbours(self, movie_id: int):
+        """ Returns (similarity, movie id) pairs for the movies most similar to the given movie, most similar first """
+        return list(self._neighbours.get(movie_id, ()))
+
+    def add_rating(self, username: str, movie_id: int, rating: int):
+        """ Records a rating and updates the similarities between the rated movie and the movies rated by the same
+            users. Other neighbour lists are only patched, so a movie that drops out of a neighbour list is not
+            replaced until the recommender is rebuilt.
+        """
+        self._set_rating(username, movie_id, rating)
+
+        dot_products = dict()
+        for rater, movie_rating in self._movie_ratings[movie_id].items():
+            for other_movie_id, other_rating in self._user_ratings[rater].items():
+                if other_movie_id != movie_id:
+                    dot_products[other_movie_id] = dot_products.get(other_movie_id, 0) + movie_rating * other_rating
+
+        similarities = [(dot_product / (self._norms[movie_id] * self._norms[other_movie_id]), other_movie_id)
+                        for other_movie_id, dot_product in dot_products.items()]
+        self._neighbours[movie_id] = self._top_neighbours(similarities)
+
+        for similarity, other_movie_id in similarities:
+            neighbours = [pair for pair in self._neighbours.get(other_movie_id, ()) if pair[1] != movie_id]
+            neighbours.append((similarity, movie_id))
+            self._neighbours[other_movie_id] = self._top_neighbours(neighbours)
+
+    def recommend(self, username: str, quantity: int) -> List[int]:
+        """ Returns the ids of up to quantity movies the user hasn't rated, best recommendation first """
+        rated_movies = self._user_ratings.get(username, dict())
+
+        scores = dict()
+        for movie_id, rating in rated_movies.items():
+            for similarity, neighbour_id in self._neighbours.get(movie_id, ()):
+                if neighbour_id not in rated_movies:
+                    scores[neighbour_id] = scores.get(neighbour_id, 0) + similarity * rating
+
+        return sorted(scores, key=lambda movie_id: (-scores[movie_id], movie_id))[:quantity]
+
+    def _set_rating(self, username: str, movie_id: int, rating: int):
+        self._user_ratings.setdefault(username, dict())[movie_id] = rating
+        movie_ratings = self._movie_ratings.setdefault(movie_id, dict())
+        movie_ratings[username] = rating
+        self._norms[movie_id] = math.sqrt(sum(value * value for value in movie_ratings.values()))
+
+    def _top_neighbours(self, similarities):
+        similarities = [pair for pair in similarities if pair[0] > 0]
+        similarities.sort(key=lambda pair: (-pair[0], pair[1]))
+        return similarities[:self._number_of_neighbours]
+
+    def _build_neighbours(self):
+        usernames = list(self._user_ratings)
+        movie_ids = np.array(list(self._movie_ratings), dtype=np.int64)
+        if len(usernames) == 0 or len(movie_ids) == 0:
+            return
+
+        user_rows = {username: row for row, username in enumerate(usernames)}
+        rows, columns, ratings = list(), list(), list()
+        for column, movie_id in enumerate(movie_ids.tolist()):
+            for username, rating in self._movie_ratings[movie_id].items():
+                rows.append(user_rows[username])
+                columns.append(column)
+                ratings.append(rating)
+
+        # Scale every movie column to unit length, so the product of two columns is their cosine similarity.
+        matrix = sparse.csr_matrix((np.array(ratings, dtype=np.float64), (rows, columns)),
+                                   shape=(len(usernames), len(movie_ids)))
+        norms = np.array([self._norms[movie_id] for movie_id in movie_ids.tolist()])
+        matrix = matrix @ sparse.diags(1 / norms)
+        movie_matrix = matrix.T.tocsr()
+
+        # Multiply a block of movies at a time, to bound the size of the intermediate similarity matrix.
+        for start in range(0, len(movie_ids), self._block_size):
+            block = (movie_matrix[start:start + self._block_size] @ matrix).tocsr()
+            for row in range(block.shape[0]):
+                first, last = block.indptr[row], block.indptr[row + 1]
+                columns = block.indices[first:last]
+                similarities = block.data[first:last]
+
+                keep = (columns != start + row) & (similarities > 0)
+                columns, similarities = columns[keep], similarities[keep]
+                if len(similarities) > self._number_of_neighbours:
+                    top = np.argpartition(-similarities, self._number_of_neighbours - 1)[:self._number_of_neighbours]
+                    columns, similarities = columns[top], similarities[top]
+
+                self._neighbours[int(movie_ids[start + row])] = self._top_neighbours(
+                    zip(similarities.tolist(), movie_ids[columns].tolist()))
@@ -1,9 +1,19 @@
 import abc
 from typing import List
+from CS235Flix.adapters.actor_graph import ActorGraph
+from CS235Flix.adapters.facets import FacetIndex
 from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList
 
 repo_instance = None
 
+# Orders in which get_movie_indexes_for_genre can return movie ids: by id, by release year then title, and by revenue
+# (highest first).
+GENRE_ORDERS = ('id', 'year', 'revenue')
+
+# Criteria by which get_top_movies can rank movies: the rating, the number of votes, the metascore and the weighted
+# rating (see top_movies.weighted_ratings).
+TOP_CRITERIA = ('rating', 'votes', 'metascore', 'weighted_rating')
+
 
 class RepositoryException(Exception):
 
@@ -26,6 +36,11 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def check_user_existence_in_repo(self, user: User) -> bool:
+        """ Returns True if the given user exists in the repository, otherwise returns False """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_user_watched_movies(self, user:User) -> List[Movie]:
         """ Returns a list of movies that had been watched by the given user
@@ -82,6 +97,13 @@ class AbstractRepository(abc.ABC):
         """ Returns the number of Actors in the repository """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_actor_graph(self) -> ActorGraph:
+        """ Returns the collaboration graph of the Actors in the repository, in which two actors are connected if
+            they played in the same movie
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_director(self, director:Director):
         """ Adds a director to the repository """
@@ -137,6 +159,11 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def check_movie_existence_in_repo(self, movie: Movie) -> bool:
+        """ Returns True if the given movie exists in the repository, otherwise returns False """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movies_by_release_year(self, target_year: int) -> List[Movie]:
         """ Return a list of Movies tha were released in the target_year
@@ -145,6 +172,13 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_release_years(self) -> List[int]:
+        """ Returns the distinct release years of the Movies in the repository, in ascending order.
+            Returns an empty list if the repository is empty.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movies_played_by_an_actor(self, actor_fullname:str) -> List[Movie]:
         """ Returns a list of movies played by the actor.
@@ -165,6 +199,16 @@ class AbstractRepository(abc.ABC):
         """ Returns a list of the top 5 highest revenue movies in the repository """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_top_movies(self, criterion: str, quantity: int, genre_name: str = None,
+                       release_year: int = None) -> List[Movie]:
+        """ Returns up to quantity Movies with the highest values of criterion, one of TOP_CRITERIA, the highest first
+            Only movies classified by genre_name and released in release_year are returned when they are given, and
+            movies without a value for the criterion never are.
+            Raises a ValueError for an unknown criterion
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def search_movies_by_actor_and_director(self, actor_fullname: str, director_name: str):
         """ Returns a list of movies played by a specific actor AND directed by the specific director
@@ -174,8 +218,9 @@ class AbstractRepository(abc.ABC):
 
 
     @abc.abstractmethod
-    def search_movie_by_title(self, title: str) -> List[Movie]:
-        """ Returns a list of movies that matches the title
+    def search_movie_by_title(self, title: str, ranked: bool = False) -> List[Movie]:
+        """ Returns a list of movies whose titles contain title, ignoring case
+            The movies are ordered by release year and title, or by relevance to title when ranked is True
             Returns an empty list if no matched movie title found
         """
         raise NotImplementedError
@@ -219,6 +264,13 @@ class AbstractRepository(abc.ABC):
         """ Returns the total number of movies in the repository """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_movie_ids(self) -> List[int]:
+        """ Returns the ids of all the Movies in the repository, from the lowest.
+            Ids need not be contiguous.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movie_by_index(self, index:int):
         """ Returns a Movie with the given index
@@ -227,9 +279,18 @@ class AbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_movie_indexes_for_genre(self, genre_name:str):
-        """ Returns a list of movie indexes representing Movies that are classified by the given genre_name
-            If there are no movie are classified by the given genre name then the method returns an empty list
+    def get_movie_indexes_for_genre(self, genre_name:str, order: str = 'id'):
+        """ Returns a sequence of movie indexes representing Movies that are classified by the given genre_name
+            The indexes are ordered by movie id, by release year then title (order='year'), or by revenue from the
+            highest (order='revenue'). The sequence may be read-only.
+            If there are no movie are classified by the given genre name then the method returns an empty sequence
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_facet_index(self) -> FacetIndex:
+        """ Returns bitmap indexes over the Movies in the repository by genre, actor, director, release year, runtime
+            and revenue, for combining several criteria in one query
         """
         raise NotImplementedError
 
@@ -337,11 +398,28 @@ class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
     def get_top_movie_by_genre(self, genre:Genre) -> Movie:
-        """ Returnes a movie with the highest revenue classified by the genre """
+        """ Returnes a movie with the highest revenue classified by the genre
+            Returns None if no movie is classified by the genre
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_similar_movies(self, movie: Movie, quantity: int) -> List[Movie]:
+        """ Returns up to quantity Movies whose descriptions, genres, director and actors are most like those of the
+            given movie, the most similar first. Returns an empty list if the movie isn't in the repository.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_recommended_movies_for_user(self, username: str, quantity: int) -> List[Movie]:
+        """ Returns up to quantity movies the user hasn't reviewed, that are rated similarly by the users who rated
+            the movies the user reviewed. Returns an empty list if there are no such movies.
+        """
         raise NotImplementedError
 
     @abc.abstractmethod
     def get_suggestion_for_user(self, username: str) -> List[Movie]:
-        """ Returns a list of movies recommend for the user
+        """ Returns a list of movies recommend for the user, based on the genres of the movies the user reviewed
+            Movies the user has already reviewed are never recommended
         """
         raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,95 @@
+import re
+from typing import Iterable, List
+
+import numpy as np
+from scipy import sparse
+
+from CS235Flix.domainmodel.model import Movie
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Words too common in descriptions to say anything about a movie
+_STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he', 'her', 'his', 'in', 'into', 'is',
+    'it', 'its', 'of', 'on', 'or', 'she', 'that', 'the', 'their', 'them', 'they', 'this', 'to', 'was', 'when', 'who',
+    'with',
+])
+
+
+def movie_terms(movie: Movie) -> List[str]:
+    """ Returns the terms describing a movie: the words of its description, and one term for each of its genres, its
+        director and its actors. Names are kept whole so that, for example, two actors sharing a first name don't
+        make their movies similar.
+    """
+    terms = [word for word in _WORD.findall(movie.description.lower()) if word not in _STOP_WORDS]
+    terms.extend('genre:' + genre.genre_name.lower() for genre in movie.genres if genre.genre_name is not None)
+    if movie.director is not None and movie.director.director_full_name is not None:
+        terms.append('director:' + movie.director.director_full_name.lower())
+    terms.extend('actor:' + actor.actor_full_name.lower() for actor in movie.actors
+                 if actor.actor_full_name is not None)
+    return terms
+
+
+class SimilarMoviesIndex:
+    # Content based similarity between movies. Each movie is a TF-IDF vector over its terms (see movie_terms), scaled
+    # to unit length, so the similarity of two movies is the product of their vectors. The number_of_neighbours most
+    # similar movies of every movie are computed once, by multiplying one block of movies at a time with the whole
+    # matrix, and queries only look them up.
+    def __init__(self, number_of_neighbours: int = 10, block_size: int = 1024):
+        self._number_of_neighbours = number_of_neighbours
+        self._block_size = block_size
+        self._neighbours = dict()   # movie id -> list of (similarity, movie id), most similar first
+
+    @classmethod
+    def from_movies(cls, movies: Iterable[Movie], number_of_neighbours: int = 10, block_size: int = 1024):
+        index = cls(number_of_neighbours, block_size)
+        movies = [movie for movie in movies if movie.id is not None]
+        if len(movies) > 0:
+            index._build_neighbours(movies)
+        return index
+
+    def similar_movies(self, movie_id: int, quantity: int = None):
+        """ Returns (similarity, movie id) pairs for the movies most similar to the given movie, most similar first.
+            Returns an empty list for an unknown movie.
+        """
+        return list(self._neighbours.get(movie_id, ()))[:quantity]
+
+    def _build_neighbours(self, movies: List[Movie]):
+        vocabulary = dict()
+        rows, columns = list(), list()
+        for row, movie in enumerate(movies):
+            for term in movie_terms(movie):
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+
+        # Term counts, weighted by the (smoothed) inverse document frequency of each term.
+        counts = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(movies), len(vocabulary)))
+        counts.sum_duplicates()
+        document_frequencies = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = np.log((1 + len(movies)) / (1 + document_frequencies)) + 1
+        matrix = counts @ sparse.diags(idf)
+
+        lengths = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        lengths[lengths == 0] = 1
+        matrix = (sparse.diags(1 / lengths) @ matrix).tocsr()
+        transposed = matrix.T.tocsc()
+
+        movie_ids = np.array([movie.id for movie in movies], dtype=np.int64)
+        for start in range(0, len(movies), self._block_size):
+            block = (matrix[start:start + self._block_size] @ transposed).tocsr()
+            for row in range(block.shape[0]):
+                first, last = block.indptr[row], block.indptr[row + 1]
+                neighbours = block.indices[first:last]
+                similarities = block.data[first:last]
+
+                keep = (neighbours != start + row) & (similarities > 0)
+                neighbours, similarities = neighbours[keep], similarities[keep]
+                if len(similarities) > self._number_of_neighbours:
+                    # Keep every movie tied with the last of the top neighbours, so ties are broken by movie id below.
+                    threshold = np.partition(similarities, -self._number_of_neighbours)[-self._number_of_neighbours]
+                    top = similarities >= threshold
+                    neighbours, similarities = neighbours[top], similarities[top]
+
+                order = np.lexsort((movie_ids[neighbours], -similarities))[:self._number_of_neighbours]
+                self._neighbours[int(movie_ids[start + row])] = list(zip(similarities[order].tolist(),
+                                                                         movie_ids[neighbours][order].tolist()))
@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import types
+from datetime import datetime
+
+from CS235Flix.adapters.memory_repository import MemoryRepository, populate, read_csv_file
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList
+
+# Increase whenever MemoryRepository or the domain model change the way they store their data, so that snapshots
+# written by older code are rebuilt instead of loaded.
+SNAPSHOT_VERSION = 6
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FILES = ('movies.csv', 'users.csv', 'reviews.csv')
+
+ENTITY_TYPES = (User, Actor, Director, Genre, Movie, Review, WatchList)
+
+# Attribute values that never refer to other entities. These are restored first, so that entities can be hashed
+# (their hashes only depend on such values) while the references between them are restored.
+_PLAIN_TYPES = (str, int, float, bool, type(None), datetime)
+
+
+# A snapshot of a populated MemoryRepository.
+#
+# Pickling the repository as is would recurse through the entity graph (actors refer to their colleagues, who refer
+# to theirs, and so on) and overflow the stack on a real catalogue. So every entity is given a number, and the
+# snapshot stores, in order:
+#   - a header with SNAPSHOT_VERSION and the size, modification time and SHA-256 digest of each source file,
+#   - the class and plain attribute values of every entity,
+#   - the remaining attribute values of every entity, with references to entities pickled as their numbers,
+#   - the repository's own attributes, again with entities pickled as their numbers.
+# Plain text passwords of users whose passwords haven't been hashed yet are not stored: the snapshot only names those
+# users, and their passwords are read from users.csv again when the snapshot is loaded.
+# Only trusted files should be loaded: a snapshot is a pickle.
+
+
+def source_fingerprint(data_path: str, with_digests: bool = True):
+    """ Returns (file name, size, modification time, SHA-256 digest) for each source file in data_path. Digests are
+        None unless with_digests is True.
+    """
+    fingerprint = list()
+    for file_name in SOURCE_FILES:
+        file_path = os.path.join(data_path, file_name)
+        status = os.stat(file_path)
+        digest = None
+        if with_digests:
+            with open(file_path, 'rb') as infile:
+                digest = hashlib.sha256(infile.read()).hexdigest()
+        fingerprint.append((file_name, status.st_size, status.st_mtime_ns, digest))
+    return fingerprint
+
+
+def load_repository(data_path: str, snapshot_path: str = None) -> MemoryRepository:
+    """ Returns a MemoryRepository holding the data in data_path.
+
+        The repository is loaded from the snapshot at snapshot_path when the snapshot is up to date. Otherwise it is
+        populated from the source files, and a new snapshot is written for the next start.
+    """
+    if snapshot_path is not None:
+        repo = read_snapshot(snapshot_path, data_path)
+        if repo is not None:
+            return repo
+
+    repo = MemoryRepository()
+    logger.info("Loaded the repository:\n%s", populate(data_path, repo))
+
+    if snapshot_path is not None:
+        try:
+            write_snapshot(repo, snapshot_path, data_path)
+        except OSError:
+            # The repository is complete without a snapshot; the next start just populates it again.
+            logger.exception("Could not write the repository snapshot to %s", snapshot_path)
+    return repo
+
+
+def read_snapshot(snapshot_path: str, data_path: str):
+    """ Returns the repository stored at snapshot_path, or None if there is no snapshot, if it was written by a
+        different SNAPSHOT_VERSION, or if the source files in data_path have changed since.
+    """
+    try:
+        with open(snapshot_path, 'rb') as infile:
+            version, fingerprint = pickle.load(infile)
+            if version != SNAPSHOT_VERSION or not _is_current(fingerprint, data_path):
+                return None
+
+            entities = list()
+            for entity_type, plain_state in pickle.load(infile):
+                entity = entity_type.__new__(entity_type)
+                _set_state(entity, plain_state)
+                entities.append(entity)
+
+            unpickler = _EntityUnpickler(infile, entities)
+            for entity, state in zip(entities, unpickler.load()):
+                _set_state(entity, state)
+
+            repo = MemoryRepository.__new__(MemoryRepository)
+            repo.__dict__.update(_EntityUnpickler(infile, entities).load())
+            repo._unhashed_passwords = _read_unhashed_passwords(data_path, repo._unhashed_passwords)
+            return repo
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # A truncated or incompatible snapshot can fail in many ways while it is unpickled and restored; whatever the
+        # error, the snapshot is simply rebuilt.
+        logger.exception("Could not read the repository snapshot %s", snapshot_path)
+        return None
+
+
+def write_snapshot(repo: MemoryRepository, snapshot_path: str, data_path: str):
+    entities = _collect_entities(repo)
+    numbers = {id(entity): number for number, entity in enumerate(entities)}
+
+    plain_states = list()
+    reference_states = list()
+    for entity in entities:
+        plain_state, reference_state = dict(), dict()
+        for name, value in _state(entity).items():
+            if isinstance(value, _PLAIN_TYPES):
+                plain_state[name] = value
+            else:
+                reference_state[name] = value
+        plain_states.append((type(entity), plain_state))
+        reference_states.append(reference_state)
+
+    directory = os.path.dirname(snapshot_path)
+    if directory != '':
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file first so that a crash never leaves a truncated snapshot behind. Each writer has its
+    # own temporary file, as several processes (such as the workers of a web server) may write the snapshot at once.
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory or None, prefix=os.path.basename(snapshot_path),
+                                                  suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as outfile:
+            pickle.dump((SNAPSHOT_VERSION, source_fingerprint(data_path)), outfile, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(plain_states, outfile, pickle.HIGHEST_PROTOCOL)
+            _EntityPickler(outfile, numbers).dump(reference_states)
+            repo_state = dict(vars(repo))
+            repo_state['_unhashed_passwords'] = list(repo._unhashed_passwords)
+            _EntityPickler(outfile, numbers).dump(repo_state)
+        os.replace(temporary_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def _is_current(fingerprint, data_path: str) -> bool:
+    try:
+        current = source_fingerprint(data_path, with_digests=False)
+    except OSError:
+        return False
+
+    if [entry[:3] for entry in fingerprint] == [entry[:3] for entry in current]:
+        return True
+    # Some files were touched; the snapshot is still current if their contents are the same.
+    return [entry[3] for entry in fingerprint] == [entry[3] for entry in source_fingerprint(data_path)]
+
+
+def _read_unhashed_passwords(data_path: str, usernames) -> dict:
+    # The plain text passwords of the named users, from users.csv
+    usernames = set(usernames)
+    passwords = dict()
+    if len(usernames) > 0:
+        for data_row in read_csv_file(os.path.join(data_path, 'users.csv')):
+            username = data_row[1].lower()
+            if username in usernames:
+                passwords.setdefault(username, data_row[2])
+    return passwords
+
+
+def _collect_entities(repo: MemoryRepository):
+    entities = dict()
+    pending = list(repo._users) + list(repo._actors) + list(repo._directors) + list(repo._genres) + \
+        list(repo._movies) + list(repo._reviews) + list(repo._watchlists)
+
+    # Also number the entities only reachable through other entities, such as the reviews of unstored users.
+    while len(pending) > 0:
+        entity = pending.pop()
+        if id(entity) in entities:
+            continue
+        entities[id(entity)] = entity
+        for value in _state(entity).values():
+            pending.extend(_referenced_entities(value))
+    return list(entities.values())
+
+
+def _slot_names(entity_type):
+    # The (mangled) names of the attributes in the __slots__ of entity_type and of its base classes
+    return [name for cls in entity_type.__mro__ for name, member in vars(cls).items()
+            if isinstance(member, types.MemberDescriptorType)]
+
+
+def _state(entity) -> dict:
+    # Entities keep their attributes in __slots__ rather than in a __dict__
+    return {name: getattr(entity, name) for name in _slot_names(type(entity)) if hasattr(entity, name)}
+
+
+def _set_state(entity, state: dict):
+    for name, value in state.items():
+        setattr(entity, name, value)
+
+
+def _referenced_entities(value):
+    if isinstance(value, ENTITY_TYPES):
+        return [value]
+    if isinstance(value, dict):
+        return [item for pair in value.items() for item in pair if isinstance(item, ENTITY_TYPES)]
+    if isinstance(value, (list, tuple, set)):
+        return [item for item in value if isinstance(item, ENTITY_TYPES)]
+    return []
+
+
+class _EntityPickler(pickle.Pickler):
+    def __init__(self, outfile, numbers):
+        super().__init__(outfile, pickle.HIGHEST_PROTOCOL)
+        self._numbers = numbers
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ENTITY_TYPES):
+            return self._numbers.get(id(obj))
+        return None
+
+
+class _EntityUnpickler(pickle.Unpickler):
+    def __init__(self, infile, entities):
+        super().__init__(infile)
+        self._entities = entities
+
+    def persistent_load(self, number):
+        return self._entities[number]
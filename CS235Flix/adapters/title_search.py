@@ -0,0 +1,92 @@
+from typing import Iterable, List
+
+from CS235Flix.domainmodel.model import Movie
+
+
+def title_relevance(query: str, title: str, is_word: bool = None) -> int:
+    """ Returns how well a title containing query matches it, lower being better: the whole title, then a title
+        prefix, then a whole word, then the start of a word. Both are expected in lower case.
+    """
+    if title == query:
+        return 0
+    if title.startswith(query):
+        return 1
+    if is_word is None:
+        is_word = query in title.split()
+    if is_word:
+        return 2
+    if (' ' + query) in title:
+        return 3
+    return 4
+
+
+class TitleSearchIndex:
+    # Every lower case title is indexed by all of its substrings of up to GRAM_LENGTH characters (n-grams), and by
+    # its words (tokens). A query of up to GRAM_LENGTH characters is answered directly from its n-gram posting list,
+    # while a longer query intersects the posting lists of its n-grams and confirms each candidate with a substring
+    # test. Either way, the work done depends on the size of the posting lists rather than the size of the catalogue.
+    GRAM_LENGTH = 3
+
+    def __init__(self):
+        self._movies = list()   # document id -> Movie
+        self._titles = list()   # document id -> lower case title
+        self._grams = dict()    # n-gram -> set of document ids
+        self._tokens = dict()   # token -> set of document ids
+
+    @property
+    def number_of_movies(self) -> int:
+        return len(self._movies)
+
+    def add_movie(self, movie: Movie):
+        if not isinstance(movie, Movie) or movie.title is None:
+            return
+
+        self._movies.append(movie)
+        self.add_title(movie.title)
+
+    def add_title(self, title: str) -> int:
+        """ Indexes a title without a Movie, returning its document id. Document ids are given out from 0 in the order
+            titles are added, so an index either holds Movies or titles, not both.
+        """
+        document = len(self._titles)
+        title = title.lower()
+        self._titles.append(title)
+
+        for length in range(1, self.GRAM_LENGTH + 1):
+            for start in range(len(title) - length + 1):
+                self._grams.setdefault(title[start:start + length], set()).add(document)
+
+        for token in title.split():
+            self._tokens.setdefault(token, set()).add(document)
+        return document
+
+    def search(self, query: str, ranked: bool = False) -> List[Movie]:
+        """ Returns the Movies whose title contains query, ignoring case.
+
+            Results are ordered by release year then title, or by relevance first when ranked is True.
+        """
+        query = query.lower()
+        documents = self.documents(query)
+
+        if ranked:
+            results = sorted((self.relevance(query, document), self._movies[document]) for document in documents)
+            return [movie for _, movie in results]
+        return sorted(self._movies[document] for document in documents)
+
+    def documents(self, query: str) -> Iterable[int]:
+        """ Returns the ids of the documents whose title contains query, in no particular order. query is expected in
+            lower case.
+        """
+        if len(query) == 0:
+            return range(len(self._titles))
+        if len(query) <= self.GRAM_LENGTH:
+            return self._grams.get(query, set())
+
+        grams = set(query[start:start + self.GRAM_LENGTH] for start in range(len(query) - self.GRAM_LENGTH + 1))
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [document for document in candidates if query in self._titles[document]]
+
+    def relevance(self, query: str, document: int) -> int:
+        """ Returns the title_relevance of a document containing query, which is expected in lower case """
+        return title_relevance(query, self._titles[document], document in self._tokens.get(query, ()))
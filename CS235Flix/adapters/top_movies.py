@@ -0,0 +1,94 @@
+import math
+from typing import Iterable, List
+
+import numpy as np
+
+from CS235Flix.adapters.repository import TOP_CRITERIA
+from CS235Flix.domainmodel.model import Movie
+
+
+def weighted_ratings(ratings: np.ndarray, votes: np.ndarray) -> np.ndarray:
+    """ Returns the Bayesian weighted rating (v R + m C) / (v + m) of each movie with rating R and v votes: its rating
+        pulled towards the mean rating C of all the rated movies, as if it had m more votes of that rating, where m is
+        the median number of votes. A movie with few votes is ranked near the mean, however high its rating.
+        Movies without a rating or a number of votes (NaN) have a NaN weighted rating.
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    votes = np.asarray(votes, dtype=np.float64)
+    weighted = np.full(len(ratings), math.nan)
+    known = ~np.isnan(ratings) & ~np.isnan(votes)
+    if known.any():
+        mean_rating = ratings[known].mean()
+        prior_votes = max(np.median(votes[known]), 1)
+        weighted[known] = (votes[known] * ratings[known] + prior_votes * mean_rating) / (votes[known] + prior_votes)
+    return weighted
+
+
+class TopMoviesIndex:
+    # Rankings of the movies by each of TOP_CRITERIA, built once so that no query sorts movies. For each criterion,
+    # the order holds the positions of the movies that have a value, the highest value first (ties are broken by movie
+    # id), and the ranks hold each movie's place in that order (or the number of movies, for movies without a value).
+    #
+    # The top movies are a prefix of the order. The top movies among some movies, such as those of a genre or a year,
+    # are the ones with the lowest ranks, picked with a partial sort of their ranks.
+    def __init__(self, movie_ids, release_years, ratings, votes, metascores):
+        """ Builds the rankings from arrays of the movies' ids, release years, ratings, votes and metascores, in which
+            missing values are NaN
+        """
+        self._ids = np.asarray(movie_ids, dtype=np.int64)
+        self._release_years = np.asarray(release_years, dtype=np.float64)
+        self._id_order = np.argsort(self._ids, kind='stable')
+        self._sorted_ids = self._ids[self._id_order]
+
+        self._orders = dict()
+        self._ranks = dict()
+        values = {'rating': ratings, 'votes': votes, 'metascore': metascores,
+                  'weighted_rating': weighted_ratings(ratings, votes)}
+        for criterion in TOP_CRITERIA:
+            criterion_values = np.asarray(values[criterion], dtype=np.float64)
+            known = np.flatnonzero(~np.isnan(criterion_values))
+            order = known[np.lexsort((self._ids[known], -criterion_values[known]))]
+            ranks = np.full(len(self._ids), len(self._ids), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            self._orders[criterion] = order
+            self._ranks[criterion] = ranks
+
+    @classmethod
+    def from_movies(cls, movies: Iterable[Movie]):
+        movies = [movie for movie in movies if movie.id is not None]
+        return cls([movie.id for movie in movies], [_value(movie.release_year) for movie in movies],
+                   [_value(movie.rating) for movie in movies], [_value(movie.votes) for movie in movies],
+                   [_value(movie.metascore) for movie in movies])
+
+    def top_movie_ids(self, criterion: str, quantity: int, movie_ids=None, release_year: int = None) -> List[int]:
+        """ Returns the ids of up to quantity movies with the highest values of criterion, the highest first. When
+            movie_ids is given, only those movies are ranked, and when release_year is, only movies released then.
+        """
+        if criterion not in TOP_CRITERIA:
+            raise ValueError("Unknown criterion " + str(criterion))
+        order = self._orders[criterion]
+        if quantity <= 0:
+            return list()
+        if movie_ids is None and release_year is None:
+            return self._ids[order[:quantity]].tolist()
+
+        positions = np.arange(len(self._ids)) if movie_ids is None else self._positions(movie_ids)
+        if release_year is not None:
+            positions = positions[self._release_years[positions] == release_year]
+        ranks = self._ranks[criterion][positions]
+        ranks = ranks[ranks < len(order)]
+        if len(ranks) > quantity:
+            ranks = np.partition(ranks, quantity - 1)[:quantity]
+        return self._ids[order[np.sort(ranks)]].tolist()
+
+    def _positions(self, movie_ids) -> np.ndarray:
+        # The positions of the known movies among movie_ids
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        if len(self._sorted_ids) == 0:
+            return np.zeros(0, dtype=np.int64)
+        indexes = np.minimum(np.searchsorted(self._sorted_ids, movie_ids), len(self._sorted_ids) - 1)
+        return self._id_order[indexes[self._sorted_ids[indexes] == movie_ids]]
+
+
+def _value(value):
+    return math.nan if value is None else value
@@ -49,8 +49,7 @@ def register():
         handler_url_title=url_for('movies_bp.search_by_title'),
         username_error_message=username_not_unique,
         handler_url_login=url_for('authentication_bp.register'),
-        selected_movies=utilities.get_selected_movies(),
-        genre_urls=utilities.get_genres_and_urls()
+        selected_movies=utilities.get_selected_movies()
     )
 
 @authentication_blueprint.route('/login', methods=['GET', 'POST'])
@@ -91,8 +90,7 @@ def login():
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         handler_url_title=url_for('movies_bp.search_by_title'),
-        selected_movies=utilities.get_selected_movies(),
-        genre_urls=utilities.get_genres_and_urls()
+        selected_movies=utilities.get_selected_movies()
     )
 
 
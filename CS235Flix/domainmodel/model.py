@@ -1,17 +1,24 @@
+import sys
 from datetime import datetime
 from typing import List
 # import imdb
 
+# The domain classes declare __slots__, so that their instances have no per-instance __dict__; a catalogue holds
+# many of them. __weakref__ is kept so that caches can refer to entities weakly.
+
+
 class Actor:
+    __slots__ = ('__actor_full_name', '__actor_colleague', '__played_movies', '__weakref__')
+
     def __init__(self, actor_full_name: str):
         if actor_full_name == "" or type(actor_full_name) is not str:
             self.__actor_full_name = None
-            self.__actor_colleague = list()
-            self.__played_movies = list()
         else:
-            self.__actor_full_name = actor_full_name.strip()
-            self.__actor_colleague = list()
-            self.__played_movies = list()
+            # Names are interned, so that every object for the same person shares one string
+            self.__actor_full_name = sys.intern(actor_full_name.strip())
+        # Maps each colleague to the number of movies the two actors played in together
+        self.__actor_colleague = dict()
+        self.__played_movies = list()
 
     @property
     def actor_full_name(self) -> str:
@@ -26,19 +33,22 @@ class Actor:
         return iter(self.__played_movies)
 
     def add_actor_colleague(self, colleague):
-        if isinstance(colleague, Actor):
-            self.__actor_colleague.append(colleague)
-            colleague.__actor_colleague.append(self)
+        if isinstance(colleague, Actor) and colleague != self:
+            self.__actor_colleague[colleague] = self.__actor_colleague.get(colleague, 0) + 1
+            colleague.__actor_colleague[self] = colleague.__actor_colleague.get(self, 0) + 1
 
     def add_played_movies(self, movie):
         self.__played_movies.append(movie)
 
     def check_if_this_actor_worked_with(self, colleague):
-        return colleague in self.actor_colleague
+        return colleague in self.__actor_colleague
 
     def get_number_of_colleagues(self):
         return len(self.__actor_colleague)
 
+    def get_number_of_collaborations(self, colleague):
+        return self.__actor_colleague.get(colleague, 0)
+
     def __repr__(self):
         return "<Actor {}>".format(self.actor_full_name)
 
@@ -57,13 +67,14 @@ class Actor:
 
 
 class Director:
+    __slots__ = ('__director_full_name', '__directed_movies', '__weakref__')
 
     def __init__(self, director_full_name: str):
         self.__directed_movies = list()
         if director_full_name == "" or type(director_full_name) is not str:
             self.__director_full_name = None
         else:
-            self.__director_full_name = director_full_name.strip()
+            self.__director_full_name = sys.intern(director_full_name.strip())
 
     @property
     def director_full_name(self) -> str:
@@ -94,13 +105,16 @@ class Director:
 
 
 class Genre:
+    __slots__ = ('__genre_name', '__classified_movies', '__weakref__')
+
     def __init__(self, genre_name: str):
         if genre_name == "" or type(genre_name) is not str:
             self.__genre_name = None
             self.__classified_movies = None
         else:
-            self.__genre_name = genre_name.strip()
-            self.__classified_movies = list()
+            self.__genre_name = sys.intern(genre_name.strip())
+            # An insertion ordered dict used as a set, so that adding a movie doesn't search the movies already added
+            self.__classified_movies = dict()
 
 
     @property
@@ -120,8 +134,7 @@ class Genre:
 
     def add_Movie(self, movie):
         if isinstance(movie, Movie):
-            if movie not in self.__classified_movies:
-                self.__classified_movies.append(movie)
+            self.__classified_movies.setdefault(movie)
 
     def __repr__(self):
         return "<Genre {}>".format(self.__genre_name)
@@ -141,15 +154,24 @@ class Genre:
 
 
 class Movie:
+    __slots__ = ('__id', '__title', '__release_year', '__description', '__director', '__actors', '__genres',
+                 '__reviews', '__runtime_minutes', '__revenue', '__rating', '__votes', '__metascore', '__weakref__')
+
     def __init__(self, title: str, release_year: int, id: int = None):
         self.__id = id
         self.__description = ""
         self.__director = None
         self.__actors = list()
         self.__genres = list()
-        self.__reviews = list()
+        # Most movies are never reviewed, so they share one empty tuple until their first review
+        self.__reviews = ()
         self.__runtime_minutes = 0
         self.__revenue = 0
+        # The average user rating (out of 10), the number of votes it is based on, and the critics' metascore (out of
+        # 100), which are None when not known
+        self.__rating = None
+        self.__votes = None
+        self.__metascore = None
         # self.__cover_url = None
 
         if title != "" and type(title) is str and type(release_year) is int and release_year >= 1900:
@@ -176,6 +198,18 @@ class Movie:
     def revenue(self) -> float:
         return self.__revenue
 
+    @property
+    def rating(self) -> float:
+        return self.__rating
+
+    @property
+    def votes(self) -> int:
+        return self.__votes
+
+    @property
+    def metascore(self) -> float:
+        return self.__metascore
+
     @property
     def title(self) -> str:
         return self.__title
@@ -249,6 +283,19 @@ class Movie:
         if revenue >= 0:
             self.__revenue = revenue
 
+    def set_rating(self, rating: float):
+        # A missing (NaN) rating fails the comparison and isn't kept
+        if rating is not None and 0 <= rating <= 10:
+            self.__rating = rating
+
+    def set_votes(self, votes: int):
+        if type(votes) is int and votes >= 0:
+            self.__votes = votes
+
+    def set_metascore(self, metascore: float):
+        if metascore is not None and 0 <= metascore <= 100:
+            self.__metascore = metascore
+
     def add_actor(self, actor: Actor) -> bool:
         if isinstance(actor, Actor):
             self.__actors.append(actor)
@@ -272,6 +319,8 @@ class Movie:
 
     def add_review(self, review):
         if isinstance(review, Review):
+            if len(self.__reviews) == 0:
+                self.__reviews = list()
             self.__reviews.append(review)
             return True
         return False
@@ -298,6 +347,9 @@ class Movie:
 
 
 class User:
+    __slots__ = ('__user_name', '__password', '__watched_movies', '__reviews', '__time_spent_watching_movies_minutes',
+                 '__weakref__')
+
     def __init__(self, user_name: str, password: str):
         self.__user_name = None
         self.__password = None
@@ -345,7 +397,14 @@ class User:
         return self.username < other.username
 
     def __hash__(self):
-        return hash((self.__user_name, self.__password))
+        # Users are equal when their usernames are, and a password can be changed, so only the username is hashed
+        return hash(self.__user_name)
+
+    def set_password(self, password: str) -> bool:
+        if type(password) is str and len(password) > 0:
+            self.__password = password
+            return True
+        return False
 
     def watch_movie(self, movie: Movie):
         if isinstance(movie, Movie):
@@ -360,6 +419,8 @@ class User:
 
 
 class Review:
+    __slots__ = ('__author', '__movie', '__review_text', '__rating', '__timestamp', '__weakref__')
+
     def __init__(self, user: User, movie: Movie, review_text: str, rating: int, timestamp: datetime):
         self.__author = user
         self.__movie = movie
@@ -404,6 +465,8 @@ class Review:
 
 
 class WatchList:
+    __slots__ = ('__watchlist', '__start_index', '__schedule', '__weakref__')
+
     def __init__(self):
         self.__watchlist = list()
         self.__start_index = 0
@@ -476,11 +539,10 @@ def add_movie_attributes(movie: Movie, list_of_genres: List[Genre],
                          description: str, list_of_actors: List[Actor],
                          director: Director, runtime: int):
 
-    # Add actors to movie and construct actor colleagues
-    for actor in list_of_actors:
-        for colleague in list_of_actors:
-            if colleague is not actor:
-                actor.add_actor_colleague(colleague)
+    # Construct actor colleagues, visiting each pair of actors once
+    for index, actor in enumerate(list_of_actors):
+        for colleague in list_of_actors[index + 1:]:
+            actor.add_actor_colleague(colleague)
 
     # Add director to movie
     # movie.set_director(director)
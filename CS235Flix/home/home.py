@@ -6,9 +6,8 @@ from flask_wtf import FlaskForm
 from wtforms import TextAreaField, HiddenField, SubmitField, DecimalField
 from wtforms.validators import DataRequired, Length, ValidationError, NumberRange
 from CS235Flix.movies.movies import SearchForm, SearchByTitleForm
-from CS235Flix.movies.services import get_top_6_movies_by_revenue
-import imdb
-access = imdb.IMDb()
+from CS235Flix.movies.services import get_top_6_movies_by_revenue, get_top_movies
+import CS235Flix.adapters.cover_art as cover_art
 home_blueprint = Blueprint(
     'home_bp', __name__
 )
@@ -20,14 +19,22 @@ def home():
     for movie in top_6_picks:
         movie['view_review_url'] = url_for('home_bp.home')
         movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=movie['id'])
-        possible_movies = access.search_movie(movie['title'])
-        movie['cover_url'] = possible_movies[0]['cover url']
+        # Covers come from the cover art cache; until a cover has been resolved, show a placeholder.
+        movie['cover_url'] = cover_art.cover_service.get_cover_url(movie['id'], movie['title'], movie['release_year'])
+        if movie['cover_url'] is None:
+            movie['cover_url'] = url_for('static', filename='images/cover_placeholder.svg')
+
+    # The best rated movies, by rating weighted by the number of votes
+    top_rated = get_top_movies('weighted_rating', 6, repo=repo.repo_instance)
+    for movie in top_rated:
+        movie['movie_url'] = url_for('movies_bp.movies_by_release_year', year=movie['release_year'],
+                                     view_reviews_for=movie['id'])
 
     return render_template(
         'home/home.html',
         selected_movies=utilities.get_selected_movies(),
         top_6_picks=top_6_picks,
-        genre_urls=utilities.get_genres_and_urls(),
+        top_rated=top_rated,
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         title_form = SearchByTitleForm(),
@@ -9,7 +9,8 @@ from flask_wtf import FlaskForm
 from wtforms import TextAreaField, HiddenField, SubmitField
 from wtforms.fields.html5 import SearchField, DecimalField
 from wtforms.validators import DataRequired, Length, ValidationError, NumberRange
-from CS235Flix.movies.services import NonExistentActorException, NonExistentDirectorException, NoSearchResultsException
+from CS235Flix.movies.services import NonExistentActorException, NonExistentDirectorException, NoSearchResultsException, \
+    NonExistentMovieException
 
 import CS235Flix.adapters.repository as repo
 import CS235Flix.utilities.utilities as utilities
@@ -30,13 +31,14 @@ def movies_by_release_year():
     target_year = request.args.get('year')
     movie_to_show_reviews = request.args.get('view_reviews_for')
 
-    # Fetch the latest and the oldest movies in the series.
-    latest_movie = services.get_latest_movie(repo.repo_instance)
-    oldest_movie = services.get_oldest_movie(repo.repo_instance)
+    # Fetch the release years of the series, ordered from the oldest to the latest.
+    release_years = services.get_release_years(repo.repo_instance)
+    latest_year = release_years[-1]
+    oldest_year = release_years[0]
 
     if target_year is None:
         # No year query parameter, so return movies from the latest release year of the series
-        target_year = latest_movie['release_year']
+        target_year = latest_year
     else:
         # Convert target_year from string to int
         target_year = int(target_year)
@@ -57,22 +59,17 @@ def movies_by_release_year():
     # last_page_url = None
     previous_page_url = None
     next_page_url = None
-    last_page_url = url_for('movies_bp.movies_by_release_year', year=int(oldest_movie['release_year']))
-    first_page_url = url_for('movies_bp.movies_by_release_year', year=int(latest_movie['release_year']))
+    last_page_url = url_for('movies_bp.movies_by_release_year', year=oldest_year)
+    first_page_url = url_for('movies_bp.movies_by_release_year', year=latest_year)
 
     if num_of_movies_found > 0:
-        previous_year = int(movies[0]['release_year']) - 1
-        next_year = int(movies[0]['release_year']) + 1
+        # Movies are listed from the latest year, so 'next' goes back to the previous release year and 'previous'
+        # goes forward to the next release year. There is no such year at either end of the series.
+        if previous_year is not None:
+            next_page_url = url_for('movies_bp.movies_by_release_year', year=previous_year)
 
-        next_page_url = url_for('movies_bp.movies_by_release_year', year=previous_year ) # previous_year
-
-        previous_page_url = url_for('movies_bp.movies_by_release_year', year=next_year)
-
-        if previous_year < 2006:
-            next_page_url = None
-
-        if next_year > 2016:
-            previous_page_url = None
+        if next_year is not None:
+            previous_page_url = url_for('movies_bp.movies_by_release_year', year=next_year)
 
         # Construct urls for viewing movie reviews and adding reviews
         for movie in movies:
@@ -91,7 +88,6 @@ def movies_by_release_year():
             form=SearchForm(),
             handler_url=url_for('movies_bp.search'),
             selected_movies=utilities.get_selected_movies(len(movies) * 2),
-            genre_urls=utilities.get_genres_and_urls(),
             first_page_url=first_page_url,
             last_page_url=last_page_url,
             previous_page_url=previous_page_url,
@@ -112,6 +108,7 @@ def movies_by_genre():
     # Read query parameter.
     genre_name = request.args.get('genre')
     cursor = request.args.get('cursor')
+    order = request.args.get('sort')
     movie_to_show_reviews = request.args.get('view_reviews_for')
 
     if movie_to_show_reviews is None:
@@ -128,8 +125,16 @@ def movies_by_genre():
         # Convert cursor from string to int
         cursor = int(cursor)
 
-    # Retrieve movie ids for movies that are classified with genre_name
-    movie_ids = services.get_movie_ids_for_genre(genre_name, repo.repo_instance)
+    if order not in repo.GENRE_ORDERS:
+        # No valid sort query parameter, so order movies by id
+        order = 'id'
+
+    # The default order is left out of the urls
+    sort = None if order == 'id' else order
+
+    # Retrieve movie ids for movies that are classified with genre_name, in the requested order. Slicing out the
+    # batch to display only copies the ids on the page.
+    movie_ids = services.get_movie_ids_for_genre(genre_name, repo.repo_instance, order)
     num_of_movies_found = len(movie_ids)
 
     # Retrieve the batch of articles to display on the Web page.
@@ -142,25 +147,39 @@ def movies_by_genre():
 
     if cursor > 0:
         # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        previous_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor - movies_per_page)
-        first_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name)
+        previous_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor - movies_per_page,
+                                    sort=sort)
+        first_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, sort=sort)
 
     if cursor + movies_per_page < len(movie_ids):
         # There are further movies, so generate URLs for the 'next' and last navigation buttons.
-        next_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor + movies_per_page)
+        next_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor + movies_per_page,
+                                sort=sort)
 
         last_cursor = movies_per_page * int(len(movie_ids) / movies_per_page)
         if len(movie_ids) % movies_per_page == 0:
             last_cursor -= movies_per_page
 
-        last_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=last_cursor)
+        last_page_url = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=last_cursor, sort=sort)
 
     # Construct urls for viewing movie reviews and adding reviews
     for movie in movies:
-        movie['view_review_url'] = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor,
+        movie['view_review_url'] = url_for('movies_bp.movies_by_genre', genre=genre_name, cursor=cursor, sort=sort,
                                            view_reviews_for=movie['id'])
         movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=movie['id'])
-    print(cursor)
+
+    # The genre's best rated movies, by rating weighted by the number of votes
+    top_rated = services.get_top_movies('weighted_rating', 5, repo.repo_instance, genre_name=genre_name)
+    for movie in top_rated:
+        movie['movie_url'] = url_for('movies_bp.movies_by_release_year', year=movie['release_year'],
+                                     view_reviews_for=movie['id'])
+
+    # Construct urls for changing the order of the movies
+    sort_urls = dict()
+    for genre_order in repo.GENRE_ORDERS:
+        sort_urls[genre_order] = url_for('movies_bp.movies_by_genre', genre=genre_name,
+                                         sort=None if genre_order == 'id' else genre_order)
+
     current_page = cursor
     if current_page + 10 < num_of_movies_found:
         current_page += 10
@@ -176,17 +195,167 @@ def movies_by_genre():
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         selected_movies=utilities.get_selected_movies(len(movies) * 2),
-        genre_urls=utilities.get_genres_and_urls(),
         first_page_url=first_page_url,
         last_page_url=last_page_url,
         previous_page_url=previous_page_url,
         next_page_url=next_page_url,
         show_reviews_for_movie=movie_to_show_reviews,
+        sort_urls=sort_urls,
+        current_sort=order,
+        top_rated=top_rated,
+        title_form=SearchByTitleForm(),
+        handler_url_title=url_for('movies_bp.search_by_title'),
+    )
+
+
+@movies_blueprint.route('/similar_movies', methods=['GET'])
+def similar_movies():
+    # Read query parameters
+    movie_id = request.args.get('movie')
+    movie_to_show_reviews = request.args.get('view_reviews_for')
+
+    if movie_to_show_reviews is None:
+        # No view-reviews query parameter, so set to a non-existent movie id.
+        movie_to_show_reviews = -1
+    else:
+        # Convert movie_to_show_reviews from string to int
+        movie_to_show_reviews = int(movie_to_show_reviews)
+
+    try:
+        movie, movies = services.get_similar_movies(int(movie_id), repo.repo_instance)
+    except (TypeError, ValueError, NonExistentMovieException):
+        # No such movie, so return the homepage
+        return redirect(url_for('home_bp.home'))
+
+    # Construct urls for viewing movie reviews and adding reviews
+    for similar_movie in movies:
+        similar_movie['view_review_url'] = url_for('movies_bp.similar_movies', movie=movie['id'],
+                                                   view_reviews_for=similar_movie['id'])
+        similar_movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=similar_movie['id'])
+
+    return render_template(
+        'movies/movies.html',
+        title='Movies',
+        movies_title="More like " + movie['title'] + " - (" + str(len(movies)) + " results found)",
+        movies=movies,
+        form=SearchForm(),
+        handler_url=url_for('movies_bp.search'),
+        selected_movies=utilities.get_selected_movies(len(movies) * 2),
+        first_page_url=None,
+        last_page_url=None,
+        previous_page_url=None,
+        next_page_url=None,
+        show_reviews_for_movie=movie_to_show_reviews,
         title_form=SearchByTitleForm(),
         handler_url_title=url_for('movies_bp.search_by_title'),
     )
 
 
+@movies_blueprint.route('/browse', methods=['GET'])
+def browse_movies():
+    movies_per_page = 10
+
+    # Read query parameters. Every criterion is optional, and all of the given criteria are combined.
+    criteria = dict(
+        genre=request.args.getlist('genre'),
+        min_year=_get_number_arg('min_year', int),
+        max_year=_get_number_arg('max_year', int),
+        min_runtime=_get_number_arg('min_runtime', int),
+        max_runtime=_get_number_arg('max_runtime', int),
+        min_revenue=_get_number_arg('min_revenue', float),
+        max_revenue=_get_number_arg('max_revenue', float),
+        actor=request.args.get('actor') or None,
+        director=request.args.get('director') or None,
+    )
+    cursor = _get_number_arg('cursor', int) or 0
+    movie_to_show_reviews = request.args.get('view_reviews_for')
+
+    if movie_to_show_reviews is None:
+        # No view-reviews query parameter, so set to a non-existent movie id.
+        movie_to_show_reviews = -1
+    else:
+        # Convert movie_to_show_reviews from string to int
+        movie_to_show_reviews = int(movie_to_show_reviews)
+
+    results = services.browse_movies(repo.repo_instance, genre_names=criteria['genre'],
+                                     release_years=(criteria['min_year'], criteria['max_year']),
+                                     runtimes=(criteria['min_runtime'], criteria['max_runtime']),
+                                     revenues=(criteria['min_revenue'], criteria['max_revenue']),
+                                     actor_fullname=criteria['actor'], director_fullname=criteria['director'],
+                                     cursor=cursor, quantity=movies_per_page)
+    movies = results['movies']
+    num_of_movies_found = results['number_of_movies']
+
+    first_page_url = None
+    last_page_url = None
+    previous_page_url = None
+    next_page_url = None
+
+    if cursor > 0:
+        # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
+        previous_page_url = url_for('movies_bp.browse_movies', cursor=max(cursor - movies_per_page, 0), **criteria)
+        first_page_url = url_for('movies_bp.browse_movies', **criteria)
+
+    if cursor + movies_per_page < num_of_movies_found:
+        # There are further movies, so generate URLs for the 'next' and last navigation buttons.
+        next_page_url = url_for('movies_bp.browse_movies', cursor=cursor + movies_per_page, **criteria)
+
+        last_cursor = movies_per_page * ((num_of_movies_found - 1) // movies_per_page)
+        last_page_url = url_for('movies_bp.browse_movies', cursor=last_cursor, **criteria)
+
+    # Construct urls for viewing movie reviews and adding reviews
+    for movie in movies:
+        movie['view_review_url'] = url_for('movies_bp.browse_movies', cursor=cursor, view_reviews_for=movie['id'],
+                                           **criteria)
+        movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=movie['id'])
+
+    # Construct urls that narrow the current selection down to one more genre or to a single release year
+    genre_facets = list()
+    for genre_name, count in results['genre_counts'].items():
+        if count > 0 and genre_name not in criteria['genre']:
+            genre_facets.append({
+                'genre_name': genre_name,
+                'number_of_movies': count,
+                'url': url_for('movies_bp.browse_movies', **dict(criteria, genre=criteria['genre'] + [genre_name]))
+            })
+    release_year_facets = list()
+    for release_year, count in results['release_year_counts'].items():
+        release_year_facets.append({
+            'release_year': release_year,
+            'number_of_movies': count,
+            'url': url_for('movies_bp.browse_movies', **dict(criteria, min_year=release_year, max_year=release_year))
+        })
+
+    return render_template(
+        'movies/browse.html',
+        title='Movies',
+        movies_title="Browse movies - (" + str(num_of_movies_found) + " results found)",
+        movies=movies,
+        criteria=criteria,
+        genre_facets=genre_facets,
+        release_year_facets=release_year_facets,
+        handler_url_browse=url_for('movies_bp.browse_movies'),
+        form=SearchForm(),
+        handler_url=url_for('movies_bp.search'),
+        selected_movies=utilities.get_selected_movies(len(movies) * 2),
+        first_page_url=first_page_url,
+        last_page_url=last_page_url,
+        previous_page_url=previous_page_url,
+        next_page_url=next_page_url,
+        show_reviews_for_movie=movie_to_show_reviews,
+        title_form=SearchByTitleForm(),
+        handler_url_title=url_for('movies_bp.search_by_title'),
+    )
+
+
+def _get_number_arg(name: str, number_type):
+    # Returns the query parameter converted to number_type, or None if it is missing or not a number.
+    try:
+        return number_type(request.args[name])
+    except (KeyError, ValueError):
+        return None
+
+
 @movies_blueprint.route('/review', methods=['GET', 'POST'])
 @login_required
 def review_on_movie():
@@ -243,7 +412,6 @@ def review_on_movie():
         handler_url_review=url_for('movies_bp.review_on_movie'),
         handler_url=url_for("movies_bp.search"),
         selected_movies=utilities.get_selected_movies(),
-        genre_urls=utilities.get_genres_and_urls(),
         title_form=SearchByTitleForm(),
         handler_url_title=url_for('movies_bp.search_by_title'),
     )
@@ -308,7 +476,6 @@ def search_movies_by_actor_and_or_director():
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         selected_movies=utilities.get_selected_movies(len(movies) * 2),
-        genre_urls=utilities.get_genres_and_urls(),
         first_page_url=first_page_url,
         last_page_url=last_page_url,
         previous_page_url=previous_page_url,
@@ -359,7 +526,7 @@ def search_movies_by_title():
         target_title = ""
 
     try:
-        movies = services.search_movie_by_title(title=target_title, repo=repo.repo_instance)
+        movies = services.search_movie_by_title(title=target_title, repo=repo.repo_instance, ranked=True)
     except NoSearchResultsException:
         pass
 
@@ -381,7 +548,6 @@ def search_movies_by_title():
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         selected_movies=utilities.get_selected_movies(len(movies) * 2),
-        genre_urls=utilities.get_genres_and_urls(),
         first_page_url=first_page_url,
         last_page_url=last_page_url,
         previous_page_url=previous_page_url,
@@ -449,7 +615,6 @@ def suggest_movie():
         form=SearchForm(),
         handler_url=url_for('movies_bp.search'),
         selected_movies=utilities.get_selected_movies(len(suggestions) * 2),
-        genre_urls=utilities.get_genres_and_urls(),
         first_page_url=first_page_url,
         last_page_url=last_page_url,
         previous_page_url=previous_page_url,
@@ -1,5 +1,6 @@
 # CS235Flix/movies/services.py
 
+import weakref
 from typing import List, Iterable
 from CS235Flix.adapters.repository import AbstractRepository
 from CS235Flix.domainmodel.model import Movie, Review, Genre, make_review, Actor, Director
@@ -49,18 +50,22 @@ def get_movie(movie_id: int, repo: AbstractRepository):
     if movie is None:
         raise NonExistentMovieException
 
-    return movie_to_dict(movie)
+    return movie_to_detail_dict(movie)
 
 
 def get_latest_movie(repo: AbstractRepository):
     movie = repo.get_latest_movie()
 
-    return movie_to_dict(movie)
+    return movie_to_summary_dict(movie)
 
 
 def get_oldest_movie(repo: AbstractRepository):
     movie = repo.get_oldest_movie()
-    return movie_to_dict(movie)
+    return movie_to_summary_dict(movie)
+
+
+def get_release_years(repo: AbstractRepository):
+    return repo.get_release_years()
 
 
 def get_movies_by_release_year(year, repo: AbstractRepository):
@@ -73,13 +78,13 @@ def get_movies_by_release_year(year, repo: AbstractRepository):
         next_year = repo.get_release_year_of_next_movie(movies[0])
 
         # Convert Movies to dictionary form.
-        movies_dto = movies_to_dict(movies)
+        movies_dto = movies_to_card_dict(movies)
 
     return movies_dto, prev_year, next_year
 
 
-def get_movie_ids_for_genre(genre_name: str, repo: AbstractRepository):
-    movie_ids = repo.get_movie_indexes_for_genre(genre_name)
+def get_movie_ids_for_genre(genre_name: str, repo: AbstractRepository, order: str = 'id'):
+    movie_ids = repo.get_movie_indexes_for_genre(genre_name, order=order)
 
     return movie_ids
 
@@ -88,7 +93,7 @@ def get_movies_by_id(id_list, repo: AbstractRepository):
     movies = repo.get_movies_by_index(id_list)
 
     # Convert Movies to dictionary form
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
 
     return movies_as_dict
 
@@ -108,7 +113,7 @@ def search_movie_by_actor_fullname(actor_fullname: str, repo: AbstractRepository
     if len(movies) == 0:
         raise NonExistentActorException
 
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 
@@ -116,7 +121,7 @@ def search_movie_directed_by_director_fullname(director_fullname: str, repo: Abs
     movies = repo.get_movies_directed_by_a_director(director_fullname=director_fullname)
     if len(movies) == 0:
         raise NonExistentDirectorException
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 
@@ -126,16 +131,16 @@ def search_movie_by_actor_and_director(actor_fullname: str, director_fullname: s
     if len(movies) == 0:
         raise NoSearchResultsException
 
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 
-def search_movie_by_title(title:str, repo:AbstractRepository):
-    movies = repo.search_movie_by_title(title)
+def search_movie_by_title(title:str, repo:AbstractRepository, ranked: bool = False):
+    movies = repo.search_movie_by_title(title, ranked=ranked)
     if len(movies) == 0:
         raise NoSearchResultsException
 
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 
@@ -144,13 +149,52 @@ def get_top_6_movies_by_revenue(repo:AbstractRepository):
     if len(movies) == 0:
         raise NoSearchResultsException
 
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 
-def get_suggestions_for_a_user(username: str, repo: AbstractRepository):
-    movies = repo.get_suggestion_for_user(username=username)
-    movies_as_dict = movies_to_dict(movies)
+def get_top_movies(criterion: str, quantity: int, repo: AbstractRepository, genre_name: str = None,
+                   release_year: int = None):
+    movies = repo.get_top_movies(criterion, quantity, genre_name=genre_name, release_year=release_year)
+    return movies_to_card_dict(movies)
+
+
+def get_similar_movies(movie_id: int, repo: AbstractRepository, quantity: int = 10):
+    movie = repo.get_movie_by_index(movie_id)
+    if movie is None:
+        raise NonExistentMovieException
+
+    movies = repo.get_similar_movies(movie, quantity)
+    return movie_to_summary_dict(movie), movies_to_card_dict(movies)
+
+
+def browse_movies(repo: AbstractRepository, genre_names: Iterable[str] = (), release_years=(None, None),
+                  runtimes=(None, None), revenues=(None, None), actor_fullname: str = None,
+                  director_fullname: str = None, cursor: int = 0, quantity: int = 10):
+    # Combine all of the criteria in the facet indexes, then look up only the movies on the requested page.
+    facet_index = repo.get_facet_index()
+    selection = facet_index.select(genres=genre_names, release_years=release_years, runtimes=runtimes,
+                                   revenues=revenues, actor=actor_fullname, director=director_fullname)
+    movies = repo.get_movies_by_index(facet_index.movie_ids(selection, cursor, quantity))
+
+    return {
+        'movies': movies_to_card_dict(movies),
+        'number_of_movies': facet_index.count(selection),
+        'genre_counts': facet_index.count_by_genre(selection),
+        'release_year_counts': facet_index.count_by_release_year(selection),
+    }
+
+
+def get_suggestions_for_a_user(username: str, repo: AbstractRepository, quantity: int = 10):
+    # Movies rated alike by other users come first, followed by the top movies of the user's favourite genres.
+    movies = repo.get_recommended_movies_for_user(username, quantity)
+    for movie in repo.get_suggestion_for_user(username=username):
+        if len(movies) >= quantity:
+            break
+        if movie not in movies:
+            movies.append(movie)
+
+    movies_as_dict = movies_to_card_dict(movies)
     return movies_as_dict
 
 # ============================================
@@ -158,24 +202,67 @@ def get_suggestions_for_a_user(username: str, repo: AbstractRepository):
 # ============================================
 
 
-def movie_to_dict(movie: Movie):
+# Movies are converted to one of three projections, from the smallest to the largest:
+#   summary - identifies the movie (id, title and release year)
+#   card    - everything a movie list shows, including the names of its actors and genres and its reviews
+#   detail  - a card plus the number of movies classified by each of its genres
+# Everything in a card except its reviews is fixed once the movie is loaded, so that part is built once per movie and
+# cached. Cards are built from a shallow copy of the cached part, so views can add their own keys to them.
+
+_movie_fragments = weakref.WeakKeyDictionary()
+
+
+def movie_to_summary_dict(movie: Movie):
     movie_dict = {
         'id': movie.id,
         'title': movie.title,
-        'release_year': movie.release_year,
-        'description': movie.description,
-        'director': movie.director.director_full_name,
-        'actors': actors_to_dict(movie.actors),
-        'genres': genres_to_dict(movie.genres),
-        'runtime_minutes': movie.runtime_minutes,
-        'reviews': reviews_to_dict(movie.reviews),
-        'revenue': movie.revenue
+        'release_year': movie.release_year
     }
     return movie_dict
 
 
-def movies_to_dict(movies: Iterable[Movie]):
-    return [movie_to_dict(movie) for movie in movies]
+def movie_to_card_dict(movie: Movie):
+    movie_dict = dict(_get_movie_fragment(movie))
+    movie_dict['reviews'] = reviews_to_dict(movie.reviews)
+    return movie_dict
+
+
+def movie_to_detail_dict(movie: Movie):
+    movie_dict = movie_to_card_dict(movie)
+    movie_dict['genres'] = genres_to_dict(movie.genres)
+    return movie_dict
+
+
+def movies_to_summary_dict(movies: Iterable[Movie]):
+    return [movie_to_summary_dict(movie) for movie in movies]
+
+
+def movies_to_card_dict(movies: Iterable[Movie]):
+    return [movie_to_card_dict(movie) for movie in movies]
+
+
+def _get_movie_fragment(movie: Movie):
+    # The cache is keyed by movie equality (title and release year), so check that the entry was built from this
+    # very movie object, and that its actors and genres have not changed since.
+    signature = (id(movie), movie.number_of_actors, movie.number_of_genres, movie.director)
+    cached = _movie_fragments.get(movie)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    fragment = movie_to_summary_dict(movie)
+    fragment.update({
+        'description': movie.description,
+        'director': movie.director.director_full_name,
+        'actors': actors_to_dict(movie.actors),
+        'genres': [genre_name_to_dict(genre) for genre in movie.genres],
+        'runtime_minutes': movie.runtime_minutes,
+        'revenue': movie.revenue,
+        'rating': movie.rating,
+        'votes': movie.votes,
+        'metascore': movie.metascore
+    })
+    _movie_fragments[movie] = (signature, fragment)
+    return fragment
 
 
 def actor_to_dict(actor: Actor):
@@ -189,11 +276,17 @@ def actors_to_dict(actors: Iterable[Actor]):
     return [actor_to_dict(actor) for actor in actors]
 
 
+def genre_name_to_dict(genre: Genre):
+    genre_dict = {
+        'genre_name': genre.genre_name
+    }
+    return genre_dict
+
+
 def genre_to_dict(genre: Genre):
     genre_dict = {
         'genre_name': genre.genre_name,
-        'number_of_classified_movies': genre.number_of_classified_movies,
-        'classified_movies': [movie.id for movie in genre.classified_movies]
+        'number_of_classified_movies': genre.number_of_classified_movies
     }
     return genre_dict
 
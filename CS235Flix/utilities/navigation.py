@@ -0,0 +1,42 @@
+from typing import Callable, Dict
+
+from flask import current_app, request
+from markupsafe import Markup
+
+from CS235Flix.adapters.repository import AbstractRepository
+import CS235Flix.utilities.services as services
+
+genre_navigation = None
+
+
+class GenreNavigation:
+    # The links to the page of each genre, shown alongside every page. The URL of each genre (made by genre_url) and
+    # the HTML of the links (rendered from template_name) are kept, and only made again when a genre is added or the
+    # URLs could differ: for another repository, application (URL map) or script root.
+    def __init__(self, genre_url: Callable[[str], str], template_name: str = 'genre_navigation.html'):
+        self._genre_url = genre_url
+        self._template_name = template_name
+        # What the links were made for, the number of genres then, the URLs by genre name and the HTML, replaced
+        # together
+        self._navigation = (None, None, dict(), Markup(''))
+
+    def get_genre_urls(self, repo: AbstractRepository) -> Dict[str, str]:
+        """ Returns the URL of the page of each genre of repo, by genre name. The dict must not be modified. """
+        return self._current_navigation(repo)[2]
+
+    def get_html(self, repo: AbstractRepository) -> Markup:
+        """ Returns the HTML of the links to the page of each genre of repo """
+        return self._current_navigation(repo)[3]
+
+    def _current_navigation(self, repo: AbstractRepository):
+        key = (repo, current_app.url_map, request.script_root)
+        number_of_genres = repo.get_total_number_of_genres_in_repo()
+        navigation = self._navigation
+        if navigation[0] != key or navigation[1] != number_of_genres:
+            genre_urls = {genre_name: self._genre_url(genre_name) for genre_name in services.get_genre_names(repo)}
+            # Rendered straight from the Jinja environment, as render_template would run the context processors that
+            # ask for this HTML
+            html = Markup(current_app.jinja_env.get_template(self._template_name).render(genre_urls=genre_urls))
+            navigation = (key, number_of_genres, genre_urls, html)
+            self._navigation = navigation
+        return navigation
@@ -14,26 +14,27 @@ def get_genre_names(repo:AbstractRepository) -> List[str]:
     return genre_names
 
 
-def get_random_movies(quantity, repo:AbstractRepository):
-    movie_count = repo.get_total_number_of_movies_in_repo()
-
-    if quantity >= movie_count:
-        # Reduce the quantity of movie ids to generate if the repository has an insufficient number of movies
-        quantity = movie_count - 1
-
-    # Pick distinct and random movie
-    random_ids = random.sample(range(1, movie_count), quantity)
+def get_random_movies(quantity, repo:AbstractRepository, movie_ids: List[int] = None):
+    # Pick distinct and random movies from the ids of all the movies, which need not be contiguous. Callers that pick
+    # movies often may pass the ids in, rather than have them read from the repository every time.
+    if movie_ids is None:
+        movie_ids = repo.get_movie_ids()
+
+    # Reduce the quantity of movies to pick if the repository has an insufficient number of movies
+    random_ids = random.sample(movie_ids, min(quantity, len(movie_ids)))
     movies = repo.get_movies_by_index(random_ids)
 
     return movies_to_dict(movies)
 
 
 def movie_to_dict(movie: Movie):
+    # Only names and numbers, so that the dicts can be shared (see SidebarSampler): movie.actors is an iterator,
+    # which would be empty for every reader but the first
     movie_dict = {
         "title": movie.title,
         "release_year": movie.release_year,
-        "actors": movie.actors,
-        "director": movie.director
+        "actors": tuple(actor.actor_full_name for actor in movie.actors),
+        "director": None if movie.director is None else movie.director.director_full_name
     }
     return movie_dict
 
@@ -0,0 +1,70 @@
+import random
+import threading
+import time
+from typing import Callable, List
+
+from CS235Flix.adapters.repository import AbstractRepository
+import CS235Flix.utilities.services as services
+
+sidebar_sampler = None
+
+
+class SidebarSampler:
+    # Serves the random "selected movies" shown alongside most pages. Instead of picking movies for every request,
+    # a shared rotation of rotation_size random movies is picked at most once every refresh_seconds, each movie already
+    # a dict ready for the templates, with its URL made by movie_url. A request takes quantity consecutive movies of the
+    # rotation from a random start, wrapping around, so it only copies quantity dicts.
+    #
+    # The movies are picked from the ids of all the movies in the repository, which are kept between rotations and
+    # only read again when the number of movies changes.
+    def __init__(self, movie_url: Callable[[dict], str], rotation_size: int = 100, refresh_seconds: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self._movie_url = movie_url
+        self._rotation_size = rotation_size
+        self._refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._movie_ids = list()
+        self._number_of_movies = None
+        # The repository the rotation was picked from, the rotation and when it was picked, replaced together
+        self._rotation = (None, list(), None)
+
+    def get_selected_movies(self, quantity: int, repo: AbstractRepository) -> List[dict]:
+        """ Returns up to quantity distinct random movies of repo as dicts of their title, release year, actors,
+            director and URL (under 'id')
+        """
+        rotation = self._current_rotation(repo)
+        quantity = min(quantity, len(rotation))
+        if quantity <= 0:
+            return list()
+
+        start = random.randrange(len(rotation))
+        selected = rotation[start:start + quantity] + rotation[:max(start + quantity - len(rotation), 0)]
+        # Copies, so that a view changing its movies doesn't change the rotation
+        return [dict(movie) for movie in selected]
+
+    def _current_rotation(self, repo: AbstractRepository) -> List[dict]:
+        rotation_repo, rotation, picked_at = self._rotation
+        if rotation_repo is repo and self._clock() - picked_at < self._refresh_seconds:
+            return rotation
+
+        with self._lock:
+            # Another request may have picked a new rotation while this one waited
+            rotation_repo, rotation, picked_at = self._rotation
+            now = self._clock()
+            if rotation_repo is not repo or now - picked_at >= self._refresh_seconds:
+                rotation = self._pick_rotation(repo)
+                self._rotation = (repo, rotation, now)
+            return rotation
+
+    def _pick_rotation(self, repo: AbstractRepository) -> List[dict]:
+        number_of_movies = repo.get_total_number_of_movies_in_repo()
+        if self._rotation[0] is not repo or number_of_movies != self._number_of_movies:
+            self._movie_ids = repo.get_movie_ids()
+            self._number_of_movies = number_of_movies
+
+        rotation = services.get_random_movies(self._rotation_size, repo, self._movie_ids)
+        for movie in rotation:
+            movie['id'] = self._movie_url(movie)
+        return rotation
@@ -2,6 +2,8 @@ from flask import Blueprint, request, render_template, redirect, url_for, sessio
 
 import CS235Flix.adapters.repository as repo
 import CS235Flix.utilities.services as services
+import CS235Flix.utilities.navigation as navigation
+import CS235Flix.utilities.sidebar as sidebar
 
 
 # Configure Blueprint
@@ -10,18 +12,22 @@ utilities_blueprint = Blueprint(
 
 
 def get_genres_and_urls():
-    genre_names = services.get_genre_names(repo.repo_instance)
-    genre_urls = dict()
-    for genre_name in genre_names:
-        genre_urls[genre_name] = url_for('movies_bp.movies_by_genre', genre=genre_name)
-    return genre_urls
+    return navigation.genre_navigation.get_genre_urls(repo.repo_instance)
 
 
-def get_selected_movies(quantity=10):
-    movies = services.get_random_movies(quantity, repo.repo_instance)
+def genre_url(genre_name: str):
+    return url_for('movies_bp.movies_by_genre', genre=genre_name)
+
+
+@utilities_blueprint.app_context_processor
+def inject_genre_navigation():
+    # Every page shows the links to the genres, so they are available to all templates
+    return dict(genre_navigation=navigation.genre_navigation.get_html(repo.repo_instance))
 
-    for movie in movies:
-        movie['id'] = url_for('movies_bp.movies_by_release_year', year=int(movie['release_year'])) # movie['hyperlink']
-    return movies
+
+def get_selected_movies(quantity=10):
+    return sidebar.sidebar_sampler.get_selected_movies(quantity, repo.repo_instance)
 
 
+def movie_url(movie: dict):
+    return url_for('movies_bp.movies_by_release_year', year=int(movie['release_year']))
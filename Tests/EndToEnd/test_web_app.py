@@ -2,6 +2,11 @@ import pytest
 
 from flask import session
 
+import CS235Flix.adapters.cover_art as cover_art
+import CS235Flix.adapters.repository as repo
+import CS235Flix.utilities.navigation as navigation
+from CS235Flix.domainmodel.model import Genre
+
 
 def test_register(client):  # Test the register method in authentication.py
     # Check that we retrieve the register page.
@@ -126,6 +131,17 @@ def test_movies_with_release_year(client):
     assert b'Prisoners' not in response.data
 
 
+def test_movies_with_release_year_link_to_neighbouring_release_years(client):
+    response = client.get('/movies_by_release_year?year=2014')
+    assert response.status_code == 200
+
+    # The test data has no movies from 2013 or 2015, so navigation skips straight to 2012 and 2016
+    assert b'/movies_by_release_year?year=2012' in response.data
+    assert b'/movies_by_release_year?year=2016' in response.data
+    assert b'/movies_by_release_year?year=2013' not in response.data
+    assert b'/movies_by_release_year?year=2015' not in response.data
+
+
 def test_movies_with_review(client):
     # Check that we can retrieve the movies page:
     response = client.get('/movies_by_release_year?year=2014&view_reviews_for=1')
@@ -147,6 +163,25 @@ def test_movies_with_genre(client):
     assert b"Don't Breathe" not in response.data  # The movie "Don't Breathe" is classified as Horror, but it is not in the testing data
 
 
+def test_movies_with_genre_sorted_by_revenue(client):
+    response = client.get('/movies_by_genre?genre=Adventure&sort=revenue')
+    assert response.status_code == 200
+
+    # Guardians of the Galaxy has the highest revenue, followed by Suicide Squad
+    assert response.data.index(b'Guardians of the Galaxy') < response.data.index(b'Suicide Squad')
+    assert response.data.index(b'Suicide Squad') < response.data.index(b'Prometheus')
+    assert b'/movies_by_genre?genre=Adventure&amp;sort=year' in response.data
+
+
+def test_home_and_genre_pages_show_the_top_rated_movies(client):
+    response = client.get('/')
+    assert b'Top Rated Movies' in response.data
+    assert b'8.3/10 from 258682 votes' in response.data
+
+    response = client.get('/movies_by_genre?genre=Adventure')
+    assert b'Top rated' in response.data
+
+
 def test_search_by_actor_fullname(client):
     # Check that we can search movies by an actor fullname
     response = client.post('/search', data={'actor': "Chris Pratt"})
@@ -200,11 +235,110 @@ def test_can_suggest_movies_to_a_logged_in_user(client, auth):
     response = client.get('/suggest')
     assert response.status_code == 200
 
-    # Check that we a desired movie is returned
-    assert b'Guardians of the Galaxy' in response.data
+    # Check that we a desired movie is returned, and that the movie the user reviewed is not
+    assert b'Suicide Squad' in response.data
+    assert b'Guardians of the Galaxy' not in response.data
 
 
 def test_repository_will_not_suggest_movies_un_logged_in_user(client):
     # Check that we can retrieve suggestions for the logged in user:
     response = client.get('/suggest')
-    assert response.headers['Location'] == 'http://localhost/authentication/login'
\ No newline at end of file
+    assert response.headers['Location'] == 'http://localhost/authentication/login'
+
+def test_index_shows_covers_prefetched_at_start_up(client):
+    # The covers of the home page movies are resolved in the background as soon as the app is created.
+    cover_art.cover_service.wait_for_prefetch()
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b'https://covers.example/Guardians_of_the_Galaxy-2014.jpg' in response.data
+    assert b'cover_placeholder.svg' not in response.data
+
+
+def test_actor_network(client):
+    # Check that we can retrieve the actor network page
+    response = client.get('/actor_network')
+    assert response.status_code == 200
+    assert b'Most connected actors' in response.data
+    assert b'Chris Pratt' in response.data
+
+    # Check that we can find the connection between two actors
+    response = client.get('/actor_network?actor=Bradley+Cooper&target=Jennifer+Lawrence')
+    assert response.status_code == 200
+    assert b'Bradley Cooper is 2 degree(s) of separation from Jennifer Lawrence' in response.data
+
+    # Check that we can list the colleagues of an actor
+    response = client.get('/actor_network?actor=Ryan+Gosling')
+    assert response.status_code == 200
+    assert b'Emma Stone' in response.data
+
+    response = client.get('/actor_network?actor=Not+Exist')
+    assert b'No actor named Not Exist was found' in response.data
+
+
+def test_actor_network_ignores_hops_that_are_not_numbers(client):
+    response = client.get('/actor_network?actor=Ryan+Gosling&hops=abc')
+    assert response.status_code == 200
+    assert b'Emma Stone' in response.data
+
+
+def test_browse_movies(client):
+    # Check that we can combine criteria
+    response = client.get('/browse?genre=Action&genre=Adventure&min_year=2016&max_revenue=100')
+    assert response.status_code == 200
+    assert b'2 results found' in response.data
+    assert b'The Great Wall' in response.data
+    assert b'The Lost City of Z' in response.data
+    assert b'Fantasy (1)' in response.data
+
+    # Invalid numbers are ignored
+    response = client.get('/browse?actor=Chris+Pratt&min_runtime=long')
+    assert b'2 results found' in response.data
+
+
+def test_similar_movies(client):
+    response = client.get('/similar_movies?movie=5')
+    assert response.status_code == 200
+    assert b'More like Suicide Squad' in response.data
+    assert b'The Great Wall' in response.data
+
+    # Unknown movies redirect to the home page
+    response = client.get('/similar_movies?movie=99')
+    assert response.headers['Location'] == 'http://localhost/'
+
+
+def test_reviews_are_kept_in_the_database_repository(make_database_client):
+    client = make_database_client()
+    client.post('authentication/login', data={'username': 'thorke', 'password': 'cLQ^C#oFXloS'})
+    client.post('/review', data={'review': 'what a great movie!', 'rating': 10, 'movie_id': 1})
+
+    # A new application on the same database still has the review
+    response = make_database_client().get('/movies_by_release_year?year=2014&view_reviews_for=1')
+    assert b'what a great movie!' in response.data
+    assert b'This movie is great!' in response.data
+
+
+def test_columnar_repository_serves_the_application(columnar_client):
+    assert b'Guardians of the Galaxy' in columnar_client.get('/').data
+    assert b'Prometheus' in columnar_client.get('/movies_by_genre?genre=Sci-Fi').data
+
+    columnar_client.post('authentication/login', data={'username': 'thorke', 'password': 'cLQ^C#oFXloS'})
+    columnar_client.post('/review', data={'review': 'what a great movie!', 'rating': 10, 'movie_id': 1})
+    response = columnar_client.get('/movies_by_release_year?year=2014&view_reviews_for=1')
+    assert b'what a great movie!' in response.data
+
+
+def test_genre_links_are_kept_until_a_genre_is_added(client):
+    response = client.get('/')
+    assert b'<a href="/movies_by_genre?genre=Sci-Fi">Sci-Fi</a>' in response.data
+    assert b'<a href="/movies_by_genre?genre=Sci-Fi">Sci-Fi</a>' in client.get('/authentication/login').data
+
+    with client.application.test_request_context():
+        html = navigation.genre_navigation.get_html(repo.repo_instance)
+        assert navigation.genre_navigation.get_html(repo.repo_instance) is html
+
+        repo.repo_instance.add_genre(Genre("Film Noir"))
+        assert navigation.genre_navigation.get_html(repo.repo_instance) is not html
+        assert navigation.genre_navigation.get_genre_urls(repo.repo_instance)['Film Noir'] == \
+            '/movies_by_genre?genre=Film+Noir'
+
+    assert b'>Film Noir</a>' in client.get('/').data
@@ -43,4 +43,17 @@ class TestActorMethods:
         actor1.add_actor_colleague(actor2)
         assert actor1.check_if_this_actor_worked_with(actor2) == True
         assert actor2.check_if_this_actor_worked_with(actor1) == True
-        assert actor1.check_if_this_actor_worked_with(actor3) == False
\ No newline at end of file
+        assert actor1.check_if_this_actor_worked_with(actor3) == False
+
+    def test_add_actor_colleague_does_not_duplicate_colleagues(self):
+        actor1 = Actor("Angelina Jolie")
+        actor2 = Actor("Brad Pitt")
+        actor1.add_actor_colleague(actor2)
+        actor2.add_actor_colleague(actor1)
+        actor1.add_actor_colleague(actor1)
+
+        assert actor1.get_number_of_colleagues() == 1
+        assert list(actor1.actor_colleague) == [actor2]
+        assert actor1.get_number_of_collaborations(actor2) == 2
+        assert actor2.get_number_of_collaborations(actor1) == 2
+        assert actor1.get_number_of_collaborations(Actor("Not an Actor")) == 0
@@ -1,4 +1,5 @@
 from CS235Flix.adapters.datafilereaders.movie_file_csv_reader import MovieFileCSVReader
+from CS235Flix.domainmodel.model import Movie, Actor
 
 class TestMovieFileCSVReader:
     def test_attribute(self):
@@ -11,10 +12,28 @@ class TestMovieFileCSVReader:
         assert len(movie_file_reader.dataset_of_actors) == 1985
         assert len(movie_file_reader.dataset_of_genres) == 20
 
-        # more tests for extra features
+        # more tests for extra features; there is a value for every row, and None where it is missing
         assert len(movie_file_reader.dataset_of_description) == 1000
         assert len(movie_file_reader.dataset_of_runtime) == 1000
         assert len(movie_file_reader.dataset_of_ratings) == 1000
         assert len(movie_file_reader.dataset_of_votes) == 1000
-        assert len(movie_file_reader.dataset_of_revenue) == 872
-        assert len(movie_file_reader.dataset_of_metadata) == 838
\ No newline at end of file
+        assert len(movie_file_reader.dataset_of_revenue) == 1000
+        assert len(movie_file_reader.dataset_of_metadata) == 1000
+        assert len([revenue for revenue in movie_file_reader.dataset_of_revenue if revenue is not None]) == 872
+        assert len([score for score in movie_file_reader.dataset_of_metadata if score is not None]) == 936
+
+    def test_columns_stay_aligned_with_the_rows(self):
+        movie_file_reader = MovieFileCSVReader('Tests/data/movies.csv')
+        movie_file_reader.read_csv_file()
+
+        # Mindhorn, the 8th row, has no revenue, and the values of the rows after it aren't shifted
+        assert movie_file_reader.dataset_of_movies[7] == Movie("Mindhorn", 2016)
+        assert movie_file_reader.dataset_of_movies[7].id == 8
+        assert movie_file_reader.dataset_of_revenue[7] is None
+        assert movie_file_reader.dataset_of_metadata[7] == 71
+        assert movie_file_reader.dataset_of_revenue[8] == 8.01
+        assert movie_file_reader.dataset_of_runtime[8] == 141
+
+        # Actors are listed once, in the order they first appear
+        assert movie_file_reader.dataset_of_actors[:2] == [Actor("Chris Pratt"), Actor("Vin Diesel")]
+        assert movie_file_reader.dataset_of_actors.count(Actor("Chris Pratt")) == 1
@@ -1,4 +1,6 @@
-from CS235Flix.domainmodel.model import Movie, Actor, Director
+import weakref
+
+from CS235Flix.domainmodel.model import Movie, Actor, Director, User, make_review
 import pytest
 class TestMovieMethods:
     def test_init(self):
@@ -29,6 +31,23 @@ class TestMovieMethods:
             movie1.set_runtime_minutes(-6)
             assert movie1.runtime_minutes == ValueError
 
+    def test_rating_votes_and_metascore(self):
+        movie1 = Movie("Moana", 2016, 1)
+        assert movie1.rating is None and movie1.votes is None and movie1.metascore is None
+
+        movie1.set_rating(7.6)
+        movie1.set_votes(118151)
+        movie1.set_metascore(81.0)
+        assert (movie1.rating, movie1.votes, movie1.metascore) == (7.6, 118151, 81.0)
+
+        # Values out of range or missing are ignored
+        movie1.set_rating(11)
+        movie1.set_rating(float('nan'))
+        movie1.set_votes(-1)
+        movie1.set_votes(None)
+        movie1.set_metascore(101)
+        assert (movie1.rating, movie1.votes, movie1.metascore) == (7.6, 118151, 81.0)
+
     def test_remove_actor(self):
         movie1 = Movie("Moana", 2016, 2)
         movie1.add_actor(Actor("Some Actor"))
@@ -57,4 +76,20 @@ class TestMovieMethods:
         movie3 = Movie("Wrong", 1800, 2)
         assert movie1.release_year == 2016
         assert movie2.release_year is None
-        assert movie3.release_year is None
\ No newline at end of file
+        assert movie3.release_year is None
+
+    def test_compact_layout(self):
+        movie1 = Movie("Moana", 2016, 1)
+        movie2 = Movie("Kong", 2016, 2)
+        assert not hasattr(movie1, '__dict__')
+        assert weakref.ref(movie1)() is movie1
+
+        # Movies without reviews share their empty collection until they are reviewed
+        assert movie1.number_of_reviews == 0
+        make_review("Lovely", User("dave", "Password1"), movie1, 8)
+        assert movie1.number_of_reviews == 1
+        assert movie2.number_of_reviews == 0
+        assert [review.review_text for review in movie1.reviews] == ["Lovely"]
+
+        # Actor names are interned
+        assert Actor(" ".join(["Dwayne", "Johnson"])).actor_full_name is Actor("Dwayne Johnson ").actor_full_name
@@ -26,4 +26,17 @@ class TestUserMethods:
         review = Review(user1, movie1, "This is a great movie!", 9, date.fromisoformat('2020-03-15'))
         user1.add_review(review)
 
-        assert user1.reviews == [review]
\ No newline at end of file
+        assert user1.reviews == [review]
+
+    def test_set_password(self):
+        user1 = User('user1', 'pw12345')
+        assert user1.set_password('pw67890') is True
+        assert user1.password == 'pw67890'
+        assert user1.set_password('') is False
+        assert user1.password == 'pw67890'
+
+    def test_hash(self):
+        user1 = User('user1', 'pw12345')
+        user2 = User('USER1', 'pw67890')
+        assert user1 == user2
+        assert hash(user1) == hash(user2)
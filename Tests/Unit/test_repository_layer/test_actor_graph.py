@@ -0,0 +1,42 @@
+import pytest
+
+from CS235Flix.adapters.actor_graph import ActorGraph
+from CS235Flix.domainmodel.model import Actor
+
+
+@pytest.fixture
+def actor_graph():
+    # A chain a - b - c - d - e, with a shortcut b - d, and an isolated actor f
+    actors = {name: Actor(name) for name in ["a", "b", "c", "d", "e", "f"]}
+    for name, colleague in [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e"), ("b", "d")]:
+        actors[name].add_actor_colleague(actors[colleague])
+    return ActorGraph.from_actors(actors.values())
+
+
+def test_actor_graph_stores_each_collaboration_once(actor_graph):
+    assert actor_graph.number_of_actors == 6
+    assert actor_graph.number_of_collaborations == 5
+
+
+def test_actor_graph_finds_a_shortest_path(actor_graph):
+    assert actor_graph.shortest_path("a", "e") == ["a", "b", "d", "e"]
+    assert actor_graph.shortest_path("E", " a ") == ["e", "d", "b", "a"]
+    assert actor_graph.degrees_of_separation("a", "c") == 2
+    assert actor_graph.shortest_path("c", "c") == ["c"]
+
+
+def test_actor_graph_returns_no_path_between_unconnected_or_unknown_actors(actor_graph):
+    assert actor_graph.shortest_path("a", "f") is None
+    assert actor_graph.shortest_path("a", "z") is None
+    assert actor_graph.degrees_of_separation("a", "f") is None
+
+
+def test_actor_graph_lists_the_neighbourhood_of_an_actor(actor_graph):
+    assert actor_graph.neighbourhood("a", 1) == [("b", 1)]
+    assert actor_graph.neighbourhood("a", 2) == [("b", 1), ("c", 2), ("d", 2)]
+    assert actor_graph.neighbourhood("f", 3) == []
+    assert actor_graph.neighbourhood("z", 1) is None
+
+
+def test_actor_graph_ranks_the_most_connected_actors(actor_graph):
+    assert actor_graph.most_connected(3) == [("b", 3), ("d", 3), ("c", 2)]
@@ -0,0 +1,369 @@
+from datetime import date
+
+import pytest
+from werkzeug.security import check_password_hash
+
+from CS235Flix.adapters.columnar_repository import ColumnarMemoryRepository, populate
+from CS235Flix.adapters.repository import RepositoryException
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList, make_review
+
+TEST_DATA_PATH = "Tests/data/"
+
+
+def test_repository_can_retrieve_entity_counts(columnar_repo):
+    assert columnar_repo.get_total_number_of_movies_in_repo() == 10
+    assert columnar_repo.get_total_number_of_directors() == 10
+    assert columnar_repo.get_total_number_of_actors() == 39
+    assert columnar_repo.get_total_number_of_genres_in_repo() == 14
+    assert columnar_repo.get_total_number_of_reviews() == 3
+
+
+def test_repository_can_add_and_retrieve_a_user(columnar_repo):
+    columnar_repo.add_user(User('Dave', '123456789'))
+
+    assert columnar_repo.get_user('Dave') == User('dave', '123456789')
+    assert columnar_repo.get_user('DAVE').password == '123456789'
+    assert columnar_repo.get_user('prince') is None
+    assert columnar_repo.check_user_existence_in_repo(User('Fmercury', 'password')) is True
+
+
+def test_repository_stores_hashed_passwords(columnar_repo):
+    assert check_password_hash(columnar_repo.get_user('fmercury').password, 'mvNNbc1eLA$i')
+
+
+def test_repository_can_retrieve_movie_ids(columnar_repo):
+    assert columnar_repo.get_movie_ids() == list(range(1, 11))
+
+    columnar_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+    assert columnar_repo.get_movie_ids() == list(range(1, 11)) + [1050]
+
+
+def test_repository_can_retrieve_movie_by_index(columnar_repo):
+    movie = columnar_repo.get_movie_by_index(1)
+
+    assert movie.title == "Guardians of the Galaxy"
+    assert movie.release_year == 2014
+    assert movie.director == Director("James Gunn")
+    assert movie.runtime_minutes == 121
+    assert list(movie.actors) == [Actor("Chris Pratt"), Actor("Vin Diesel"), Actor("Bradley Cooper"),
+                                  Actor("Zoe Saldana")]
+    assert list(movie.genres) == [Genre("Action"), Genre("Adventure"), Genre("Sci-Fi")]
+
+    assert [review.review_text for review in movie.reviews] == ["This movie is great!", "This movie is awesome",
+                                                                "Love it!"]
+    assert [review.review_author.username for review in movie.reviews] == ["fmercury", "thorke", "mjackson"]
+
+    assert columnar_repo.get_movie_by_index(99999) is None
+
+
+def test_repository_can_retrieve_movie_by_title_and_release_year(columnar_repo):
+    assert columnar_repo.get_movie("La La Land", 2016).id == 7
+    assert columnar_repo.get_movie("La La Land", 2017) is None
+    assert columnar_repo.check_movie_existence_in_repo(Movie("La La Land", 2016)) is True
+    assert columnar_repo.check_movie_existence_in_repo(Movie("La La Land", 2017)) is False
+
+
+def test_repository_can_retrieve_genres(columnar_repo):
+    genres = columnar_repo.get_genres()
+
+    assert len(genres) == 14
+    assert [genre for genre in genres if genre.genre_name == 'Sci-Fi'][0].number_of_classified_movies == 2
+    assert [genre for genre in genres if genre.genre_name == 'Comedy'][0].number_of_classified_movies == 3
+
+    # The genres of loaded movies know how many movies they classify
+    movie = columnar_repo.get_movie_by_index(1)
+    assert [genre.number_of_classified_movies for genre in movie.genres] == [4, 6, 2]
+
+
+def test_repository_can_retrieve_movies_by_year(columnar_repo):
+    assert [movie.id for movie in columnar_repo.get_movies_by_release_year(2014)] == [1]
+    assert len(columnar_repo.get_movies_by_release_year(2016)) == 8
+    assert columnar_repo.get_movies_by_release_year(1800) == []
+    assert columnar_repo.get_release_years() == [2012, 2014, 2016]
+
+
+def test_repository_can_get_the_latest_and_oldest_movies(columnar_repo):
+    assert columnar_repo.get_latest_movie() == Movie('La La Land', 2016)
+    assert columnar_repo.get_oldest_movie() == Movie('Prometheus', 2012)
+
+
+def test_repository_returns_release_years_of_neighbouring_movies(columnar_repo):
+    movie = columnar_repo.get_movie_by_index(1)
+    assert columnar_repo.get_release_year_of_previous_movie(movie) == 2012
+    assert columnar_repo.get_release_year_of_next_movie(movie) == 2016
+
+    assert columnar_repo.get_release_year_of_previous_movie(columnar_repo.get_movie_by_index(2)) is None
+    assert columnar_repo.get_release_year_of_next_movie(columnar_repo.get_movie_by_index(3)) is None
+    assert columnar_repo.get_release_year_of_next_movie(Movie("Avengers : End Game", 2019, 1050)) is None
+
+
+def test_repository_can_add_a_movie(columnar_repo):
+    assert columnar_repo.get_release_years() == [2012, 2014, 2016]
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_revenue(858.37)
+    movie.set_director(Director("Anthony Russo"))
+    movie.add_actor(Actor("Chris Pratt"))
+    movie.add_genre(Genre("Action"))
+    columnar_repo.add_movie(movie)
+
+    stored_movie = columnar_repo.get_movie_by_index(1050)
+    assert stored_movie == movie
+    assert stored_movie.director == Director("Anthony Russo")
+    assert list(stored_movie.actors) == [Actor("Chris Pratt")]
+    assert columnar_repo.get_top_6_highest_revenue_movies()[0] == movie
+    assert columnar_repo.get_latest_movie() == movie
+    assert columnar_repo.get_release_years() == [2012, 2014, 2016, 2019]
+    assert list(columnar_repo.get_movie_indexes_for_genre("Action")) == [1, 5, 6, 9, 1050]
+    assert [movie.id for movie in columnar_repo.get_movies_played_by_an_actor("Chris Pratt")] == [1, 10, 1050]
+
+    # Adding the same movie again changes nothing
+    columnar_repo.add_movie(movie)
+    assert columnar_repo.get_total_number_of_movies_in_repo() == 11
+
+
+def test_repository_can_add_actors_directors_and_genres(columnar_repo):
+    columnar_repo.add_actor(Actor("Keanu Reeves"))
+    columnar_repo.add_director(Director("Chad Stahelski"))
+    columnar_repo.add_genre(Genre("Noir"))
+
+    assert columnar_repo.get_actor("Keanu Reeves") == Actor("Keanu Reeves")
+    assert columnar_repo.get_director("Chad Stahelski") == Director("Chad Stahelski")
+    assert columnar_repo.check_genre_existence(Genre("Noir")) is True
+    assert columnar_repo.get_actor("Fake Actor") is None
+    assert columnar_repo.get_director("Fake Director") is None
+    assert columnar_repo.check_actor_existence_in_repo(Actor("Matt Damon")) is True
+    assert columnar_repo.check_director_existence_in_repo(Director("Sean Foley")) is True
+    assert columnar_repo.check_genre_existence(Genre("Fake Genre")) is False
+
+
+def test_repository_links_a_genre_to_its_stored_movies(columnar_repo):
+    genre = Genre("Noir")
+    genre.add_Movie(Movie("Split", 2016))
+    genre.add_Movie(Movie("Not In Repo", 2020))
+    columnar_repo.add_genre(genre)
+
+    assert list(columnar_repo.get_movie_indexes_for_genre("Noir")) == [3]
+    assert list(columnar_repo.get_movie_by_index(3).genres)[-1] == genre
+
+
+def test_repository_links_actor_colleagues_across_movies(columnar_repo):
+    chris_pratt = columnar_repo.get_actor("Chris Pratt")
+    colleagues = columnar_repo.get_actor_colleague(chris_pratt)
+
+    # Chris Pratt played in Guardians of the Galaxy (4 actors) and Passengers (4 actors)
+    assert len(colleagues) == 6
+    assert Actor("Jennifer Lawrence") in colleagues
+    assert chris_pratt.get_number_of_collaborations(Actor("Vin Diesel")) == 1
+    assert [movie.title for movie in chris_pratt.played_movies] == ["Guardians of the Galaxy", "Passengers"]
+
+
+def test_repository_searches_movies_by_actor_and_director(columnar_repo):
+    assert [movie.title for movie in columnar_repo.get_movies_played_by_an_actor("  chris PRATT ")] == \
+        ["Guardians of the Galaxy", "Passengers"]
+    assert [movie.title for movie in columnar_repo.get_movies_directed_by_a_director("james gunn")] == \
+        ["Guardians of the Galaxy"]
+    assert columnar_repo.get_movies_played_by_an_actor("Fake Actor") == []
+
+    assert [movie.title for movie in columnar_repo.search_movies_by_actor_and_director(
+        'Ryan Gosling', 'Damien Chazelle')] == ['La La Land']
+    assert columnar_repo.search_movies_by_actor_and_director('Ryan Gosling', 'Fake Director') == []
+
+    # Exact-match lookups remain case sensitive
+    assert columnar_repo.get_actor("chris pratt") is None
+
+
+def test_repository_searches_movie_titles(columnar_repo):
+    assert [movie.id for movie in columnar_repo.search_movie_by_title('Suicide Squad')] == [5]
+    assert [movie.id for movie in columnar_repo.search_movie_by_title("Z")] == [9]
+    assert [movie.id for movie in columnar_repo.search_movie_by_title("OF THE GALAX")] == [1]
+    assert columnar_repo.search_movie_by_title("galaxy quest") == []
+    assert len(columnar_repo.search_movie_by_title("")) == 10
+
+    # The title index is rebuilt for a movie added after a search
+    columnar_repo.add_movie(Movie("Galaxy Quest", 1999, 1050))
+    assert [movie.id for movie in columnar_repo.search_movie_by_title("galaxy quest")] == [1050]
+
+
+
+def test_repository_can_rank_movie_title_search_results(columnar_repo):
+    columnar_repo.add_movie(Movie("The", 2019, 1050))
+
+    titles = [movie.title for movie in columnar_repo.search_movie_by_title("the", ranked=True)]
+    assert titles == ["The", "The Great Wall", "The Lost City of Z", "Guardians of the Galaxy", "Prometheus"]
+
+
+def test_repository_can_retrieve_movies_for_a_indexes_list(columnar_repo):
+    movies = columnar_repo.get_movies_by_index([10, 3, 35455647, 1])
+    assert [movie.title for movie in movies] == ['Passengers', 'Split', 'Guardians of the Galaxy']
+    assert columnar_repo.get_movies_by_index([22222, 33333]) == []
+
+
+
+def test_repository_can_order_movie_indexes_for_a_genre(columnar_repo):
+    assert list(columnar_repo.get_movie_indexes_for_genre("Adventure")) == [1, 2, 5, 6, 9, 10]
+    assert list(columnar_repo.get_movie_indexes_for_genre("Adventure", order='year')) == [2, 1, 10, 5, 6, 9]
+    assert list(columnar_repo.get_movie_indexes_for_genre("Adventure", order='revenue')) == [1, 5, 2, 10, 6, 9]
+    assert len(columnar_repo.get_movie_indexes_for_genre("Fake Genre")) == 0
+
+    with pytest.raises(ValueError):
+        columnar_repo.get_movie_indexes_for_genre("Adventure", order='title')
+
+
+def test_repository_does_not_let_callers_change_movie_indexes_for_a_genre(columnar_repo):
+    movie_ids = columnar_repo.get_movie_indexes_for_genre("Adventure")
+    with pytest.raises(TypeError):
+        movie_ids[0] = 1050
+    assert list(columnar_repo.get_movie_indexes_for_genre("Adventure")) == [1, 2, 5, 6, 9, 10]
+
+
+def test_repository_can_get_movie_attributes(columnar_repo):
+    movie = Movie("Passengers", 2016)
+    assert [genre.genre_name for genre in columnar_repo.get_movie_genres(movie)] == ["Adventure", "Drama", "Romance"]
+    assert columnar_repo.get_movie_director(movie) == Director("Morten Tyldum")
+    assert columnar_repo.get_movie_runtime_minutes(movie) == 116
+    assert columnar_repo.get_movie_release_year(movie) == 2016
+    assert len(list(columnar_repo.get_movie_actors(movie))) == 4
+    assert list(columnar_repo.get_movie_reviews(movie)) == []
+    assert columnar_repo.get_movie_description(Movie("Passengers", 2017)) is None
+
+
+def test_repository_can_add_a_review(columnar_repo):
+    user = columnar_repo.get_user('thorke')
+    movie = columnar_repo.get_movie_by_index(7)
+    review = make_review("Great music", user, movie, 9)
+    columnar_repo.add_review(review)
+
+    assert columnar_repo.get_total_number_of_reviews() == 4
+    assert [review.review_text for review in columnar_repo.get_movie_by_index(7).reviews] == ["Great music"]
+    assert [movie.id for movie in columnar_repo.get_user_reviewed_movie("thorke")] == [1, 7]
+    assert len(columnar_repo.get_user('thorke').reviews) == 2
+    assert columnar_repo.get_reviews()[-1] == review
+
+
+def test_repository_does_not_add_a_review_without_proper_links(columnar_repo):
+    movie = columnar_repo.get_movie_by_index(3)
+    review = Review(user=None, movie=movie, review_text="testing", rating=6, timestamp=date.today())
+    with pytest.raises(RepositoryException):
+        columnar_repo.add_review(review)
+
+    review = make_review("Unknown user", User('prince', 'Purple1Rain'), movie, 6)
+    with pytest.raises(RepositoryException):
+        columnar_repo.add_review(review)
+    assert columnar_repo.get_total_number_of_reviews() == 3
+
+
+
+def test_repository_can_add_a_watchlist(columnar_repo):
+    watchlist = WatchList()
+    watchlist.add_movie(columnar_repo.get_movie_by_index(3), date(2020, 10, 1))
+    watchlist.add_movie(columnar_repo.get_movie_by_index(10), date(2020, 10, 2))
+    columnar_repo.add_watchlist(watchlist)
+
+    retrieved_watchlists = columnar_repo.get_watchlist()
+    assert len(retrieved_watchlists) == 1
+    assert [movie.id for movie in retrieved_watchlists[0]] == [3, 10]
+    assert retrieved_watchlists[0].get_schedule()[Movie("Passengers", 2016)] == date(2020, 10, 2)
+
+
+def test_repository_can_suggest_movies_to_a_user(columnar_repo):
+    assert columnar_repo.get_suggestion_for_user("thorke") == [Movie("Suicide Squad", 2016),
+                                                                Movie("Prometheus", 2012)]
+    assert columnar_repo.get_top_movie_by_genre(Genre("Fantasy")).title == "Suicide Squad"
+
+    user = columnar_repo.get_user("thorke")
+    columnar_repo.add_review(make_review("Great music", user, columnar_repo.get_movie_by_index(7), 9))
+    columnar_repo.add_review(make_review("Funny", user, columnar_repo.get_movie_by_index(8), 7))
+    suggestions = [movie.title for movie in columnar_repo.get_suggestion_for_user("thorke")]
+    assert suggestions[0] == "Sing"
+
+
+def test_repository_recommends_movies_rated_alike_by_other_users(columnar_repo):
+    assert columnar_repo.get_recommended_movies_for_user("thorke", 10) == []
+
+    la_la_land = columnar_repo.get_movie_by_index(7)
+    columnar_repo.add_review(make_review("Lovely", columnar_repo.get_user("fmercury"), la_la_land, 9))
+
+    assert columnar_repo.get_recommended_movies_for_user("thorke", 10) == [la_la_land]
+
+
+def test_repository_builds_derived_indexes(columnar_repo):
+    facet_index = columnar_repo.get_facet_index()
+    selection = facet_index.select(genres=["Action", "Adventure"])
+    assert facet_index.movie_ids(selection) == [1, 5, 6, 9]
+    assert facet_index.movie_ids(facet_index.select(actor="chris pratt")) == [1, 10]
+    assert facet_index.movie_ids(facet_index.select(director="Ridley Scott", genres=["Mystery"])) == [2]
+
+    graph = columnar_repo.get_actor_graph()
+    assert graph.number_of_actors == 39
+    assert graph.most_connected(1) == [('Chris Pratt', 6)]
+    # The colleagues of an actor are in the order of their movies and casts
+    chris_pratt = columnar_repo.get_actor("Chris Pratt")
+    assert [graph.actor_name(colleague) for colleague in graph.colleagues(0)] == \
+        [actor.actor_full_name for actor in chris_pratt.actor_colleague]
+
+    similar_movies = columnar_repo.get_similar_movies(columnar_repo.get_movie_by_index(5), 2)
+    assert similar_movies[0] == Movie("The Great Wall", 2016)
+    assert columnar_repo.get_similar_movies(Movie("Not In Repo", 2020, 99), 2) == []
+
+
+def test_repository_answers_queries_like_the_memory_repository(columnar_repo, in_memory_repo):
+    def movie_summary(movie):
+        return (movie.id, movie.title, movie.release_year, movie.description, movie.director, list(movie.actors),
+                list(movie.genres), movie.runtime_minutes, movie.revenue,
+                movie.rating, movie.votes, movie.metascore,
+                [(review.review_author.username, review.rating) for review in movie.reviews])
+
+    for repo in (columnar_repo, in_memory_repo):
+        repo.add_movie(Movie("Untitled", 2016, 1050))
+    assert [movie_summary(movie) for movie in columnar_repo.get_movies_by_index(range(1, 1051))] == \
+        [movie_summary(movie) for movie in in_memory_repo.get_movies_by_index(range(1, 1051))]
+    assert [genre.genre_name for genre in columnar_repo.get_genres()] == \
+        [genre.genre_name for genre in in_memory_repo.get_genres()]
+
+    for genre in in_memory_repo.get_genres():
+        for order in ('id', 'year', 'revenue'):
+            assert columnar_repo.get_movie_indexes_for_genre(genre.genre_name, order) == \
+                in_memory_repo.get_movie_indexes_for_genre(genre.genre_name, order)
+    for query in ('', 'the', 'a', 'Split'):
+        for ranked in (False, True):
+            assert columnar_repo.search_movie_by_title(query, ranked) == \
+                in_memory_repo.search_movie_by_title(query, ranked)
+    assert columnar_repo.get_top_6_highest_revenue_movies() == in_memory_repo.get_top_6_highest_revenue_movies()
+    assert columnar_repo.get_movies_by_release_year(2016) == in_memory_repo.get_movies_by_release_year(2016)
+    assert columnar_repo.get_oldest_movie() == in_memory_repo.get_oldest_movie()
+    assert columnar_repo.get_suggestion_for_user('thorke') == in_memory_repo.get_suggestion_for_user('thorke')
+    for criterion in ('rating', 'votes', 'metascore', 'weighted_rating'):
+        for genre_name, release_year in ((None, None), ('Adventure', None), (None, 2016), ('Comedy', 2016)):
+            assert columnar_repo.get_top_movies(criterion, 4, genre_name, release_year) == \
+                in_memory_repo.get_top_movies(criterion, 4, genre_name, release_year)
+
+
+def test_repository_loads_the_same_movies_in_any_number_of_chunks(columnar_repo, monkeypatch):
+    import CS235Flix.adapters.parallel_csv as parallel_csv
+    monkeypatch.setattr(parallel_csv, 'RANGE_SIZE', 512)
+    repo = ColumnarMemoryRepository()
+    statistics = populate(TEST_DATA_PATH, repo, workers=1)
+
+    assert statistics.number_of_rows == 16
+    assert [(movie, list(movie.actors), list(movie.genres), movie.director) for movie in
+            repo.get_movies_by_index(range(1, 11))] == \
+        [(movie, list(movie.actors), list(movie.genres), movie.director) for movie in
+         columnar_repo.get_movies_by_index(range(1, 11))]
+    assert repo.get_total_number_of_actors() == 39
+
+
+def test_repository_genres_read_their_movies_from_the_columns(columnar_repo):
+    sci_fi = [genre for genre in columnar_repo.get_genres() if genre.genre_name == 'Sci-Fi'][0]
+
+    assert [movie.title for movie in sci_fi.classified_movies] == ["Guardians of the Galaxy", "Prometheus"]
+    assert sci_fi.is_applied_to(Movie("Prometheus", 2012)) is True
+    assert sci_fi.is_applied_to(Movie("Split", 2016)) is False
+
+    columnar_repo.add_movie(_movie_with_genre("Arrival", 2016, 1050, "Sci-Fi"))
+    assert sci_fi.number_of_classified_movies == 3
+
+
+def _movie_with_genre(title, release_year, movie_id, genre_name):
+    movie = Movie(title, release_year, movie_id)
+    movie.add_genre(Genre(genre_name))
+    return movie
@@ -0,0 +1,172 @@
+import os
+import threading
+
+from CS235Flix.adapters.cover_art import CoverCache, CoverResolver, CoverService
+from CS235Flix.domainmodel.model import Movie
+
+
+class BlockingCoverResolver(CoverResolver):
+    def __init__(self):
+        self.release = threading.Event()
+        self.resolved_titles = list()
+
+    def resolve(self, title: str, release_year: int):
+        self.release.wait(timeout=5)
+        self.resolved_titles.append(title)
+        return 'https://covers.example/{}.jpg'.format(release_year)
+
+
+class UnavailableCoverResolver(CoverResolver):
+    def resolve(self, title: str, release_year: int):
+        raise ConnectionError
+
+
+def test_cover_cache_persists_covers_to_disk(tmp_path):
+    path = str(tmp_path / 'cache' / 'covers.json')
+    cache = CoverCache(path)
+    cache.set(1, 'https://covers.example/1.jpg')
+    cache.set(2, 'https://covers.example/2.jpg')
+    assert len(CoverCache(path)) == 0
+
+    cache.save()
+    reloaded_cache = CoverCache(path)
+    assert len(reloaded_cache) == 2
+    assert reloaded_cache.get(1) == 'https://covers.example/1.jpg'
+
+
+def test_cover_cache_ignores_a_corrupt_cache_file(tmp_path):
+    path = tmp_path / 'covers.json'
+    path.write_text('{not json')
+
+    assert len(CoverCache(str(path))) == 0
+
+
+def test_cover_cache_drops_missing_covers_of_older_cache_files(tmp_path):
+    path = tmp_path / 'covers.json'
+    path.write_text('{"1": "https://covers.example/1.jpg", "2": null}')
+
+    cache = CoverCache(str(path))
+    assert 1 in cache and 2 not in cache
+
+
+def test_cover_service_does_not_block_on_a_cold_cache():
+    resolver = BlockingCoverResolver()
+    service = CoverService(CoverCache(), resolver)
+
+    # The resolver is blocked, so the cover is not known yet, but the request returns immediately.
+    assert service.get_cover_url(1, 'Guardians of the Galaxy', 2014) is None
+
+    resolver.release.set()
+    service.wait_for_prefetch()
+    assert service.get_cover_url(1, 'Guardians of the Galaxy', 2014) == 'https://covers.example/2014.jpg'
+
+
+def test_cover_service_resolves_each_prefetched_movie_once():
+    resolver = BlockingCoverResolver()
+    service = CoverService(CoverCache(), resolver)
+    movies = [Movie('Prometheus', 2012, 2), Movie('Split', 2016, 3)]
+
+    service.prefetch(movies)
+    service.prefetch(movies)
+    resolver.release.set()
+    service.wait_for_prefetch()
+
+    assert sorted(resolver.resolved_titles) == ['Prometheus', 'Split']
+    assert len(service.cache) == 2
+
+
+def test_cover_service_retries_covers_that_could_not_be_resolved():
+    service = CoverService(CoverCache(), UnavailableCoverResolver())
+    service.prefetch([Movie('Prometheus', 2012, 2)])
+    service.wait_for_prefetch()
+
+    assert 2 not in service.cache
+    assert service.get_cover_url(2, 'Prometheus', 2012) is None
+
+
+class RecoveringCoverResolver(CoverResolver):
+    # Unavailable for the first attempt only
+    def __init__(self):
+        self.attempts = 0
+
+    def resolve(self, title: str, release_year: int):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise ConnectionError
+        return 'https://covers.example/{}.jpg'.format(release_year)
+
+
+def test_cover_service_does_not_retry_a_failed_cover_straight_away():
+    now = [0]
+    resolver = RecoveringCoverResolver()
+    service = CoverService(CoverCache(), resolver, retry_seconds=300, clock=lambda: now[0])
+    service.prefetch([Movie('Prometheus', 2012, 2)])
+    service.wait_for_prefetch()
+
+    # Within retry_seconds of the failure, the movie isn't queued again
+    now[0] = 299
+    assert service.get_cover_url(2, 'Prometheus', 2012) is None
+    service.wait_for_prefetch()
+    assert resolver.attempts == 1
+
+    now[0] = 300
+    service.get_cover_url(2, 'Prometheus', 2012)
+    service.wait_for_prefetch()
+    assert service.get_cover_url(2, 'Prometheus', 2012) == 'https://covers.example/2012.jpg'
+
+
+class MissingCoverResolver(CoverResolver):
+    # Finds no cover for the first attempt only
+    def __init__(self):
+        self.attempts = 0
+
+    def resolve(self, title: str, release_year: int):
+        self.attempts += 1
+        if self.attempts == 1:
+            return None
+        return 'https://covers.example/{}.jpg'.format(release_year)
+
+
+def test_cover_service_looks_for_a_missing_cover_again_later():
+    now = [0]
+    resolver = MissingCoverResolver()
+    service = CoverService(CoverCache(), resolver, missing_seconds=3600, clock=lambda: now[0])
+    service.prefetch([Movie('Prometheus', 2012, 2)])
+    service.wait_for_prefetch()
+    assert 2 not in service.cache
+
+    # Within missing_seconds of finding no cover, the movie isn't queued again
+    now[0] = 3599
+    assert service.get_cover_url(2, 'Prometheus', 2012) is None
+    service.wait_for_prefetch()
+    assert resolver.attempts == 1
+
+    now[0] = 3600
+    service.get_cover_url(2, 'Prometheus', 2012)
+    service.wait_for_prefetch()
+    assert service.get_cover_url(2, 'Prometheus', 2012) == 'https://covers.example/2012.jpg'
+
+
+class CountingCoverCache(CoverCache):
+    def __init__(self, path):
+        super().__init__(path)
+        self.saves = 0
+
+    def _save(self, covers):
+        self.saves += 1
+        super()._save(covers)
+
+
+def test_cover_service_saves_the_cache_once_the_queue_is_drained(tmp_path):
+    path = str(tmp_path / 'covers.json')
+    cache = CountingCoverCache(path)
+    resolver = BlockingCoverResolver()
+    service = CoverService(cache, resolver, save_seconds=60)
+
+    service.prefetch([Movie('Movie {}'.format(movie_id), 2000 + movie_id, movie_id) for movie_id in range(1, 21)])
+    resolver.release.set()
+    service.wait_for_prefetch()
+
+    assert cache.saves == 1
+    assert len(CoverCache(path)) == 20
+    assert os.listdir(str(tmp_path)) == ['covers.json']
@@ -0,0 +1,85 @@
+import pytest
+
+from CS235Flix.adapters.database_loader import load_database
+from CS235Flix.adapters.database_repository import DatabaseRepository, make_engine
+from CS235Flix.adapters.repository import RepositoryException
+from CS235Flix.domainmodel.model import User, Actor, Genre
+
+TEST_DATA_PATH = "Tests/data/"
+
+MOVIES_HEADER = 'id,Title,Genre,Description,Director,Actors,Year,Runtime (Minutes),Rating,Votes,Revenue (Millions),' \
+                'Metascore\n'
+
+
+def write_data_files(data_path, movies, users, reviews):
+    with open(str(data_path / 'movies.csv'), 'w') as outfile:
+        outfile.write(MOVIES_HEADER + movies)
+    with open(str(data_path / 'users.csv'), 'w') as outfile:
+        outfile.write('id,username,password\n' + users)
+    with open(str(data_path / 'reviews.csv'), 'w') as outfile:
+        outfile.write('id,user-id,movie-id,review-text,ratings,timestamp\n' + reviews)
+
+
+def test_loader_reports_the_rows_loaded_from_each_file():
+    statistics = load_database(TEST_DATA_PATH, make_engine('sqlite://'))
+
+    assert statistics.number_of_rows == 16
+    assert statistics.rows_per_second('movies.csv') > 0
+    assert 'movies.csv: 10 rows (0 skipped)' in str(statistics)
+    assert 'rows/s' in str(statistics)
+
+
+@pytest.mark.parametrize('batch_size', (1, 3, 10000))
+def test_loader_loads_the_same_data_in_any_batch_size(batch_size):
+    engine = make_engine('sqlite://')
+    load_database(TEST_DATA_PATH, engine, batch_size=batch_size)
+    repo = DatabaseRepository(engine)
+
+    assert repo.get_total_number_of_movies_in_repo() == 10
+    assert repo.get_total_number_of_actors() == 39
+    assert repo.get_total_number_of_directors() == 10
+    assert repo.get_total_number_of_genres_in_repo() == 14
+    assert repo.get_total_number_of_reviews() == 3
+
+    movie = repo.get_movie_by_index(1)
+    assert list(movie.actors) == [Actor("Chris Pratt"), Actor("Vin Diesel"), Actor("Bradley Cooper"),
+                                  Actor("Zoe Saldana")]
+    assert list(movie.genres) == [Genre("Action"), Genre("Adventure"), Genre("Sci-Fi")]
+    assert movie.revenue == 333.13
+    assert [review.review_author.username for review in movie.reviews] == ["fmercury", "thorke", "mjackson"]
+
+
+def test_loader_skips_rows_it_cannot_load(tmp_path):
+    write_data_files(
+        tmp_path,
+        '1,Up,"Animation,Animation",An old man flies,Pete Docter,"Ed Asner, Ed Asner, ",2009,96,8.3,1,,79\n'
+        '2,Up,Animation,A remake,Pete Docter,Ed Asner,2009,96,8.3,1,293.0,79\n'
+        '3,Coco,Animation,A boy visits the dead,Lee Unkrich,Anthony Gonzalez,2017,N/A,8.4,1,209.7,81\n',
+        '1,Carl,Balloons1\n2,carl,Balloons2\n',
+        '1,1,1,Lovely,9,2020-02-28\n2,2,3,Colourful,11,2020-02-28\n3,1,99,Unknown movie,5,2020-02-28\n')
+
+    engine = make_engine('sqlite://')
+    statistics = load_database(str(tmp_path), engine)
+    assert 'movies.csv: 2 rows (1 skipped)' in str(statistics)
+    assert 'users.csv: 1 rows (1 skipped)' in str(statistics)
+    assert 'reviews.csv: 2 rows (1 skipped)' in str(statistics)
+
+    repo = DatabaseRepository(engine)
+    up = repo.get_movie_by_index(1)
+    assert list(up.actors) == [Actor("Ed Asner")]
+    assert list(up.genres) == [Genre("Animation")]
+    assert up.revenue == 0
+    assert repo.get_movie_by_index(3).runtime_minutes == 0
+
+    # Both users.csv ids refer to the same user, and the out of range rating isn't kept
+    assert [(review.review_text, review.rating) for review in repo.get_user_reviews(User('carl', None))] == \
+        [("Lovely", 9), ("Colourful", None)]
+
+
+def test_loader_only_loads_an_empty_database():
+    engine = make_engine('sqlite://')
+    load_database(TEST_DATA_PATH, engine)
+
+    with pytest.raises(RepositoryException):
+        load_database(TEST_DATA_PATH, engine)
+    assert DatabaseRepository(engine).get_total_number_of_movies_in_repo() == 10
@@ -0,0 +1,395 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool
+from werkzeug.security import check_password_hash
+
+from CS235Flix.adapters.database_repository import DatabaseRepository, make_engine
+from CS235Flix.adapters.repository import RepositoryException
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList, make_review
+
+
+def count_statements(engine, action):
+    statements = list()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        action()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
+
+
+def test_repository_can_retrieve_entity_counts(database_repo):
+    assert database_repo.get_total_number_of_movies_in_repo() == 10
+    assert database_repo.get_total_number_of_directors() == 10
+    assert database_repo.get_total_number_of_actors() == 39
+    assert database_repo.get_total_number_of_genres_in_repo() == 14
+    assert database_repo.get_total_number_of_reviews() == 3
+
+    # The number of genres is kept, and counted again once a genre is added
+    database_repo.add_genre(Genre("Film Noir"))
+    assert database_repo.get_total_number_of_genres_in_repo() == 15
+
+
+def test_repository_can_add_and_retrieve_a_user(database_repo):
+    database_repo.add_user(User('Dave', '123456789'))
+
+    assert database_repo.get_user('Dave') == User('dave', '123456789')
+    assert database_repo.get_user('DAVE').password == '123456789'
+    assert database_repo.get_user('prince') is None
+    assert database_repo.check_user_existence_in_repo(User('Fmercury', 'password')) is True
+
+
+def test_repository_stores_hashed_passwords(database_repo):
+    assert check_password_hash(database_repo.get_user('fmercury').password, 'mvNNbc1eLA$i')
+
+
+def test_repository_hashes_seed_passwords_when_users_are_first_retrieved(database_repo):
+    database_repo.add_user_with_unhashed_password(User('Dave', None), '123456789')
+    with database_repo._engine.connect() as connection:
+        assert database_repo._get_user(connection, 'thorke').password is None
+        assert database_repo._get_user(connection, 'dave').password is None
+
+    password = database_repo.get_user('thorke').password
+    assert check_password_hash(password, 'cLQ^C#oFXloS')
+    assert database_repo.get_user('thorke').password == password
+    assert check_password_hash(database_repo.get_user('dave').password, '123456789')
+
+
+def test_repository_can_retrieve_movie_ids(database_repo):
+    assert database_repo.get_movie_ids() == list(range(1, 11))
+
+    database_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+    assert database_repo.get_movie_ids() == list(range(1, 11)) + [1050]
+
+
+def test_repository_can_retrieve_movie_by_index(database_repo):
+    movie = database_repo.get_movie_by_index(1)
+
+    assert movie.title == "Guardians of the Galaxy"
+    assert movie.release_year == 2014
+    assert movie.director == Director("James Gunn")
+    assert movie.runtime_minutes == 121
+    assert list(movie.actors) == [Actor("Chris Pratt"), Actor("Vin Diesel"), Actor("Bradley Cooper"),
+                                  Actor("Zoe Saldana")]
+    assert list(movie.genres) == [Genre("Action"), Genre("Adventure"), Genre("Sci-Fi")]
+
+    assert [review.review_text for review in movie.reviews] == ["This movie is great!", "This movie is awesome",
+                                                                "Love it!"]
+    assert [review.review_author.username for review in movie.reviews] == ["fmercury", "thorke", "mjackson"]
+
+    assert database_repo.get_movie_by_index(99999) is None
+
+
+def test_repository_can_retrieve_movie_by_title_and_release_year(database_repo):
+    assert database_repo.get_movie("La La Land", 2016).id == 7
+    assert database_repo.get_movie("La La Land", 2017) is None
+    assert database_repo.check_movie_existence_in_repo(Movie("La La Land", 2016)) is True
+    assert database_repo.check_movie_existence_in_repo(Movie("La La Land", 2017)) is False
+
+
+def test_repository_can_retrieve_genres(database_repo):
+    genres = database_repo.get_genres()
+
+    assert len(genres) == 14
+    assert [genre for genre in genres if genre.genre_name == 'Sci-Fi'][0].number_of_classified_movies == 2
+    assert [genre for genre in genres if genre.genre_name == 'Comedy'][0].number_of_classified_movies == 3
+
+    # The genres of loaded movies know how many movies they classify
+    movie = database_repo.get_movie_by_index(1)
+    assert [genre.number_of_classified_movies for genre in movie.genres] == [4, 6, 2]
+
+    # Their movies are only queried when asked for
+    sci_fi = [genre for genre in genres if genre.genre_name == 'Sci-Fi'][0]
+    assert [movie.title for movie in sci_fi.classified_movies] == ["Guardians of the Galaxy", "Prometheus"]
+    assert sci_fi.is_applied_to(Movie("Prometheus", 2012))
+
+
+def test_repository_can_retrieve_movies_by_year(database_repo):
+    assert [movie.id for movie in database_repo.get_movies_by_release_year(2014)] == [1]
+    assert len(database_repo.get_movies_by_release_year(2016)) == 8
+    assert database_repo.get_movies_by_release_year(1800) == []
+    assert database_repo.get_release_years() == [2012, 2014, 2016]
+
+
+def test_repository_can_get_the_latest_and_oldest_movies(database_repo):
+    assert database_repo.get_latest_movie() == Movie('La La Land', 2016)
+    assert database_repo.get_oldest_movie() == Movie('Prometheus', 2012)
+
+
+def test_repository_returns_release_years_of_neighbouring_movies(database_repo):
+    movie = database_repo.get_movie_by_index(1)
+    assert database_repo.get_release_year_of_previous_movie(movie) == 2012
+    assert database_repo.get_release_year_of_next_movie(movie) == 2016
+
+    assert database_repo.get_release_year_of_previous_movie(database_repo.get_movie_by_index(2)) is None
+    assert database_repo.get_release_year_of_next_movie(database_repo.get_movie_by_index(3)) is None
+    assert database_repo.get_release_year_of_next_movie(Movie("Avengers : End Game", 2019, 1050)) is None
+
+
+def test_repository_can_add_a_movie(database_repo):
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_revenue(858.37)
+    movie.set_director(Director("Anthony Russo"))
+    movie.add_actor(Actor("Chris Pratt"))
+    movie.add_genre(Genre("Action"))
+    database_repo.add_movie(movie)
+
+    stored_movie = database_repo.get_movie_by_index(1050)
+    assert stored_movie == movie
+    assert stored_movie.director == Director("Anthony Russo")
+    assert list(stored_movie.actors) == [Actor("Chris Pratt")]
+    assert database_repo.get_top_6_highest_revenue_movies()[0] == movie
+    assert database_repo.get_latest_movie() == movie
+    assert database_repo.get_release_years() == [2012, 2014, 2016, 2019]
+    assert list(database_repo.get_movie_indexes_for_genre("Action")) == [1, 5, 6, 9, 1050]
+    assert [movie.id for movie in database_repo.get_movies_played_by_an_actor("Chris Pratt")] == [1, 10, 1050]
+
+    # Adding the same movie again changes nothing
+    database_repo.add_movie(movie)
+    assert database_repo.get_total_number_of_movies_in_repo() == 11
+
+
+def test_repository_can_add_actors_directors_and_genres(database_repo):
+    database_repo.add_actor(Actor("Keanu Reeves"))
+    database_repo.add_director(Director("Chad Stahelski"))
+    database_repo.add_genre(Genre("Noir"))
+
+    assert database_repo.get_actor("Keanu Reeves") == Actor("Keanu Reeves")
+    assert database_repo.get_director("Chad Stahelski") == Director("Chad Stahelski")
+    assert database_repo.check_genre_existence(Genre("Noir")) is True
+    assert database_repo.get_actor("Fake Actor") is None
+    assert database_repo.get_director("Fake Director") is None
+    assert database_repo.check_actor_existence_in_repo(Actor("Matt Damon")) is True
+    assert database_repo.check_director_existence_in_repo(Director("Sean Foley")) is True
+    assert database_repo.check_genre_existence(Genre("Fake Genre")) is False
+
+
+def test_repository_links_a_genre_to_its_stored_movies(database_repo):
+    genre = Genre("Noir")
+    genre.add_Movie(Movie("Split", 2016))
+    genre.add_Movie(Movie("Not In Repo", 2020))
+    database_repo.add_genre(genre)
+
+    assert list(database_repo.get_movie_indexes_for_genre("Noir")) == [3]
+    assert list(database_repo.get_movie_by_index(3).genres)[-1] == genre
+
+
+def test_repository_links_actor_colleagues_across_movies(database_repo):
+    chris_pratt = database_repo.get_actor("Chris Pratt")
+    colleagues = database_repo.get_actor_colleague(chris_pratt)
+
+    # Chris Pratt played in Guardians of the Galaxy (4 actors) and Passengers (4 actors)
+    assert len(colleagues) == 6
+    assert Actor("Jennifer Lawrence") in colleagues
+    assert chris_pratt.get_number_of_collaborations(Actor("Vin Diesel")) == 1
+    assert [movie.title for movie in chris_pratt.played_movies] == ["Guardians of the Galaxy", "Passengers"]
+
+
+def test_repository_searches_movies_by_actor_and_director(database_repo):
+    assert [movie.title for movie in database_repo.get_movies_played_by_an_actor("  chris PRATT ")] == \
+        ["Guardians of the Galaxy", "Passengers"]
+    assert [movie.title for movie in database_repo.get_movies_directed_by_a_director("james gunn")] == \
+        ["Guardians of the Galaxy"]
+    assert database_repo.get_movies_played_by_an_actor("Fake Actor") == []
+
+    assert [movie.title for movie in database_repo.search_movies_by_actor_and_director(
+        'Ryan Gosling', 'Damien Chazelle')] == ['La La Land']
+    assert database_repo.search_movies_by_actor_and_director('Ryan Gosling', 'Fake Director') == []
+
+    # Exact-match lookups remain case sensitive
+    assert database_repo.get_actor("chris pratt") is None
+
+
+def test_repository_searches_movie_titles(database_repo):
+    assert [movie.id for movie in database_repo.search_movie_by_title('Suicide Squad')] == [5]
+    assert [movie.id for movie in database_repo.search_movie_by_title("Z")] == [9]
+    assert [movie.id for movie in database_repo.search_movie_by_title("OF THE GALAX")] == [1]
+    assert database_repo.search_movie_by_title("galaxy quest") == []
+    assert len(database_repo.search_movie_by_title("")) == 10
+
+    # LIKE wildcards are matched literally
+    assert database_repo.search_movie_by_title("%") == []
+    assert database_repo.search_movie_by_title("_") == []
+
+
+def test_repository_can_rank_movie_title_search_results(database_repo):
+    database_repo.add_movie(Movie("The", 2019, 1050))
+
+    titles = [movie.title for movie in database_repo.search_movie_by_title("the", ranked=True)]
+    assert titles == ["The", "The Great Wall", "The Lost City of Z", "Guardians of the Galaxy", "Prometheus"]
+
+
+def test_repository_can_retrieve_movies_for_a_indexes_list(database_repo):
+    movies = database_repo.get_movies_by_index([10, 3, 35455647, 1])
+    assert [movie.title for movie in movies] == ['Passengers', 'Split', 'Guardians of the Galaxy']
+    assert database_repo.get_movies_by_index([22222, 33333]) == []
+
+
+def test_repository_loads_movies_with_a_fixed_number_of_queries(database_repo):
+    engine = database_repo._engine
+    database_repo.get_genres()
+
+    one_movie = count_statements(engine, lambda: database_repo.get_movies_by_index([1]))
+    all_movies = count_statements(engine, lambda: database_repo.get_movies_by_index(range(1, 11)))
+    assert all_movies == one_movie
+
+
+def test_repository_can_order_movie_indexes_for_a_genre(database_repo):
+    assert list(database_repo.get_movie_indexes_for_genre("Adventure")) == [1, 2, 5, 6, 9, 10]
+    assert list(database_repo.get_movie_indexes_for_genre("Adventure", order='year')) == [2, 1, 10, 5, 6, 9]
+    assert list(database_repo.get_movie_indexes_for_genre("Adventure", order='revenue')) == [1, 5, 2, 10, 6, 9]
+    assert len(database_repo.get_movie_indexes_for_genre("Fake Genre")) == 0
+
+    with pytest.raises(ValueError):
+        database_repo.get_movie_indexes_for_genre("Adventure", order='title')
+
+
+def test_repository_can_get_movie_attributes(database_repo):
+    movie = Movie("Passengers", 2016)
+    assert [genre.genre_name for genre in database_repo.get_movie_genres(movie)] == ["Adventure", "Drama", "Romance"]
+    assert database_repo.get_movie_director(movie) == Director("Morten Tyldum")
+    assert database_repo.get_movie_runtime_minutes(movie) == 116
+    assert database_repo.get_movie_release_year(movie) == 2016
+    assert len(list(database_repo.get_movie_actors(movie))) == 4
+    assert list(database_repo.get_movie_reviews(movie)) == []
+    assert database_repo.get_movie_description(Movie("Passengers", 2017)) is None
+
+
+def test_repository_can_add_a_review(database_repo):
+    user = database_repo.get_user('thorke')
+    movie = database_repo.get_movie_by_index(7)
+    review = make_review("Great music", user, movie, 9)
+    database_repo.add_review(review)
+
+    assert database_repo.get_total_number_of_reviews() == 4
+    assert [review.review_text for review in database_repo.get_movie_by_index(7).reviews] == ["Great music"]
+    assert [movie.id for movie in database_repo.get_user_reviewed_movie("thorke")] == [1, 7]
+    assert len(database_repo.get_user_reviews(User('thorke', None))) == 2
+    # Users are retrieved without their reviews
+    assert database_repo.get_user('thorke').reviews == []
+    assert database_repo.get_reviews()[-1] == review
+
+
+def test_repository_does_not_add_a_review_without_proper_links(database_repo):
+    movie = database_repo.get_movie_by_index(3)
+    review = Review(user=None, movie=movie, review_text="testing", rating=6, timestamp=date.today())
+    with pytest.raises(RepositoryException):
+        database_repo.add_review(review)
+
+    review = make_review("Unknown user", User('prince', 'Purple1Rain'), movie, 6)
+    with pytest.raises(RepositoryException):
+        database_repo.add_review(review)
+    assert database_repo.get_total_number_of_reviews() == 3
+
+
+def test_repository_keeps_reviews_after_a_restart(database_repo):
+    review = make_review("Great music", database_repo.get_user('thorke'), database_repo.get_movie_by_index(7), 9)
+    database_repo.add_review(review)
+
+    restarted_repo = DatabaseRepository(database_repo._engine)
+    assert [review.review_text for review in restarted_repo.get_movie_by_index(7).reviews] == ["Great music"]
+
+
+def test_repository_can_add_a_watchlist(database_repo):
+    watchlist = WatchList()
+    watchlist.add_movie(database_repo.get_movie_by_index(3), date(2020, 10, 1))
+    watchlist.add_movie(database_repo.get_movie_by_index(10), date(2020, 10, 2))
+    database_repo.add_watchlist(watchlist)
+
+    retrieved_watchlists = database_repo.get_watchlist()
+    assert len(retrieved_watchlists) == 1
+    assert [movie.id for movie in retrieved_watchlists[0]] == [3, 10]
+    assert retrieved_watchlists[0].get_schedule()[Movie("Passengers", 2016)] == date(2020, 10, 2)
+
+
+def test_repository_can_suggest_movies_to_a_user(database_repo):
+    assert database_repo.get_suggestion_for_user("thorke") == [Movie("Suicide Squad", 2016),
+                                                                Movie("Prometheus", 2012)]
+    assert database_repo.get_top_movie_by_genre(Genre("Fantasy")).title == "Suicide Squad"
+
+    user = database_repo.get_user("thorke")
+    database_repo.add_review(make_review("Great music", user, database_repo.get_movie_by_index(7), 9))
+    database_repo.add_review(make_review("Funny", user, database_repo.get_movie_by_index(8), 7))
+    suggestions = [movie.title for movie in database_repo.get_suggestion_for_user("thorke")]
+    assert suggestions[0] == "Sing"
+
+
+def test_repository_recommends_movies_rated_alike_by_other_users(database_repo):
+    assert database_repo.get_recommended_movies_for_user("thorke", 10) == []
+
+    la_la_land = database_repo.get_movie_by_index(7)
+    database_repo.add_review(make_review("Lovely", database_repo.get_user("fmercury"), la_la_land, 9))
+
+    assert database_repo.get_recommended_movies_for_user("thorke", 10) == [la_la_land]
+
+
+def test_repository_builds_derived_indexes(database_repo):
+    facet_index = database_repo.get_facet_index()
+    selection = facet_index.select(genres=["Action", "Adventure"])
+    assert facet_index.movie_ids(selection) == [1, 5, 6, 9]
+    assert facet_index.movie_ids(facet_index.select(actor="chris pratt")) == [1, 10]
+    assert facet_index.movie_ids(facet_index.select(director="Ridley Scott", genres=["Mystery"])) == [2]
+
+    graph = database_repo.get_actor_graph()
+    assert graph.number_of_actors == 39
+    assert graph.most_connected(1) == [('Chris Pratt', 6)]
+
+    similar_movies = database_repo.get_similar_movies(database_repo.get_movie_by_index(5), 2)
+    assert similar_movies[0] == Movie("The Great Wall", 2016)
+    assert database_repo.get_similar_movies(Movie("Not In Repo", 2020, 99), 2) == []
+
+
+def test_repository_can_retrieve_the_top_rated_movies(database_repo):
+    assert database_repo.get_movie_by_index(7).rating == 8.3
+    assert database_repo.get_movie_by_index(7).votes == 258682
+    assert [movie.id for movie in database_repo.get_top_movies('weighted_rating', 3)] == [1, 7, 3]
+    assert [movie.id for movie in database_repo.get_top_movies(
+        'rating', 3, genre_name='Adventure', release_year=2016)] == [9, 10, 5]
+
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_rating(8.4)
+    database_repo.add_movie(movie)
+    assert database_repo.get_top_movies('rating', 1) == [movie]
+
+
+def test_repository_adds_columns_missing_from_an_older_database(tmp_path):
+    engine = make_engine('sqlite:///' + str(tmp_path / 'old.db'))
+    with engine.begin() as connection:
+        connection.execute('CREATE TABLE movies (id INTEGER PRIMARY KEY, title VARCHAR(255), title_key VARCHAR(255), '
+                           'release_year INTEGER, description TEXT, director_id INTEGER, runtime_minutes INTEGER, '
+                           'revenue FLOAT)')
+        connection.execute("INSERT INTO movies (id, title, release_year, revenue) VALUES (1, 'Up', 2009, 293.0)")
+
+    repo = DatabaseRepository(engine)
+    assert repo.get_movie_by_index(1).rating is None
+    assert repo.get_top_movies('rating', 3) == []
+
+
+def test_repository_notices_writes_by_other_processes(database_repo):
+    # Another repository on the same database stands for another process
+    repo = DatabaseRepository(database_repo._engine, check_seconds=0)
+    other_repo = DatabaseRepository(database_repo._engine, check_seconds=0)
+    assert repo.get_total_number_of_genres_in_repo() == 14
+    recommender = repo.get_recommender()
+
+    # The repository's own writes keep its derived data
+    repo.add_review(make_review("Great music", repo.get_user('thorke'), repo.get_movie_by_index(7), 9))
+    assert repo.get_recommender() is recommender
+
+    other_repo.add_genre(Genre("Film Noir"))
+    assert repo.get_total_number_of_genres_in_repo() == 15
+    assert repo.get_recommender() is not recommender
+
+
+def test_make_engine_pools_connections(tmp_path):
+    assert isinstance(make_engine('sqlite://').pool, StaticPool)
+
+    engine = make_engine('sqlite:///' + str(tmp_path / 'pooled.db'), pool_size=2)
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 2
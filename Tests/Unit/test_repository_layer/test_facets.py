@@ -0,0 +1,29 @@
+from CS235Flix.adapters.facets import RangeFacet, count_bits, iterate_bits
+
+
+def test_bits_are_iterated_from_the_lowest():
+    bits = (1 << 3) | (1 << 64) | (1 << 1000)
+    assert list(iterate_bits(bits)) == [3, 64, 1000]
+    assert count_bits(bits) == 3
+    assert list(iterate_bits(0)) == []
+
+
+def test_range_facet_selects_whole_and_partial_buckets():
+    revenues = RangeFacet(width=10)
+    for movie_id, revenue in [(1, 5.0), (2, 12.5), (3, 17.0), (4, 25.0), (5, 39.99)]:
+        revenues.add(movie_id, revenue)
+
+    assert list(iterate_bits(revenues.select(10, 30))) == [2, 3, 4]
+    assert list(iterate_bits(revenues.select(15, 25))) == [3, 4]
+    assert list(iterate_bits(revenues.select(low=20))) == [4, 5]
+    assert list(iterate_bits(revenues.select(high=5))) == [1]
+    assert revenues.select(50, 60) == 0
+
+
+def test_range_facet_counts_movies_by_bucket():
+    years = RangeFacet()
+    for movie_id, year in [(1, 2014), (2, 2016), (3, 2016)]:
+        years.add(movie_id, year)
+
+    assert years.count_by_bucket(years.select()) == {2014: 1, 2016: 2}
+    assert years.count_by_bucket(1 << 2) == {2016: 1}
@@ -2,9 +2,12 @@ from datetime import date
 from typing import List
 
 import pytest
+from werkzeug.security import generate_password_hash, check_password_hash
 
+from CS235Flix.adapters.memory_repository import MemoryRepository, load_users, is_password_hash, populate, \
+    load_movies_actors_directors_genre_description, read_movie_columns
 from CS235Flix.adapters.repository import RepositoryException
-from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList
+from CS235Flix.domainmodel.model import User, Actor, Director, Genre, Movie, Review, WatchList, make_review
 
 
 def test_repository_can_add_a_user(in_memory_repo):
@@ -86,6 +89,13 @@ def test_repository_can_add_movie(in_memory_repo):
     assert in_memory_repo.get_movie_by_index(1050) is movie
 
 
+def test_repository_can_retrieve_movie_ids(in_memory_repo):
+    assert in_memory_repo.get_movie_ids() == list(range(1, 11))
+
+    in_memory_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+    assert in_memory_repo.get_movie_ids() == list(range(1, 11)) + [1050]
+
+
 def test_repository_can_retrieve_movie_by_index(in_memory_repo):
     movie = in_memory_repo.get_movie_by_index(1)
 
@@ -417,5 +427,301 @@ def test_repository_can_suggest_desired_movies_to_a_user(in_memory_repo):
     username = "thorke"
     suggestions = in_memory_repo.get_suggestion_for_user(username=username)
 
-    assert len(suggestions) == 1
-    assert in_memory_repo.get_movie_by_index(1) in suggestions
\ No newline at end of file
+    # thorke reviewed Guardians of the Galaxy (Action, Adventure, Sci-Fi), which is not suggested again
+    assert suggestions == [in_memory_repo.get_movie_by_index(5), in_memory_repo.get_movie_by_index(2)]
+    assert in_memory_repo.get_movie_by_index(1) not in suggestions
+
+
+def test_repository_updates_suggestions_when_a_user_adds_a_review(in_memory_repo):
+    user = in_memory_repo.get_user("thorke")
+    movie = in_memory_repo.get_movie_by_index(7)
+    review = make_review("Great music", user, movie, 9)
+    in_memory_repo.add_review(review)
+
+    # La La Land is a Comedy, Drama and Music; the highest revenue comedy is Sing. Genres reviewed once are visited
+    # in the order they were first reviewed.
+    suggestions = [movie.title for movie in in_memory_repo.get_suggestion_for_user("thorke")]
+    assert suggestions == ["Suicide Squad", "Prometheus", "Sing", "Passengers"]
+
+    # A genre reviewed more often is visited first
+    review = make_review("Funny", user, in_memory_repo.get_movie_by_index(8), 7)
+    in_memory_repo.add_review(review)
+    suggestions = [movie.title for movie in in_memory_repo.get_suggestion_for_user("thorke")]
+    assert suggestions[0] == "Sing"
+
+def test_repository_retrieves_a_user_regardless_of_the_username_case(in_memory_repo):
+    assert in_memory_repo.get_user('THORKE') is in_memory_repo.get_user('thorke')
+    assert in_memory_repo.check_user_existence_in_repo(User('Fmercury', 'password')) is True
+    assert in_memory_repo.check_user_existence_in_repo(User('prince', 'password')) is False
+
+
+def test_repository_searches_actors_and_directors_case_insensitively(in_memory_repo):
+    assert len(in_memory_repo.get_movies_played_by_an_actor("  chris PRATT ")) == 2
+    assert len(in_memory_repo.get_movies_directed_by_a_director("james gunn")) == 1
+
+    # Exact-match lookups remain case sensitive
+    assert in_memory_repo.get_actor("chris pratt") is None
+    assert in_memory_repo.get_director("james gunn") is None
+
+
+def test_repository_can_check_existence_of_movie(in_memory_repo):
+    assert in_memory_repo.check_movie_existence_in_repo(Movie("La La Land", 2016)) is True
+    assert in_memory_repo.check_movie_existence_in_repo(Movie("La La Land", 2017)) is False
+    assert in_memory_repo.get_movie("La La Land", 2016) is in_memory_repo.get_movie_by_index(7)
+
+
+def test_repository_ranking_queries_do_not_reorder_movies(in_memory_repo):
+    in_memory_repo.get_top_6_highest_revenue_movies()
+    in_memory_repo.get_latest_movie()
+    in_memory_repo.get_oldest_movie()
+
+    # Previous and next release years rely on the movies remaining ordered by release year and title
+    movie = in_memory_repo.get_movie_by_index(1)
+    assert in_memory_repo.get_release_year_of_previous_movie(movie) == 2012
+    assert in_memory_repo.get_release_year_of_next_movie(movie) == 2016
+
+
+def test_repository_can_retrieve_the_top_rated_movies(in_memory_repo):
+    assert in_memory_repo.get_movie_by_index(7).rating == 8.3
+    assert in_memory_repo.get_movie_by_index(7).votes == 258682
+    assert in_memory_repo.get_movie_by_index(7).metascore == 93
+
+    assert [movie.id for movie in in_memory_repo.get_top_movies('rating', 3)] == [7, 1, 3]
+    assert [movie.id for movie in in_memory_repo.get_top_movies('votes', 3)] == [1, 2, 5]
+    assert [movie.id for movie in in_memory_repo.get_top_movies('metascore', 3)] == [7, 9, 1]
+    assert [movie.id for movie in in_memory_repo.get_top_movies('weighted_rating', 3)] == [1, 7, 3]
+    assert [movie.id for movie in in_memory_repo.get_top_movies('rating', 3, genre_name='Adventure')] == [1, 9, 2]
+    assert [movie.id for movie in in_memory_repo.get_top_movies('rating', 3, release_year=2016)] == [7, 3, 4]
+    assert [movie.id for movie in in_memory_repo.get_top_movies(
+        'rating', 3, genre_name='Adventure', release_year=2016)] == [9, 10, 5]
+    assert in_memory_repo.get_top_movies('rating', 3, genre_name='Fake Genre') == []
+
+    # The rankings include movies added later
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_rating(8.4)
+    in_memory_repo.add_movie(movie)
+    assert in_memory_repo.get_top_movies('rating', 1) == [movie]
+
+    with pytest.raises(ValueError):
+        in_memory_repo.get_top_movies('revenue', 3)
+
+
+def test_repository_keeps_revenue_ranking_up_to_date_when_adding_a_movie(in_memory_repo):
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_revenue(858.37)
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_top_6_highest_revenue_movies()[0] is movie
+    assert in_memory_repo.get_latest_movie() is movie
+
+
+def test_repository_can_retrieve_release_years(in_memory_repo):
+    assert in_memory_repo.get_release_years() == [2012, 2014, 2016]
+
+    in_memory_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+    assert in_memory_repo.get_release_years() == [2012, 2014, 2016, 2019]
+    assert in_memory_repo.get_release_year_of_next_movie(in_memory_repo.get_movie_by_index(7)) == 2019
+
+
+def test_repository_returns_no_neighbouring_years_for_a_movie_from_an_unknown_year(in_memory_repo):
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    assert in_memory_repo.get_release_year_of_previous_movie(movie) is None
+    assert in_memory_repo.get_release_year_of_next_movie(movie) is None
+
+
+def test_repository_searches_movie_titles_by_substring_of_any_length(in_memory_repo):
+    assert [movie.id for movie in in_memory_repo.search_movie_by_title("Z")] == [9]
+    assert [movie.id for movie in in_memory_repo.search_movie_by_title("la la")] == [7]
+    assert [movie.id for movie in in_memory_repo.search_movie_by_title("OF THE GALAX")] == [1]
+    assert in_memory_repo.search_movie_by_title("galaxy quest") == []
+    assert len(in_memory_repo.search_movie_by_title("")) == 10
+
+
+def test_repository_can_rank_movie_title_search_results(in_memory_repo):
+    in_memory_repo.add_movie(Movie("The", 2019, 1050))
+
+    list_of_movies = in_memory_repo.search_movie_by_title("the", ranked=True)
+    list_of_movies_titles = [movie.title for movie in list_of_movies]
+
+    # Exact title first, then titles starting with the query, then whole words, then other substrings
+    assert list_of_movies_titles == ["The", "The Great Wall", "The Lost City of Z", "Guardians of the Galaxy",
+                                     "Prometheus"]
+
+
+def test_repository_searches_titles_of_newly_added_movies(in_memory_repo):
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.search_movie_by_title("end game") == [movie]
+
+
+def test_repository_links_actor_colleagues_across_movies(in_memory_repo):
+    chris_pratt = in_memory_repo.get_actor("Chris Pratt")
+    colleagues = list(in_memory_repo.get_actor_colleague(chris_pratt))
+
+    # Chris Pratt played in Guardians of the Galaxy (4 actors) and Passengers (4 actors)
+    assert len(colleagues) == 6
+    assert in_memory_repo.get_actor("Jennifer Lawrence") in colleagues
+    assert in_memory_repo.get_actor("Vin Diesel") in colleagues
+    assert chris_pratt.get_number_of_collaborations(in_memory_repo.get_actor("Vin Diesel")) == 1
+
+    # Colleagues are the actors stored in the repository
+    assert any(colleague is in_memory_repo.get_actor("Jennifer Lawrence") for colleague in colleagues)
+
+
+def test_repository_can_order_movie_indexes_for_a_genre(in_memory_repo):
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Adventure")) == [1, 2, 5, 6, 9, 10]
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Adventure", order='year')) == [2, 1, 10, 5, 6, 9]
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Adventure", order='revenue')) == [1, 5, 2, 10, 6, 9]
+
+    with pytest.raises(ValueError):
+        in_memory_repo.get_movie_indexes_for_genre("Adventure", order='title')
+
+
+def test_repository_does_not_let_callers_change_movie_indexes_for_a_genre(in_memory_repo):
+    movie_ids = in_memory_repo.get_movie_indexes_for_genre("Adventure")
+    with pytest.raises(TypeError):
+        movie_ids[0] = 1050
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Adventure")) == [1, 2, 5, 6, 9, 10]
+
+
+def test_repository_updates_movie_indexes_for_a_genre_when_a_movie_is_classified(in_memory_repo):
+    horror = [genre for genre in in_memory_repo.get_genres() if genre.genre_name == "Horror"][0]
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Horror")) == [3]
+
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    in_memory_repo.add_movie(movie)
+    horror.add_Movie(movie)
+    assert list(in_memory_repo.get_movie_indexes_for_genre("Horror", order='year')) == [3, 1050]
+
+
+def test_repository_can_combine_facets(in_memory_repo):
+    facet_index = in_memory_repo.get_facet_index()
+
+    selection = facet_index.select(genres=["Action", "Adventure"])
+    assert facet_index.movie_ids(selection) == [1, 5, 6, 9]
+    assert facet_index.count_by_genre(selection)["Fantasy"] == 2
+    assert facet_index.count_by_release_year(selection) == {2014: 1, 2016: 3}
+
+    selection = facet_index.select(genres=["Adventure"], release_years=(2016, None), runtimes=(110, 130),
+                                   revenues=(100, 400))
+    assert facet_index.movie_ids(selection) == [5, 10]
+
+    assert facet_index.movie_ids(facet_index.select(actor="chris pratt")) == [1, 10]
+    assert facet_index.movie_ids(facet_index.select(director="Ridley Scott", genres=["Mystery"])) == [2]
+    assert facet_index.select(genres=["Western"]) == 0
+    assert facet_index.movie_ids(facet_index.select(), cursor=8, quantity=5) == [9, 10]
+
+
+def test_repository_updates_facets_when_a_movie_is_added(in_memory_repo):
+    movie = Movie("Avengers : End Game", 2019, 1050)
+    movie.set_runtime_minutes(181)
+    in_memory_repo.add_movie(movie)
+
+    facet_index = in_memory_repo.get_facet_index()
+    assert facet_index.movie_ids(facet_index.select(release_years=(2019, 2019))) == [1050]
+
+
+def test_repository_recommends_movies_rated_alike_by_other_users(in_memory_repo):
+    # Everyone reviewed Guardians of the Galaxy only, so there is nothing to recommend yet
+    assert in_memory_repo.get_recommended_movies_for_user("thorke", 10) == []
+
+    # fmercury also liked La La Land, so it is recommended to the users who reviewed Guardians of the Galaxy
+    la_la_land = in_memory_repo.get_movie_by_index(7)
+    review = make_review("Lovely", in_memory_repo.get_user("fmercury"), la_la_land, 9)
+    in_memory_repo.add_review(review)
+
+    assert in_memory_repo.get_recommended_movies_for_user("thorke", 10) == [la_la_land]
+    assert in_memory_repo.get_recommended_movies_for_user("fmercury", 10) == []
+
+
+def test_repository_can_retrieve_similar_movies(in_memory_repo):
+    suicide_squad = in_memory_repo.get_movie_by_index(5)
+    similar_movies = in_memory_repo.get_similar_movies(suicide_squad, 2)
+
+    # The Great Wall shares all three genres with Suicide Squad
+    assert similar_movies[0] is in_memory_repo.get_movie_by_index(6)
+    assert len(similar_movies) == 2
+    assert suicide_squad not in similar_movies
+
+    assert in_memory_repo.get_similar_movies(Movie("Not In Repo", 2020, 99), 2) == []
+
+
+def test_repository_hashes_plain_text_passwords_when_a_user_is_first_retrieved(in_memory_repo):
+    # fmercury wrote the first review, but hasn't been retrieved yet
+    fmercury = in_memory_repo.get_reviews()[0].review_author
+    assert fmercury.password is None
+
+    assert in_memory_repo.get_user('fmercury') is fmercury
+    assert check_password_hash(fmercury.password, 'mvNNbc1eLA$i')
+
+
+def test_repository_loads_hashed_passwords(tmp_path):
+    password_hash = generate_password_hash('Purple1Rain')
+    with open(str(tmp_path / 'users.csv'), 'w') as outfile:
+        outfile.write('id,username,password\n1,prince,' + password_hash + '\n')
+
+    repo = MemoryRepository()
+    load_users(str(tmp_path), repo)
+    assert repo.get_user('prince').password == password_hash
+    assert is_password_hash(password_hash)
+    assert not is_password_hash('Purple1Rain')
+
+
+def test_repository_reports_the_rows_loaded_from_each_file():
+    statistics = populate('Tests/data/', MemoryRepository())
+
+    assert statistics.number_of_rows == 16
+    assert 'movies.csv: 10 rows (0 skipped)' in str(statistics)
+    assert statistics.peak_rss is None or statistics.peak_rss > 0
+
+
+def test_repository_reads_movies_in_columns():
+    chunks = list(read_movie_columns('Tests/data/movies.csv', chunk_size=4))
+
+    assert [len(columns) for columns in chunks] == [4, 4, 2]
+    assert list(chunks[0].ids) == [1, 2, 3, 4]
+    assert chunks[0].actors[3] == ("Matthew McConaughey", "Reese Witherspoon", "Seth MacFarlane", "Scarlett Johansson")
+    # Mindhorn has no revenue
+    assert chunks[1].revenues[3] == 0
+    # Names repeated across rows share one string
+    assert chunks[0].genres[0][1] is chunks[0].genres[1][0]
+
+
+def test_repository_orders_movies_added_together_as_if_added_one_at_a_time(in_memory_repo):
+    movies = [in_memory_repo.get_movie_by_index(movie_id) for movie_id in (7, 3, 10, 1, 5, 2, 9, 4, 8, 6)]
+    repo = MemoryRepository()
+    repo.add_movie(movies[0])
+    repo.add_movies(movies[1:] + ["not a movie"])
+
+    assert repo.get_total_number_of_movies_in_repo() == 10
+    assert repo._movies == in_memory_repo._movies
+    assert repo.get_release_years() == in_memory_repo.get_release_years()
+    for year in in_memory_repo.get_release_years():
+        assert repo.get_movies_by_release_year(year) == in_memory_repo.get_movies_by_release_year(year)
+    assert repo.get_top_6_highest_revenue_movies() == in_memory_repo.get_top_6_highest_revenue_movies()
+    assert repo.search_movie_by_title("the") == in_memory_repo.search_movie_by_title("the")
+
+    # Movies added afterwards are still kept in order
+    repo.add_movie(Movie("Avengers: Endgame", 2019, 1050))
+    assert repo.get_release_years()[-1] == 2019
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3))
+def test_repository_loads_the_same_movies_in_any_chunk_size(in_memory_repo, chunk_size):
+    repo = MemoryRepository()
+    assert load_movies_actors_directors_genre_description('Tests/data/', repo, chunk_size=chunk_size,
+                                                          workers=1) == 10
+
+    assert repo.get_total_number_of_actors() == 39
+    assert repo.get_total_number_of_directors() == 10
+    assert repo.get_genres() == in_memory_repo.get_genres()
+    for movie_id in range(1, 11):
+        movie = repo.get_movie_by_index(movie_id)
+        expected = in_memory_repo.get_movie_by_index(movie_id)
+        assert (movie, list(movie.actors), list(movie.genres), movie.director, movie.runtime_minutes) == \
+            (expected, list(expected.actors), list(expected.genres), expected.director, expected.runtime_minutes)
+
+    chris_pratt = repo.get_actor("Chris Pratt")
+    assert [movie.title for movie in chris_pratt.played_movies] == ["Guardians of the Galaxy", "Passengers"]
+    assert chris_pratt.get_number_of_collaborations(repo.get_actor("Zoe Saldana")) == 1
@@ -0,0 +1,33 @@
+import shutil
+
+from werkzeug.security import check_password_hash
+
+from CS235Flix.adapters.memory_repository import MemoryRepository, load_users, read_csv_file
+from CS235Flix.adapters.migrate_users import migrate_users
+
+
+def test_migrate_users_hashes_plain_text_passwords(tmp_path):
+    users_path = str(tmp_path / 'users.csv')
+    shutil.copy('Tests/data/users.csv', users_path)
+
+    assert migrate_users(users_path) == 3
+    rows = list(read_csv_file(users_path))
+    assert [row[1] for row in rows] == ['thorke', 'fmercury', 'mjackson']
+    assert check_password_hash(rows[0][2], 'cLQ^C#oFXloS')
+
+    # Hashed passwords are kept as they are
+    assert migrate_users(users_path) == 0
+    assert list(read_csv_file(users_path)) == rows
+
+    # The migrated file loads without hashing
+    repo = MemoryRepository()
+    load_users(str(tmp_path), repo)
+    assert repo.get_user('thorke').password == rows[0][2]
+
+
+def test_migrate_users_can_write_to_another_file(tmp_path):
+    target_path = str(tmp_path / 'hashed_users.csv')
+
+    assert migrate_users('Tests/data/users.csv', target_path) == 3
+    assert list(read_csv_file('Tests/data/users.csv'))[0][2] == 'cLQ^C#oFXloS'
+    assert check_password_hash(list(read_csv_file(target_path))[0][2], 'cLQ^C#oFXloS')
@@ -0,0 +1,66 @@
+import csv
+
+import pytest
+
+import CS235Flix.adapters.parallel_csv as parallel_csv
+from CS235Flix.adapters.memory_repository import MemoryRepository, populate
+from CS235Flix.adapters.parallel_csv import record_ranges, read_range, parse_in_parallel
+
+QUOTED_CSV = 'id,text\n' \
+             '1,plain\n' \
+             '2,"spans\ntwo lines"\n' \
+             '3,"quoted ""quote"", then\n\na blank line"\n' \
+             '4,"comma, inside"\n' \
+             '5,last\n'
+
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    path = tmp_path / 'quoted.csv'
+    with open(str(path), 'w', newline='') as outfile:
+        outfile.write(QUOTED_CSV)
+    return str(path)
+
+
+def expected_rows(filename):
+    with open(filename, newline='') as infile:
+        return [[item.strip() for item in row] for row in csv.reader(infile)][1:]
+
+
+def test_ranges_cover_the_file_and_split_records_only_between_them(quoted_csv):
+    for range_size in range(1, len(QUOTED_CSV) + 1):
+        ranges = record_ranges(quoted_csv, range_size)
+
+        assert ranges[0][0] == len('id,text\n')
+        assert ranges[-1][1] == len(QUOTED_CSV)
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        rows = [row for start, end in ranges for row in read_range(quoted_csv, start, end)]
+        assert rows == expected_rows(quoted_csv)
+
+
+def test_ranges_are_about_the_given_size(quoted_csv):
+    assert len(record_ranges(quoted_csv, 1)) == 5
+    assert len(record_ranges(quoted_csv, len(QUOTED_CSV))) == 1
+
+
+@pytest.mark.parametrize('workers', (1, 2, 3))
+def test_parse_in_parallel_returns_the_ranges_in_order(quoted_csv, workers):
+    chunks = list(parse_in_parallel(quoted_csv, list, workers=workers, range_size=1))
+
+    assert len(chunks) == 5
+    assert [row for chunk in chunks for row in chunk] == expected_rows(quoted_csv)
+
+
+def test_parallel_populate_loads_the_same_repository(in_memory_repo, monkeypatch):
+    monkeypatch.setattr(parallel_csv, 'RANGE_SIZE', 512)
+    repo = MemoryRepository()
+    statistics = populate('Tests/data/', repo, workers=2)
+
+    assert statistics.number_of_rows == 16
+    assert repo.get_genres() == in_memory_repo.get_genres()
+    assert [(movie.id, list(movie.actors), list(movie.genres), movie.director, movie.revenue)
+            for movie in map(repo.get_movie_by_index, range(1, 11))] == \
+        [(movie.id, list(movie.actors), list(movie.genres), movie.director, movie.revenue)
+         for movie in map(in_memory_repo.get_movie_by_index, range(1, 11))]
+    assert [(review.review_author, review.movie, review.rating) for review in repo.get_reviews()] == \
+        [(review.review_author, review.movie, review.rating) for review in in_memory_repo.get_reviews()]
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from CS235Flix.adapters.recommender import ItemItemRecommender
+from CS235Flix.domainmodel.model import Movie, User, make_review
+
+
+@pytest.fixture
+def reviews():
+    movies = [Movie("Movie " + str(movie_id), 2000 + movie_id, movie_id) for movie_id in range(1, 6)]
+    users = [User(username, "Password1") for username in ["ann", "bob", "cat"]]
+    ratings = [
+        ("ann", 1, 9), ("ann", 2, 8), ("ann", 3, 2),
+        ("bob", 1, 8), ("bob", 2, 9), ("bob", 4, 7),
+        ("cat", 3, 9), ("cat", 5, 8),
+    ]
+    users = {user.username: user for user in users}
+    return [make_review("Review", users[username], movies[movie_id - 1], rating, datetime(2020, 1, 1))
+            for username, movie_id, rating in ratings]
+
+
+def test_recommender_finds_similar_movies(reviews):
+    recommender = ItemItemRecommender.from_reviews(reviews)
+
+    assert recommender.number_of_ratings == 8
+    # Movies 1 and 2 were rated highly by the same two users
+    assert recommender.neighbours(1)[0][1] == 2
+    assert recommender.neighbours(1)[0][0] == pytest.approx((9 * 8 + 8 * 9) / (145 ** 0.5 * 145 ** 0.5))
+    # Movie 5 was only rated by cat, who also rated movie 3
+    assert [movie_id for _, movie_id in recommender.neighbours(5)] == [3]
+
+
+def test_recommender_recommends_unrated_movies(reviews):
+    recommender = ItemItemRecommender.from_reviews(reviews)
+
+    assert recommender.recommend("ann", 10) == [4, 5]
+    assert recommender.recommend("cat", 1) == [1]
+    assert recommender.recommend("nobody", 10) == []
+
+
+def test_recommender_updates_incrementally_like_a_rebuild(reviews):
+    recommender = ItemItemRecommender.from_reviews(reviews[:-1])
+    recommender.add_rating("cat", 5, 8)
+
+    rebuilt = ItemItemRecommender.from_reviews(reviews)
+    for movie_id in range(1, 6):
+        neighbours = recommender.neighbours(movie_id)
+        expected = rebuilt.neighbours(movie_id)
+        assert [neighbour for _, neighbour in neighbours] == [neighbour for _, neighbour in expected]
+        assert [similarity for similarity, _ in neighbours] == pytest.approx([similarity for similarity, _ in expected])
+    assert recommender.recommend("ann", 10) == rebuilt.recommend("ann", 10)
+
+
+def test_recommender_keeps_the_most_similar_neighbours(reviews):
+    recommender = ItemItemRecommender.from_reviews(reviews, number_of_neighbours=1, block_size=2)
+
+    assert [len(recommender.neighbours(movie_id)) for movie_id in range(1, 6)] == [1, 1, 1, 1, 1]
+    assert recommender.neighbours(2)[0][1] == 1
@@ -0,0 +1,40 @@
+from CS235Flix.adapters.similar_movies import SimilarMoviesIndex, movie_terms
+from CS235Flix.domainmodel.model import Movie, Genre, Actor, Director
+
+
+def make_movie(movie_id, description, genre_names, director_name, actor_names):
+    movie = Movie("Movie " + str(movie_id), 2000, movie_id)
+    movie.set_description(description)
+    for genre_name in genre_names:
+        movie.add_genre(Genre(genre_name))
+    movie.set_director(Director(director_name))
+    for actor_name in actor_names:
+        movie.add_actor(Actor(actor_name))
+    return movie
+
+
+def test_movie_terms_include_names_whole():
+    movie = make_movie(1, "The crew of a starship.", ["Sci-Fi"], "Ridley Scott", ["Noomi Rapace"])
+    assert movie_terms(movie) == ["crew", "starship", "genre:sci-fi", "director:ridley scott", "actor:noomi rapace"]
+
+
+def test_similar_movies_index_ranks_movies_by_similarity():
+    movies = [
+        make_movie(1, "A crew explores a distant planet.", ["Sci-Fi"], "Ridley Scott", ["Noomi Rapace"]),
+        make_movie(2, "A crew explores a distant moon.", ["Sci-Fi"], "Ridley Scott", ["Michael Fassbender"]),
+        make_movie(3, "A crew explores the ocean.", ["Adventure"], "James Cameron", ["Bill Paxton"]),
+        make_movie(4, "Two friends open a bakery.", ["Comedy"], "Nora Ephron", ["Meg Ryan"]),
+    ]
+    index = SimilarMoviesIndex.from_movies(movies, block_size=3)
+
+    assert [movie_id for _, movie_id in index.similar_movies(1)] == [2, 3]
+    assert [movie_id for _, movie_id in index.similar_movies(1, quantity=1)] == [2]
+    assert index.similar_movies(4) == []
+    assert index.similar_movies(5) == []
+
+
+def test_similar_movies_index_keeps_the_most_similar_neighbours():
+    movies = [make_movie(movie_id, "A crew explores space.", ["Sci-Fi"], "Ridley Scott", []) for movie_id in range(5)]
+    index = SimilarMoviesIndex.from_movies(movies, number_of_neighbours=2)
+
+    assert [movie_id for _, movie_id in index.similar_movies(0)] == [1, 2]
@@ -0,0 +1,130 @@
+import os
+import shutil
+
+import pytest
+from werkzeug.security import check_password_hash
+
+from CS235Flix.adapters import snapshot
+from CS235Flix.adapters.snapshot import load_repository, read_snapshot, write_snapshot
+from CS235Flix.domainmodel.model import make_review
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    # A copy of the test data, so that tests can change the files
+    path = tmp_path / 'data'
+    shutil.copytree('Tests/data', str(path))
+    return str(path)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / 'snapshot' / 'repository.pickle')
+
+
+def test_snapshot_is_written_on_first_load(data_path, snapshot_path):
+    repo = load_repository(data_path, snapshot_path)
+
+    assert os.path.exists(snapshot_path)
+    assert repo.get_total_number_of_movies_in_repo() == 10
+
+
+def test_snapshot_restores_the_repository(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+    repo = read_snapshot(snapshot_path, data_path)
+
+    assert repo is not None
+    assert repo.get_total_number_of_movies_in_repo() == 10
+    assert check_password_hash(repo.get_user('thorke').password, 'cLQ^C#oFXloS')
+    assert repo.search_movie_by_title('Guardians') == [repo.get_movie_by_index(1)]
+
+    # Entities are shared by the objects referring to them
+    chris_pratt = repo.get_actor('Chris Pratt')
+    guardians = repo.get_movie_by_index(1)
+    assert any(actor is chris_pratt for actor in guardians.actors)
+    assert chris_pratt.get_number_of_collaborations(repo.get_actor('Vin Diesel')) == 1
+    assert guardians.reviews.__next__().movie is guardians
+
+    # The restored repository keeps working
+    review = make_review("Great", repo.get_user('thorke'), repo.get_movie_by_index(7), 9)
+    repo.add_review(review)
+    assert repo.get_total_number_of_reviews() == 4
+
+
+def test_snapshot_does_not_store_plain_text_passwords(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+
+    with open(snapshot_path, 'rb') as infile:
+        contents = infile.read()
+    assert b'mvNNbc1eLA$i' not in contents
+    assert b'cLQ^C#oFXloS' not in contents
+
+    # The passwords are read from users.csv again, and still hashed when their users are first retrieved
+    repo = read_snapshot(snapshot_path, data_path)
+    assert check_password_hash(repo.get_user('fmercury').password, 'mvNNbc1eLA$i')
+
+
+def test_snapshot_is_rebuilt_when_a_data_file_changes(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+
+    with open(os.path.join(data_path, 'users.csv'), 'a') as outfile:
+        outfile.write('\n4,prince,Purple1Rain')
+    assert read_snapshot(snapshot_path, data_path) is None
+
+    repo = load_repository(data_path, snapshot_path)
+    assert repo.get_user('prince') is not None
+    assert read_snapshot(snapshot_path, data_path) is not None
+
+
+def test_snapshot_survives_a_touched_data_file(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+
+    movies_path = os.path.join(data_path, 'movies.csv')
+    status = os.stat(movies_path)
+    os.utime(movies_path, ns=(status.st_atime_ns, status.st_mtime_ns + 10 ** 9))
+    assert read_snapshot(snapshot_path, data_path) is not None
+
+
+def test_snapshot_of_another_version_is_ignored(data_path, snapshot_path, monkeypatch):
+    repo = load_repository(data_path, snapshot_path)
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_VERSION', snapshot.SNAPSHOT_VERSION + 1)
+    assert read_snapshot(snapshot_path, data_path) is None
+
+    write_snapshot(repo, snapshot_path, data_path)
+    assert read_snapshot(snapshot_path, data_path) is not None
+
+
+def test_damaged_snapshot_is_ignored(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+    with open(snapshot_path, 'r+b') as outfile:
+        outfile.truncate(100)
+
+    assert read_snapshot(snapshot_path, data_path) is None
+    assert load_repository(data_path, snapshot_path).get_total_number_of_movies_in_repo() == 10
+
+
+@pytest.mark.parametrize('error', [KeyError, IndexError])
+def test_snapshot_that_cannot_be_restored_is_ignored(data_path, snapshot_path, monkeypatch, caplog, error):
+    load_repository(data_path, snapshot_path)
+
+    def fail(*args):
+        raise error('damaged')
+    monkeypatch.setattr(snapshot, '_read_unhashed_passwords', fail)
+
+    assert read_snapshot(snapshot_path, data_path) is None
+    assert "Could not read the repository snapshot" in caplog.text
+
+
+def test_repository_is_loaded_when_the_snapshot_cannot_be_written(data_path, tmp_path):
+    # The snapshot's directory is a file, so the snapshot can't be written
+    (tmp_path / 'not_a_directory').write_text('')
+    repo = load_repository(data_path, str(tmp_path / 'not_a_directory' / 'repository.pickle'))
+
+    assert repo.get_total_number_of_movies_in_repo() == 10
+
+
+def test_snapshot_writes_leave_no_temporary_files(data_path, snapshot_path):
+    load_repository(data_path, snapshot_path)
+    write_snapshot(read_snapshot(snapshot_path, data_path), snapshot_path, data_path)
+
+    assert os.listdir(os.path.dirname(snapshot_path)) == ['repository.pickle']
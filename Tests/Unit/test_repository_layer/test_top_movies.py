@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+from CS235Flix.adapters.top_movies import TopMoviesIndex, weighted_ratings
+from CS235Flix.domainmodel.model import Movie
+
+
+def make_movie(movie_id, release_year, rating, votes, metascore=None):
+    movie = Movie("Movie " + str(movie_id), release_year, movie_id)
+    movie.set_rating(rating)
+    movie.set_votes(votes)
+    movie.set_metascore(metascore)
+    return movie
+
+
+def test_weighted_ratings_pull_ratings_with_few_votes_towards_the_mean():
+    weighted = weighted_ratings([9.0, 7.0, 5.0, 8.0], [10, 1000, 1000, math.nan])
+
+    # The mean rating is 7 and the median number of votes is 1000
+    assert weighted[0] == pytest.approx((10 * 9 + 1000 * 7) / 1010)
+    assert weighted[1] == 7.0
+    assert weighted[2] == pytest.approx(6.0)
+    assert math.isnan(weighted[3])
+    assert np.all(np.isnan(weighted_ratings([math.nan], [5])))
+
+
+def test_top_movies_index_ranks_movies_by_each_criterion():
+    index = TopMoviesIndex.from_movies([
+        make_movie(1, 2016, 9.0, 10, 90),
+        make_movie(2, 2016, 7.5, 5000, 60),
+        make_movie(3, 2014, 8.5, 4000),
+        make_movie(4, 2014, 7.5, 6000, 60),
+        make_movie(5, 2016, None, 100),
+    ])
+
+    assert index.top_movie_ids('rating', 10) == [1, 3, 2, 4]
+    assert index.top_movie_ids('votes', 2) == [4, 2]
+    assert index.top_movie_ids('metascore', 10) == [1, 2, 4]
+    # Movie 1 has the highest rating, from too few votes to rank it first
+    assert index.top_movie_ids('weighted_rating', 10) == [3, 1, 2, 4]
+    assert index.top_movie_ids('rating', 0) == []
+
+
+def test_top_movies_index_ranks_some_of_the_movies():
+    index = TopMoviesIndex.from_movies(make_movie(movie_id, 2000 + movie_id % 3, movie_id / 10, movie_id)
+                                       for movie_id in range(1, 100))
+
+    assert index.top_movie_ids('rating', 3, movie_ids=[5, 50, 7, 1000, 42]) == [50, 42, 7]
+    assert index.top_movie_ids('rating', 3, release_year=2000) == [99, 96, 93]
+    assert index.top_movie_ids('rating', 2, movie_ids=range(1, 20), release_year=2001) == [19, 16]
+    assert index.top_movie_ids('rating', 2, movie_ids=[1000]) == []
+
+    with pytest.raises(ValueError):
+        index.top_movie_ids('revenue', 3)
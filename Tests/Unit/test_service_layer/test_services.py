@@ -3,7 +3,11 @@ import pytest
 
 from CS235Flix.authentication.services import AuthenticationException
 from CS235Flix.movies import services as movies_services
+from CS235Flix.actors import services as actors_services
 from CS235Flix.authentication import services as auth_services
+from CS235Flix.utilities import services as utilities_services
+from CS235Flix.utilities.sidebar import SidebarSampler
+from CS235Flix.domainmodel.model import Movie
 from CS235Flix.movies.services import NonExistentMovieException, NonExistentActorException, NonExistentDirectorException, NoSearchResultsException
 
 
@@ -298,15 +302,153 @@ def test_get_top_5_movies_by_revenue(in_memory_repo):
     assert movies[5]['title'] == "Prometheus"
 
 
+def test_get_top_movies(in_memory_repo):
+    movies = movies_services.get_top_movies('weighted_rating', 3, in_memory_repo)
+    assert [movie['id'] for movie in movies] == [1, 7, 3]
+    assert movies[1]['title'] == "La La Land"
+    assert (movies[1]['rating'], movies[1]['votes'], movies[1]['metascore']) == (8.3, 258682, 93)
+
+    movies = movies_services.get_top_movies('rating', 3, in_memory_repo, genre_name='Adventure', release_year=2016)
+    assert [movie['id'] for movie in movies] == [9, 10, 5]
+
+    with pytest.raises(ValueError):
+        movies_services.get_top_movies('title', 3, in_memory_repo)
+
+
 def test_get_suggestions_for_a_user(in_memory_repo):
     username = "thorke"
     suggestions = movies_services.get_suggestions_for_a_user(username=username, repo=in_memory_repo)
-    assert len(suggestions) == 1
-    assert suggestions[0]['title'] == "Guardians of the Galaxy"
+    assert len(suggestions) == 2
+    assert suggestions[0]['title'] == "Suicide Squad"
+    assert suggestions[1]['title'] == "Prometheus"
+
+
+
+
+
+
+
+
+
+def test_get_connection_between_actors(in_memory_repo):
+    connection = actors_services.get_connection_between_actors("Bradley Cooper", "Jennifer Lawrence", in_memory_repo)
+
+    # Bradley Cooper played with Chris Pratt in Guardians of the Galaxy, who played with Jennifer Lawrence in Passengers
+    assert [actor['actor_fullname'] for actor in connection] == ["Bradley Cooper", "Chris Pratt", "Jennifer Lawrence"]
+
+
+def test_get_connection_between_unconnected_or_non_existent_actors(in_memory_repo):
+    with pytest.raises(actors_services.NoConnectionException):
+        actors_services.get_connection_between_actors("Chris Pratt", "Ryan Gosling", in_memory_repo)
+
+    with pytest.raises(actors_services.NonExistentActorException):
+        actors_services.get_connection_between_actors("Chris Pratt", "Not Exist", in_memory_repo)
+
+
+def test_get_actor_neighbourhood(in_memory_repo):
+    neighbourhood = actors_services.get_actor_neighbourhood("Bradley Cooper", 2, in_memory_repo)
 
+    direct_colleagues = [actor['actor_fullname'] for actor in neighbourhood if actor['degrees_of_separation'] == 1]
+    assert sorted(direct_colleagues) == ["Chris Pratt", "Vin Diesel", "Zoe Saldana"]
+    assert {'actor_fullname': "Jennifer Lawrence", 'degrees_of_separation': 2} in neighbourhood
 
 
+def test_get_most_connected_actors(in_memory_repo):
+    most_connected = actors_services.get_most_connected_actors(1, in_memory_repo)
+    assert most_connected == [{'actor_fullname': "Chris Pratt", 'number_of_colleagues': 6}]
 
 
+def test_movie_lists_do_not_include_the_movies_of_each_genre(in_memory_repo):
+    movies_as_dict = movies_services.get_movies_by_id([1], in_memory_repo)
 
+    assert movies_as_dict[0]['genres'] == [{'genre_name': 'Action'}, {'genre_name': 'Adventure'},
+                                           {'genre_name': 'Sci-Fi'}]
+    assert len(movies_as_dict[0]['reviews']) == 3
 
+
+def test_movie_details_include_the_number_of_movies_of_each_genre(in_memory_repo):
+    movie_as_dict = movies_services.get_movie(1, in_memory_repo)
+
+    genres = {genre['genre_name']: genre['number_of_classified_movies'] for genre in movie_as_dict['genres']}
+    assert genres == {'Action': 4, 'Adventure': 6, 'Sci-Fi': 2}
+
+
+def test_movie_cards_are_independent_of_each_other(in_memory_repo):
+    first_card = movies_services.get_movies_by_id([1], in_memory_repo)[0]
+    first_card['view_review_url'] = '/movies'
+
+    second_card = movies_services.get_movies_by_id([1], in_memory_repo)[0]
+    assert 'view_review_url' not in second_card
+
+
+def test_movie_cards_include_new_reviews(in_memory_repo):
+    movies_services.get_movies_by_id([2], in_memory_repo)
+    movies_services.add_review('What a great movie!', 'fmercury', 2, 10, in_memory_repo)
+
+    movie_as_dict = movies_services.get_movies_by_id([2], in_memory_repo)[0]
+    assert [review['review_text'] for review in movie_as_dict['reviews']] == ['What a great movie!']
+
+
+def test_browse_movies(in_memory_repo):
+    results = movies_services.browse_movies(in_memory_repo, genre_names=["Comedy"], cursor=1, quantity=1)
+
+    assert results['number_of_movies'] == 3
+    assert [movie['id'] for movie in results['movies']] == [7]
+    assert results['genre_counts']['Music'] == 1
+    assert results['release_year_counts'] == {2016: 3}
+
+
+def test_suggestions_start_with_movies_rated_alike_by_other_users(in_memory_repo):
+    movies_services.add_review("Lovely", "fmercury", 7, 9, in_memory_repo)
+
+    suggestions = movies_services.get_suggestions_for_a_user(username="thorke", repo=in_memory_repo)
+    assert [movie['title'] for movie in suggestions] == ["La La Land", "Suicide Squad", "Prometheus"]
+
+
+def test_get_similar_movies(in_memory_repo):
+    movie, similar_movies = movies_services.get_similar_movies(9, in_memory_repo, quantity=1)
+
+    assert movie['title'] == "The Lost City of Z"
+    assert [similar_movie['title'] for similar_movie in similar_movies] == ["The Great Wall"]
+
+    with pytest.raises(movies_services.NonExistentMovieException):
+        movies_services.get_similar_movies(99, in_memory_repo)
+
+
+def test_get_random_movies_picks_from_ids_that_are_not_contiguous(in_memory_repo):
+    in_memory_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+
+    movies = utilities_services.get_random_movies(20, in_memory_repo)
+    assert len(movies) == 11
+    assert "Avengers : End Game" in [movie['title'] for movie in movies]
+
+
+def test_sidebar_sampler_reuses_its_rotation_until_it_is_refreshed(in_memory_repo):
+    now = [0]
+    sampler = SidebarSampler(lambda movie: '/movies?year=' + str(movie['release_year']), rotation_size=4,
+                             refresh_seconds=60, clock=lambda: now[0])
+
+    movies = sampler.get_selected_movies(3, in_memory_repo)
+    assert len(movies) == 3
+    assert len({movie['title'] for movie in movies}) == 3
+    assert all(movie['id'] == '/movies?year=' + str(movie['release_year']) for movie in movies)
+    # Each request gets the movies' actors, not only the first
+    assert all(len(movie['actors']) > 0 for movie in movies)
+    assert all(len(movie['actors']) > 0 and movie['director'] is not None
+               for movie in sampler.get_selected_movies(4, in_memory_repo))
+
+    # Until the rotation is refreshed, movies come from the same four, and changing them doesn't change the rotation
+    rotation = {movie['title'] for movie in sampler.get_selected_movies(4, in_memory_repo)}
+    movies[0]['title'] = "Changed"
+    for _ in range(10):
+        assert {movie['title'] for movie in sampler.get_selected_movies(3, in_memory_repo)} <= rotation
+    assert len(sampler.get_selected_movies(10, in_memory_repo)) == 4
+
+    # A refreshed rotation includes movies added since
+    in_memory_repo.add_movie(Movie("Avengers : End Game", 2019, 1050))
+    sampler = SidebarSampler(lambda movie: '', rotation_size=20, refresh_seconds=60, clock=lambda: now[0])
+    sampler.get_selected_movies(1, in_memory_repo)
+    in_memory_repo.add_movie(Movie("Tenet", 2020, 1051))
+    assert "Tenet" not in [movie['title'] for movie in sampler.get_selected_movies(20, in_memory_repo)]
+    now[0] = 60
+    assert "Tenet" in [movie['title'] for movie in sampler.get_selected_movies(20, in_memory_repo)]
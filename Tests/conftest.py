@@ -1,9 +1,15 @@
 import pytest
 import os
+import shutil
 
 from CS235Flix import create_app
 from CS235Flix.adapters.memory_repository import MemoryRepository, populate
 from CS235Flix.adapters import memory_repository
+from CS235Flix.adapters import columnar_repository
+from CS235Flix.adapters.columnar_repository import ColumnarMemoryRepository
+from CS235Flix.adapters.database_loader import load_database
+from CS235Flix.adapters.database_repository import DatabaseRepository, make_engine
+from CS235Flix.adapters.cover_art import CoverResolver
 
 
 
@@ -12,6 +18,12 @@ from CS235Flix.adapters import memory_repository
 TEST_DATA_PATH = "Tests/data/"  # This is the path to the 10 movies
 
 
+class StubCoverResolver(CoverResolver):
+    # Resolves covers locally so that tests never contact IMDb.
+    def resolve(self, title: str, release_year: int):
+        return 'https://covers.example/{}-{}.jpg'.format(title.replace(' ', '_'), release_year)
+
+
 @pytest.fixture
 def in_memory_repo():
     repo = MemoryRepository()
@@ -20,15 +32,73 @@ def in_memory_repo():
 
 
 @pytest.fixture
-def client():
+def columnar_repo():
+    repo = ColumnarMemoryRepository()
+    columnar_repository.populate(TEST_DATA_PATH, repo)
+    return repo
+
+
+@pytest.fixture(scope='session')
+def populated_database(tmp_path_factory):
+    # Loading hashes the users' passwords, so it is only done once; each test then gets a copy of the database.
+    database_path = str(tmp_path_factory.mktemp('database') / 'cs235flix.db')
+    engine = make_engine('sqlite:///' + database_path)
+    load_database(TEST_DATA_PATH, engine)
+    engine.dispose()
+    return database_path
+
+
+@pytest.fixture
+def database_repo(populated_database, tmp_path):
+    database_path = str(tmp_path / 'cs235flix.db')
+    shutil.copyfile(populated_database, database_path)
+    engine = make_engine('sqlite:///' + database_path)
+    yield DatabaseRepository(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(tmp_path):
     my_app = create_app({
         'TESTING':True,                          # Set to True during testing
         'TEST_DATA_PATH':TEST_DATA_PATH,         # Path for loading test data into the repository
-        'WTF_CSRF_ENABLED':False                 # test_client will not send a CSRF token, so disable validation
+        'WTF_CSRF_ENABLED':False,                # test_client will not send a CSRF token, so disable validation
+        'COVER_RESOLVER':StubCoverResolver(),    # Resolve movie covers locally instead of through IMDb
+        'COVER_CACHE_PATH':str(tmp_path / 'covers.json')
+    })
+    return my_app.test_client()
+
+
+@pytest.fixture
+def columnar_client(tmp_path):
+    my_app = create_app({
+        'TESTING':True,
+        'TEST_DATA_PATH':TEST_DATA_PATH,
+        'WTF_CSRF_ENABLED':False,
+        'COVER_RESOLVER':StubCoverResolver(),
+        'COVER_CACHE_PATH':str(tmp_path / 'covers.json'),
+        'REPOSITORY':'columnar'                  # Hold the movies in NumPy columns
     })
     return my_app.test_client()
 
 
+@pytest.fixture
+def make_database_client(tmp_path):
+    # Each client is for a new application using the same database
+    def make_client():
+        my_app = create_app({
+            'TESTING':True,
+            'TEST_DATA_PATH':TEST_DATA_PATH,
+            'WTF_CSRF_ENABLED':False,
+            'COVER_RESOLVER':StubCoverResolver(),
+            'COVER_CACHE_PATH':str(tmp_path / 'covers.json'),
+            'REPOSITORY':'database',                 # Store the repository in an SQLite database
+            'SQLALCHEMY_DATABASE_URI':'sqlite:///' + str(tmp_path / 'cs235flix.db')
+        })
+        return my_app.test_client()
+    return make_client
+
+
 class AuthenticationManager:
     def __init__(self, client):
         self._client = client
@@ -0,0 +1,70 @@
+""" Compares the memory used by the movies of MemoryRepository and ColumnarMemoryRepository, and the time each takes
+    to answer the queries behind the home and genre pages.
+
+    Usage: python benchmarks/columnar_repository_benchmark.py [number_of_rows]
+
+    The catalogue is made by repeating the rows of CS235Flix/adapters/datafiles/movies.csv (see
+    movie_file_csv_reader_benchmark). Only movies are loaded, and memory is measured with tracemalloc.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from movie_file_csv_reader_benchmark import write_catalogue
+from CS235Flix.adapters.columnar_repository import ColumnarMemoryRepository
+from CS235Flix.adapters.memory_repository import MemoryRepository, load_movies_actors_directors_genre_description, \
+    movie_columns
+from CS235Flix.adapters.parallel_csv import parse_in_parallel
+
+
+def load_memory_repository(directory: str):
+    repo = MemoryRepository()
+    load_movies_actors_directors_genre_description(directory, repo, workers=1)
+    return repo
+
+
+def load_columnar_repository(directory: str):
+    repo = ColumnarMemoryRepository()
+    for columns in parse_in_parallel(os.path.join(directory, 'movies.csv'), movie_columns, workers=1):
+        repo.add_movie_columns(columns)
+    return repo
+
+
+def measure(load, directory: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = load(directory)
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The home page shows the top movies by revenue, and a genre page a page of movies in revenue order. Time the
+    # second query of each, once the lazily built orders exist.
+    timings = list()
+    for query in (repo.get_top_6_highest_revenue_movies,
+                  lambda: repo.get_movies_by_index(repo.get_movie_indexes_for_genre('Drama', 'revenue')[:12])):
+        query()
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+    return seconds, size, timings
+
+
+def main(number_of_rows: int):
+    print("{:>10} {:>9} {:>14} {:>12} {:>12}".format("repository", "load s", "bytes per movie", "top 6 ms",
+                                                     "genre ms"))
+    with tempfile.TemporaryDirectory() as directory:
+        write_catalogue(os.path.join(directory, 'movies.csv'), number_of_rows)
+        for name, load in (("memory", load_memory_repository), ("columnar", load_columnar_repository)):
+            seconds, size, (top, genre) = measure(load, directory)
+            print("{:>10} {:>9.2f} {:>14.0f} {:>12.2f} {:>12.2f}".format(name, seconds, size / number_of_rows,
+                                                                        top * 1e3, genre * 1e3))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+""" Measures the memory taken by the domain objects of a catalogue, in bytes per movie.
+
+    Usage: python benchmarks/domain_model_memory_benchmark.py [number_of_movies]
+
+    The rows of CS235Flix/adapters/datafiles/movies.csv are repeated with new titles, actors and directors up to
+    number_of_movies, and turned into linked Movie, Actor, Director and Genre objects (as the repository's loader
+    does, without the repository's indexes). Only the memory allocated while creating the objects is counted.
+"""
+
+import csv
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from CS235Flix.domainmodel.model import Movie, Actor, Director, Genre
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'CS235Flix', 'adapters', 'datafiles',
+                           'movies.csv')
+
+
+def read_rows(number_of_movies: int):
+    with open(SOURCE_PATH, encoding='utf-8-sig') as infile:
+        reader = csv.reader(infile)
+        next(reader)
+        rows = list(reader)
+
+    catalogue = list()
+    for number in range(number_of_movies):
+        row = rows[number % len(rows)]
+        copy = number // len(rows)
+        suffix = "" if copy == 0 else " {}".format(copy)
+        catalogue.append((number + 1, row[1] + suffix, int(row[6]), row[3], row[4] + suffix,
+                          [actor + suffix for actor in row[5].split(",")], row[2].split(","), int(row[7])))
+    return catalogue
+
+
+def build_catalogue(catalogue):
+    actors, directors, genres, movies = dict(), dict(), dict(), list()
+    for movie_id, title, release_year, description, director_name, actor_names, genre_names, runtime in catalogue:
+        movie = Movie(title, release_year, movie_id)
+        movie.set_description(description)
+        movie.set_runtime_minutes(runtime)
+
+        director = directors.setdefault(director_name.strip(), Director(director_name))
+        movie.set_director(director)
+        director.add_directed_movies(movie)
+        for actor_name in actor_names:
+            actor = actors.setdefault(actor_name.strip(), Actor(actor_name))
+            movie.add_actor(actor)
+            actor.add_played_movies(movie)
+        for genre_name in genre_names:
+            genre = genres.setdefault(genre_name.strip(), Genre(genre_name))
+            movie.add_genre(genre)
+            genre.add_Movie(movie)
+        movies.append(movie)
+    return movies, actors, directors, genres
+
+
+def main(number_of_movies: int):
+    catalogue = read_rows(number_of_movies)
+
+    tracemalloc.start()
+    entities = build_catalogue(catalogue)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("{} movies, {} actors, {} directors: {:.1f} MiB, {:.0f} bytes per movie".format(
+        len(entities[0]), len(entities[1]), len(entities[2]), size / (1024 * 1024), size / number_of_movies))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,59 @@
+""" Times MovieFileCSVReader on catalogues of increasing size, to check that reading scales linearly.
+
+    Usage: python benchmarks/movie_file_csv_reader_benchmark.py [largest_number_of_rows]
+
+    The catalogues are made by repeating the rows of CS235Flix/adapters/datafiles/movies.csv with new titles, actors
+    and directors, so every row adds new entities to deduplicate.
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from CS235Flix.adapters.datafilereaders.movie_file_csv_reader import MovieFileCSVReader
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'CS235Flix', 'adapters', 'datafiles',
+                           'movies.csv')
+
+
+def write_catalogue(path: str, number_of_rows: int):
+    with open(SOURCE_PATH, encoding='utf-8-sig') as infile:
+        reader = csv.reader(infile)
+        header = next(reader)
+        rows = list(reader)
+
+    with open(path, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(header)
+        for number in range(number_of_rows):
+            row = list(rows[number % len(rows)])
+            copy = number // len(rows)
+            if copy > 0:
+                row[0] = str(number + 1)
+                row[1] = "{} ({})".format(row[1], copy)
+                row[4] = "{} {}".format(row[4], copy)
+                row[5] = ",".join("{} {}".format(actor.strip(), copy) for actor in row[5].split(","))
+            writer.writerow(row)
+
+
+def main(largest_number_of_rows: int):
+    print("{:>8} {:>9} {:>12}".format("rows", "seconds", "us per row"))
+    with tempfile.TemporaryDirectory() as directory:
+        number_of_rows = 1000
+        while number_of_rows <= largest_number_of_rows:
+            path = os.path.join(directory, 'movies.csv')
+            write_catalogue(path, number_of_rows)
+
+            start = time.perf_counter()
+            MovieFileCSVReader(path).read_csv_file()
+            seconds = time.perf_counter() - start
+            print("{:>8} {:>9.3f} {:>12.1f}".format(number_of_rows, seconds, seconds / number_of_rows * 1e6))
+            number_of_rows *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64000)
@@ -14,3 +14,19 @@ class Config:
 
     SECRET_KEY = environ.get('SECRET_KEY')
 
+    # Cover art cache file; defaults to covers.json in the Flask instance folder when not set.
+    COVER_CACHE_PATH = environ.get('COVER_CACHE_PATH')
+
+    # Snapshot of the populated repository; defaults to repository.pickle in the Flask instance folder when not set.
+    REPOSITORY_SNAPSHOT_PATH = environ.get('REPOSITORY_SNAPSHOT_PATH')
+
+    # Seconds between new picks of the random movies shown alongside most pages.
+    SIDEBAR_REFRESH_SECONDS = float(environ.get('SIDEBAR_REFRESH_SECONDS', 60))
+
+    # Repository implementation: 'memory' (the default), 'columnar' (movies held in NumPy arrays) or 'database'.
+    REPOSITORY = environ.get('REPOSITORY', 'memory')
+
+    # Database settings for the 'database' repository. SQLite is used when no database URI is set.
+    SQLALCHEMY_DATABASE_URI = environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///cs235flix.db')
+    SQLALCHEMY_POOL_SIZE = int(environ.get('SQLALCHEMY_POOL_SIZE', 5))
+    SQLALCHEMY_ECHO = environ.get('SQLALCHEMY_ECHO') == 'True'